@@ -0,0 +1,139 @@
+import time
+import zlib
+from datetime import datetime, timezone
+
+import msgspec
+
+# Versioned wire schema for text_complaints and voice_complaints. Every service keeps an identical
+# copy of this file, as each one builds its own image.
+# The body encoding follows the AMQP content_type: application/msgpack or application/json
+# (also assumed when content_type is unset). v1 bodies have no "v" field. They are the plain
+# json.dumps dicts from older producers, the DLQ parking lot or recorded streams, and decode()
+# upgrades them.
+# A text envelope (AMQP type BATCH_TYPE) packs many encoded TextComplaint bodies into one
+# deflate-compressed message. Its items stay raw, so each one is decoded, and can fail, on its own.
+
+SCHEMA_VERSION = 2
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+CONTENT_TYPES = {"json": JSON, "msgpack": MSGPACK}
+BATCH_TYPE = "text_batch"
+BATCH_ENCODING = "deflate"
+
+
+class Customer(msgspec.Struct, omit_defaults=True):
+    id: str
+    name: str = ""
+    phone: str = ""
+    email: str = ""
+    date: str = ""
+    account_number: str = ""
+    location: str = ""
+    money_amount: str = ""
+
+
+class AudioInfo(msgspec.Struct, omit_defaults=True):
+    format: str = "wav"
+    duration_s: float = 0.0
+    sample_rate: int = 0
+    channels: int = 1
+    size: int = 0
+    sha256: str = ""
+
+
+class TextComplaint(msgspec.Struct, tag="text", tag_field="kind", kw_only=True, omit_defaults=True):
+    v: int
+    message_id: str
+    timestamp: float = 0.0
+    scenario: str = "unknown"
+    customer_id: str = "unknown"
+    channel: str = "unknown"
+    complaint_text: str = ""
+    customer: Customer | None = None
+
+
+class VoiceComplaint(msgspec.Struct, tag="voice", tag_field="kind", kw_only=True, omit_defaults=True):
+    v: int
+    message_id: str
+    timestamp: float = 0.0
+    scenario: str = "unknown"
+    customer_id: str = "unknown"
+    channel: str = "unknown"
+    object_name: str = ""
+    audio_url: str = ""
+    audio: AudioInfo | None = None
+    corpus: str = ""
+    corpus_index: int = -1
+
+
+class TextBatch(msgspec.Struct, tag="text_batch", tag_field="kind", kw_only=True, omit_defaults=True):
+    v: int
+    batch_id: str
+    timestamp: float = 0.0
+    items: list[msgspec.Raw] = []
+
+
+_json_encoder = msgspec.json.Encoder()
+_msgpack_encoder = msgspec.msgpack.Encoder()
+
+
+def encode(message, content_type=JSON):
+    """Message struct -> body bytes for the given content_type."""
+    if content_type == MSGPACK:
+        return _msgpack_encoder.encode(message)
+    return _json_encoder.encode(message)
+
+
+def pack_batch(bodies, batch_id, content_type=JSON, compresslevel=6):
+    """Item bodies, each already encoded with content_type -> one compressed envelope body."""
+    batch = TextBatch(v=SCHEMA_VERSION, batch_id=batch_id, timestamp=time.time(),
+                      items=[msgspec.Raw(body) for body in bodies])
+    return zlib.compress(encode(batch, content_type), compresslevel)
+
+
+def unpack_batch(body, content_type=None, content_encoding=None):
+    """Envelope body -> TextBatch whose items still need TEXT.decode(item, content_type)."""
+    if content_encoding == BATCH_ENCODING:
+        body = zlib.decompress(body)
+    return BATCH.decode(body, content_type)
+
+
+def upgrade_v1(fields):
+    # v1 text used message_id with a nested customer; v1 voice used id and an ISO timestamp
+    fields = dict(fields, v=SCHEMA_VERSION)
+    if "message_id" not in fields and "id" in fields:
+        fields["message_id"] = fields.pop("id")
+    if isinstance(fields.get("timestamp"), str):
+        timestamp = datetime.fromisoformat(fields["timestamp"])
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)  # voice_producer stamped utcnow()
+        fields["timestamp"] = timestamp.timestamp()
+    customer = fields.get("customer")
+    if isinstance(customer, dict) and "customer_id" not in fields:
+        fields["customer_id"] = customer.get("id", "unknown")
+    return fields
+
+
+class Codec:
+    """Typed decoder for one message kind; invalid bodies raise msgspec.ValidationError (a ValueError)."""
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.json = msgspec.json.Decoder(kind)
+        self.msgpack = msgspec.msgpack.Decoder(kind)
+
+    def decode(self, body, content_type=None):
+        if content_type == MSGPACK:
+            return self.msgpack.decode(body)
+        try:
+            return self.json.decode(body)
+        except msgspec.ValidationError:
+            fields = msgspec.json.decode(body)
+            if not isinstance(fields, dict) or "v" in fields:
+                raise
+            return msgspec.convert(upgrade_v1(fields), self.kind)
+
+
+TEXT = Codec(TextComplaint)
+VOICE = Codec(VoiceComplaint)
+BATCH = Codec(TextBatch)
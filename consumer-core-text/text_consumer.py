@@ -1,5 +1,4 @@
 import pika
-import json
 import os
 import logging
 import traceback
@@ -7,6 +6,9 @@ import spacy
 from influxdb_client import InfluxDBClient, Point, WritePrecision
 from datetime import datetime
 
+import lanes
+import messages
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 
@@ -24,15 +26,25 @@ RABBITMQ_USER = get_env_var("RABBITMQ_USER")
 RABBITMQ_PASS = get_env_var("RABBITMQ_PASS")
 RABBITMQ_VHOST = get_env_var("RABBITMQ_VHOST")
 QUEUE_NAME = "text_complaints"
+DEAD_LETTER_EXCHANGE = "text_dlx"  # the queue's x-dead-letter-exchange, declared by text_producer.py
+DEAD_LETTER_ROUTING_KEY = "text_dead_letter"  # text_complaints_dlq.dlq is bound with it (producer/dlq)
 
 INFLUXDB_URL_LOCAL = get_env_var("INFLUXDB_URL")
 INFLUXDB_ORG = get_env_var("INFLUXDB_ORG")
 INFLUXDB_BUCKET_TEXT_NER = get_env_var("INFLUXDB_BUCKET")
 INFLUXDB_TOKEN = get_env_var("INFLUXDB_TOKEN")
+PIPELINE_BACKEND = os.getenv("PIPELINE_BACKEND", "docker")  # 'docker' or 'local' (in-process stand-ins)
 
 # Load spaCy English model for NER
 nlp = spacy.load("en_core_web_sm")
 
+# InfluxDB client (line protocol sink when running on local backends)
+def create_influx_client():
+    if PIPELINE_BACKEND == "local":
+        from local_backends import local_influx_client
+        return local_influx_client()
+    return InfluxDBClient(url=INFLUXDB_URL_LOCAL, token=INFLUXDB_TOKEN, org=INFLUXDB_ORG)
+
 # Ensure InfluxDB bucket exists
 def ensure_bucket_exists(client, bucket_name, org):
     buckets_api = client.buckets_api()
@@ -46,6 +58,9 @@ def ensure_bucket_exists(client, bucket_name, org):
 
 # RabbitMQ connection setup
 def connect_to_rabbitmq():
+    if PIPELINE_BACKEND == "local":
+        from local_backends import connect_local_broker
+        return connect_local_broker()
     credentials = pika.PlainCredentials(RABBITMQ_USER, RABBITMQ_PASS)
     parameters = pika.ConnectionParameters(
         host=RABBITMQ_HOST_LOCAL,
@@ -64,47 +79,96 @@ def extract_entities(text):
     # Convert sets to lists for JSON serialization
     return {label: list(texts) for label, texts in entities.items()}
 
+# Entities for one complaint; returns its point, or None when there is nothing to score
+def analyze(message):
+    text = message.complaint_text
+    message_id = message.message_id
+    scenario = message.scenario
+    customer_id = message.customer_id
+    channel_name = message.channel
+
+    if not text.strip():
+        logging.warning(f"Empty complaint text for message {message_id}")
+        return None
+
+    # Named Entity Recognition
+    entities = extract_entities(text)
+
+    point = (
+        Point("text_complaints_ner")
+        .tag("message_id", message_id)
+        .tag("scenario", scenario)
+        .tag("customer_id", customer_id)
+        .tag("channel", channel_name)
+        .time(datetime.utcnow(), WritePrecision.NS)
+    )
+
+    # Add entities as JSON string fields per label (or flatten as you want)
+    for label, texts in entities.items():
+        # Join multiple entities of same label with semicolon or comma
+        point = point.field(f"entities_{label}", "; ".join(texts))
+
+    if isinstance(text, str) and len(text) < 5024:
+        point = point.field("text", text)
+    else:
+        logging.warning(f"Complaint text too long or invalid for message {message_id}, skipping 'text' field")
+
+    logging.info(f"Processed text complaint {message_id} | Extracted entities: {list(entities.keys())}")
+    return point
+
+# A failed envelope item goes to the DLQ on its own, like a rejected message. The channel is in confirm mode, so
+# an item the broker cannot route or store raises here and the whole envelope is nacked instead of acked
+def park_item(ch, properties, item, error, message_id, batch_id):
+    ch.basic_publish(
+        exchange=DEAD_LETTER_EXCHANGE,
+        routing_key=DEAD_LETTER_ROUTING_KEY,
+        body=bytes(item),
+        properties=pika.BasicProperties(
+            delivery_mode=2,
+            content_type=properties.content_type,
+            message_id=message_id,
+            headers={"x-error-class": type(error).__name__, "x-failed-queue": QUEUE_NAME, "x-batch-id": batch_id},
+        ),
+        mandatory=True,
+    )
+
+# Envelope of many complaints: one Influx write and one ack, failed items parked one by one
+def process_batch(ch, method, properties, body):
+    try:
+        batch = messages.unpack_batch(body, properties.content_type, properties.content_encoding)
+        points, failed = [], []
+        for item in batch.items:
+            message = None
+            try:
+                message = messages.TEXT.decode(item, properties.content_type)
+                point = analyze(message)
+            except Exception as e:
+                logging.error(f"Failed to process an item of batch {batch.batch_id}: {e!r}")
+                failed.append((item, e, message.message_id if message else None))
+                continue
+            if point is not None:
+                points.append(point)
+
+        if points:
+            write_api.write(bucket=INFLUXDB_BUCKET_TEXT_NER, record=points)
+        for item, error, message_id in failed:
+            park_item(ch, properties, item, error, message_id, batch.batch_id)
+
+        logging.info(f"Processed batch {batch.batch_id}: {len(batch.items)} complaints, {len(failed)} parked")
+        ch.basic_ack(delivery_tag=method.delivery_tag)
+
+    except Exception:
+        logging.error("Failed to process batch:\n" + traceback.format_exc())
+        ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+
 # Main message processor
 def callback(ch, method, properties, body):
+    if properties.type == messages.BATCH_TYPE:
+        return process_batch(ch, method, properties, body)
     try:
-        message = json.loads(body)
-
-        text = message.get("complaint_text", "")
-        message_id = message.get("message_id", "unknown")
-        scenario = message.get("scenario", "unknown")
-        customer_id = message.get("customer_id", "unknown")
-        channel_name = message.get("channel", "unknown")
-
-        if not text.strip():
-            logging.warning(f"Empty complaint text for message {message_id}")
-            ch.basic_ack(delivery_tag=method.delivery_tag)
-            return
-
-        # Named Entity Recognition
-        entities = extract_entities(text)
-
-        point = (
-            Point("text_complaints_ner")
-            .tag("message_id", message_id)
-            .tag("scenario", scenario)
-            .tag("customer_id", customer_id)
-            .tag("channel", channel_name)
-            .time(datetime.utcnow(), WritePrecision.NS)
-        )
-
-        # Add entities as JSON string fields per label (or flatten as you want)
-        for label, texts in entities.items():
-            # Join multiple entities of same label with semicolon or comma
-            point = point.field(f"entities_{label}", "; ".join(texts))
-
-        if isinstance(text, str) and len(text) < 5024:
-            point = point.field("text", text)
-        else:
-            logging.warning(f"Complaint text too long or invalid for message {message_id}, skipping 'text' field")
-
-        write_api.write(bucket=INFLUXDB_BUCKET_TEXT_NER, record=point)
-
-        logging.info(f"Processed text complaint {message_id} | Extracted entities: {list(entities.keys())}")
+        point = analyze(messages.TEXT.decode(body, properties.content_type))
+        if point is not None:
+            write_api.write(bucket=INFLUXDB_BUCKET_TEXT_NER, record=point)
         ch.basic_ack(delivery_tag=method.delivery_tag)
 
     except Exception:
@@ -115,18 +179,20 @@ def callback(ch, method, properties, body):
 def main():
     global write_api
 
-    influx_client = InfluxDBClient(url=INFLUXDB_URL_LOCAL, token=INFLUXDB_TOKEN, org=INFLUXDB_ORG)
+    influx_client = create_influx_client()
     ensure_bucket_exists(influx_client, INFLUXDB_BUCKET_TEXT_NER, INFLUXDB_ORG)
     write_api = influx_client.write_api(write_precision=WritePrecision.NS)
 
     conn = connect_to_rabbitmq()
     channel = conn.channel()
-    channel.basic_qos(prefetch_count=1)
-    channel.basic_consume(queue=QUEUE_NAME, on_message_callback=callback)
+    channel.confirm_delivery()  # parked envelope items are confirmed before the envelope is acked
+    # Fraud lane first, weighted-fair against the rest (lanes.py)
+    consumer = lanes.LaneConsumer(conn, channel, QUEUE_NAME,
+                                  priority_arguments={"x-dead-letter-exchange": DEAD_LETTER_EXCHANGE})
 
     logging.info("Waiting for text complaints (NER)...")
     try:
-        channel.start_consuming()
+        consumer.start_consuming(callback)
     except KeyboardInterrupt:
         logging.info("Interrupted by user, shutting down...")
     finally:
@@ -0,0 +1,158 @@
+import os
+import json
+import uuid
+import logging
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# Local columnar cache of raw sentiment points for sentiment.py.
+# Layout: <cache_dir>/bucket=<b>/measurement=<m>/day=<YYYY-MM-DD>/part-<id>.parquet
+# plus _watermarks.json (ignored by the dataset scan) holding the newest cached _time per bucket/measurement.
+# Consumers stamp points with processing time, so data mostly arrives after the watermark
+# and each refresh fetches the new tail. Points written late or out of order land just
+# before it, so the tail starts SENTIMENT_CACHE_OVERLAP earlier and rows already cached
+# (same _time and tags) are dropped. The first run backfills from range_start; widening
+# range_start later needs a fresh cache directory.
+
+CACHE_DIR = os.getenv("SENTIMENT_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"))
+FETCH_CHUNK = pd.Timedelta(days=1)  # backfill one day per Flux query to bound memory
+CACHE_OVERLAP = os.getenv("SENTIMENT_CACHE_OVERLAP", "5m")  # re-fetched before the watermark for late points
+TAG_COLUMNS = ["message_id", "scenario", "channel"]
+
+_watermark_lock = threading.Lock()
+
+PARTITIONING = ds.partitioning(
+    pa.schema([("bucket", pa.string()), ("measurement", pa.string()), ("day", pa.string())]),
+    flavor="hive",
+)
+
+
+def to_timedelta(duration):
+    # Flux durations ("90m", "1h", "14d") -> pandas, which spells days with an upper-case D
+    return pd.Timedelta(duration.replace("d", "D"))
+
+
+def resolve_time(value, now=None):
+    # Accepts the Flux forms used in sentiment.py: "-14d", "now()" or an RFC3339 timestamp
+    now = now or pd.Timestamp.now(tz="UTC")
+    if value == "now()":
+        return now
+    if value.startswith("-"):
+        return now - to_timedelta(value[1:])
+    ts = pd.Timestamp(value)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+def flux_time(ts):
+    return ts.strftime("%Y-%m-%dT%H:%M:%S") + f".{ts.microsecond * 1000 + ts.nanosecond:09d}Z"
+
+
+def _watermark_path(cache_dir):
+    return os.path.join(cache_dir, "_watermarks.json")
+
+
+def load_watermarks(cache_dir=CACHE_DIR):
+    try:
+        with open(_watermark_path(cache_dir)) as f:
+            return {key: pd.Timestamp(value) for key, value in json.load(f).items()}
+    except FileNotFoundError:
+        return {}
+
+
+def save_watermark(bucket, measurement, ts, cache_dir=CACHE_DIR):
+    # Buckets refresh concurrently: serialise the read-modify-write and swap the file in atomically
+    with _watermark_lock:
+        watermarks = load_watermarks(cache_dir)
+        watermarks[f"{bucket}/{measurement}"] = ts
+        tmp_path = f"{_watermark_path(cache_dir)}.{uuid.uuid4().hex}"
+        with open(tmp_path, "w") as f:
+            json.dump({key: value.isoformat() for key, value in watermarks.items()}, f, indent=2)
+        os.replace(tmp_path, _watermark_path(cache_dir))
+
+
+def raw_query(bucket, measurement, fields, start, stop):
+    field_set = ", ".join(f'"{field}"' for field in fields)
+    keep = ", ".join(f'"{column}"' for column in ["_time", *TAG_COLUMNS, *fields])
+    return f'''
+from(bucket: "{bucket}")
+  |> range(start: {flux_time(start)}, stop: {flux_time(stop)})
+  |> filter(fn: (r) => r._measurement == "{measurement}")
+  |> filter(fn: (r) => contains(value: r._field, set: [{field_set}]))
+  |> pivot(rowKey: ["_time"], columnKey: ["_field"], valueColumn: "_value")
+  |> group()
+  |> keep(columns: [{keep}])'''
+
+
+def write_partitions(df, bucket, measurement, fields, cache_dir=CACHE_DIR):
+    # Fixed column set and types so every part file shares one schema
+    df = df.reindex(columns=["_time", *TAG_COLUMNS, *fields])
+    df[TAG_COLUMNS] = df[TAG_COLUMNS].astype("string")
+    df[fields] = df[fields].astype("float64")
+    for day, part in df.groupby(df["_time"].dt.strftime("%Y-%m-%d")):
+        directory = os.path.join(cache_dir, f"bucket={bucket}", f"measurement={measurement}", f"day={day}")
+        os.makedirs(directory, exist_ok=True)
+        table = pa.Table.from_pandas(part.reset_index(drop=True), preserve_index=False)
+        pq.write_table(table, os.path.join(directory, f"part-{uuid.uuid4().hex}.parquet"))
+
+
+def drop_cached(frames, cached):
+    """Rows of frames whose _time and tags are not in cached already."""
+    keys = ["_time", *TAG_COLUMNS]
+    if cached.empty:
+        return frames
+    frames = frames.astype({column: "string" for column in TAG_COLUMNS if column in frames})
+    cached = cached[keys].astype({column: "string" for column in TAG_COLUMNS}).drop_duplicates()
+    merged = frames.merge(cached, on=keys, how="left", indicator=True)
+    return merged[merged["_merge"] == "left_only"].drop(columns="_merge")
+
+
+def refresh(query_api, bucket, measurement, fields, initial_start, cache_dir=CACHE_DIR,
+            overlap=CACHE_OVERLAP):
+    """Fetch points from overlap before the stored watermark into the cache; returns the number of rows added."""
+    now = pd.Timestamp.now(tz="UTC")
+    watermark = load_watermarks(cache_dir).get(f"{bucket}/{measurement}")
+    start = watermark - to_timedelta(overlap) if watermark is not None else resolve_time(initial_start, now)
+    cached = pd.DataFrame()
+    if watermark is not None:
+        # The scan's stop bound is truncated to microseconds, so one past the watermark has to be 1 us
+        cached = load(bucket, measurement, start, watermark + pd.Timedelta(1, "us"),
+                      columns=["_time", *TAG_COLUMNS], cache_dir=cache_dir)
+    added = 0
+    while start < now:
+        stop = min(start + FETCH_CHUNK, now)
+        frames = query_api.query_data_frame(raw_query(bucket, measurement, fields, start, stop))
+        if isinstance(frames, list):
+            frames = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        frames = frames.drop(columns=["result", "table"], errors="ignore")
+        if not frames.empty:
+            frames["_time"] = pd.to_datetime(frames["_time"], utc=True)
+            frames = drop_cached(frames, cached)
+        if not frames.empty:
+            write_partitions(frames, bucket, measurement, fields, cache_dir)
+            newest = frames["_time"].max()
+            save_watermark(bucket, measurement, max(newest, watermark) if watermark is not None else newest, cache_dir)
+            added += len(frames)
+        start = stop
+    logging.info(f"[Cache] {bucket}/{measurement}: {added} new rows (watermark was {watermark})")
+    return added
+
+
+def load(bucket, measurement, start, stop, columns=None, cache_dir=CACHE_DIR):
+    """Read cached rows in [start, stop); partition and _time filters are pushed down to the Parquet scan."""
+    if not os.path.isdir(os.path.join(cache_dir, f"bucket={bucket}", f"measurement={measurement}")):
+        return pd.DataFrame()
+    dataset = ds.dataset(cache_dir, format="parquet", partitioning=PARTITIONING)
+    row_filter = (
+        (ds.field("bucket") == bucket)
+        & (ds.field("measurement") == measurement)
+        & (ds.field("day") >= start.strftime("%Y-%m-%d"))
+        & (ds.field("day") <= stop.strftime("%Y-%m-%d"))
+        & (ds.field("_time") >= start.to_pydatetime())
+        & (ds.field("_time") < stop.to_pydatetime())
+    )
+    table = dataset.to_table(columns=columns, filter=row_filter)
+    return table.to_pandas()
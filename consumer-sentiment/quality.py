@@ -0,0 +1,85 @@
+import os
+import re
+import time
+import logging
+
+from lanes import PUBLISHED_AT_HEADER
+
+# Load shedding for the expensive analysers (Whisper, the emotion transformer). QualityPolicy follows how late
+# deliveries are processed, as an EWMA of publish-to-processing lag per lane with the worst recent lane
+# counting, and picks the tier to process the next delivery at:
+#   full     lag below QUALITY_LAG_THRESHOLDS[0]
+#   reduced  at or above it
+#   minimal  at or above QUALITY_LAG_THRESHOLDS[1]
+# A consumer drops a tier as soon as lag crosses a threshold. It steps back up one tier once lag is under
+# QUALITY_RECOVER_RATIO of that threshold and the current tier has held for QUALITY_MIN_DWELL_S, so catching up
+# does not flap between models. What a tier means is up to each consumer (per_tier() reads "base,tiny,tiny"
+# style settings); their points carry a quality_tier tag. Every service keeps an identical copy.
+
+QUALITY_TIERS = ("full", "reduced", "minimal")
+QUALITY_DEGRADATION = os.getenv("QUALITY_DEGRADATION", "1") == "1"
+QUALITY_LAG_THRESHOLDS = [float(s) for s in os.getenv("QUALITY_LAG_THRESHOLDS", "300,1800").split(",")]  # seconds
+QUALITY_RECOVER_RATIO = float(os.getenv("QUALITY_RECOVER_RATIO", 0.5))
+QUALITY_MIN_DWELL_S = float(os.getenv("QUALITY_MIN_DWELL_S", 60))  # seconds at a tier before stepping back up
+QUALITY_LAG_ALPHA = float(os.getenv("QUALITY_LAG_ALPHA", 0.3))  # EWMA weight of the newest lag sample
+QUALITY_LAG_STALE_S = float(os.getenv("QUALITY_LAG_STALE_S", 300))  # a lane idle this long stops counting
+
+
+def per_tier(value, cast=str):
+    """'base,tiny' -> one setting per tier, the last one repeated: ['base', 'tiny', 'tiny']."""
+    values = [cast(part.strip()) for part in value.split(",")]
+    return [values[min(i, len(values) - 1)] for i in range(len(QUALITY_TIERS))]
+
+
+def sample_sentences(text, max_sentences):
+    """Evenly spaced subset of the sentences (and lines), at most max_sentences of them; 0 keeps the text."""
+    sentences = [part for part in re.split(r"(?<=[.!?])\s+|\n+", text) if part.strip()]
+    if max_sentences <= 0 or len(sentences) <= max_sentences:
+        return text
+    step = len(sentences) / max_sentences
+    return " ".join(sentences[int(i * step)] for i in range(max_sentences))
+
+
+class QualityPolicy:
+    def __init__(self, name, thresholds=QUALITY_LAG_THRESHOLDS, enabled=QUALITY_DEGRADATION):
+        self.name = name
+        self.thresholds = sorted(thresholds)[:len(QUALITY_TIERS) - 1]
+        self.enabled = enabled
+        self.level = 0  # index into QUALITY_TIERS
+        self.changed_at = time.monotonic()
+        self.lags = {}  # routing key (lane) -> (lag EWMA in seconds, monotonic time of its last delivery)
+
+    def lag(self):
+        now = time.monotonic()
+        return max((lag for lag, seen_at in self.lags.values() if now - seen_at <= QUALITY_LAG_STALE_S), default=0.0)
+
+    def observe(self, method, properties):
+        """Folds one delivery's lag in; returns the tier to process it at."""
+        published_at = (properties.headers or {}).get(PUBLISHED_AT_HEADER)
+        if published_at is not None:
+            sample = max(0.0, time.time() - float(published_at))
+            now = time.monotonic()
+            previous = self.lags.get(method.routing_key)
+            if previous is None or now - previous[1] > QUALITY_LAG_STALE_S:
+                lag = sample
+            else:
+                lag = previous[0] + QUALITY_LAG_ALPHA * (sample - previous[0])
+            self.lags[method.routing_key] = (lag, now)
+        if self.enabled:
+            self._update(self.lag())
+        return QUALITY_TIERS[self.level]
+
+    def _update(self, lag):
+        level = sum(1 for threshold in self.thresholds if lag >= threshold)
+        if level < self.level:
+            # Back up one tier at a time, once well clear of the threshold and not straight after a change
+            recover_below = self.thresholds[self.level - 1] * QUALITY_RECOVER_RATIO
+            if lag >= recover_below or time.monotonic() - self.changed_at < QUALITY_MIN_DWELL_S:
+                return
+            level = self.level - 1
+        if level == self.level:
+            return
+        logging.warning(f"[Quality] {self.name}: lag {lag:.1f}s (thresholds {self.thresholds}) -> "
+                        f"{QUALITY_TIERS[self.level]} to {QUALITY_TIERS[level]}")
+        self.level = level
+        self.changed_at = time.monotonic()
@@ -0,0 +1,269 @@
+import os
+import json
+import logging
+import argparse
+from datetime import datetime, timedelta, timezone
+
+from dotenv import load_dotenv
+from influxdb_client import InfluxDBClient, BucketRetentionRules, TaskCreateRequest, TaskUpdateRequest
+
+# Continuous rollups for the Grafana dashboard.
+# InfluxDB tasks aggregate the raw per-complaint points into 1m and 1h buckets, per
+# scenario and channel, so panels scan a fixed number of rows however much raw history exists.
+#
+#   python rollups.py apply                        # create/update rollup buckets and tasks
+#   python rollups.py backfill --start -30d        # populate rollups from existing raw data
+#   python rollups.py dashboard --output ../dashboard.json
+
+load_dotenv()
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+# --- Config ---
+INFLUXDB_URL = os.getenv("INFLUXDB_URL_LOCAL", "http://localhost:8086")
+INFLUXDB_TOKEN = os.getenv("INFLUXDB_TOKEN")
+INFLUXDB_ORG = os.getenv("INFLUXDB_ORG", "org")
+DATASOURCE_UID = "cenwg99wf82yoc"
+
+# Raw bucket and measurement written by the sentiment consumers
+SOURCES = {
+    "voice": ("voice_bucket", "voice_complaints"),
+    "text": ("text_bucket", "text_complaints"),
+}
+SENTIMENT_FIELDS = ["neg", "neu", "pos", "compound"]
+NEGATIVE_THRESHOLD = -0.4
+
+# every, target bucket, retention, lookback (re-aggregates the previous window to pick up late points)
+ROLLUPS = [
+    {"every": "1m", "bucket": "sentiment_1m", "retention": timedelta(days=30), "lookback": "2m"},
+    {"every": "1h", "bucket": "sentiment_1h", "retention": timedelta(days=730), "lookback": "2h"},
+]
+# Dashboard ranges longer than this read the 1h rollup instead of the 1m rollup
+HOURLY_ROLLUP_AFTER = "2d"
+
+
+# --- Flux ---
+def rollup_flux(source_bucket, measurement, rollup, start, stop=None):
+    # Sums and counts rather than means, so any coarser window or range can still be averaged exactly
+    stop_clause = f", stop: {stop}" if stop else ""
+    field_set = ", ".join(f'"{field}"' for field in SENTIMENT_FIELDS)
+    write = f'''
+  |> group(columns: ["_measurement", "scenario", "channel"])
+  |> map(fn: (r) => ({{r with _field: {{field}}, _value: float(v: r._value)}}))
+  |> to(bucket: "{rollup['bucket']}", org: "{INFLUXDB_ORG}", tagColumns: ["scenario", "channel"])'''
+    every = rollup["every"]
+    return f'''data = from(bucket: "{source_bucket}")
+  |> range(start: {start}{stop_clause})
+  |> filter(fn: (r) => r._measurement == "{measurement}")
+  |> filter(fn: (r) => contains(value: r._field, set: [{field_set}]))
+  |> group(columns: ["_measurement", "scenario", "channel", "_field"])
+
+data
+  |> aggregateWindow(every: {every}, fn: sum, createEmpty: false){write.replace("{field}", 'r._field + "_sum"')}
+
+data
+  |> filter(fn: (r) => r._field == "compound")
+  |> aggregateWindow(every: {every}, fn: count, createEmpty: false){write.replace("{field}", '"count"')}
+
+data
+  |> filter(fn: (r) => r._field == "compound" and r._value < {NEGATIVE_THRESHOLD})
+  |> aggregateWindow(every: {every}, fn: count, createEmpty: false){write.replace("{field}", '"negative_count"')}
+'''
+
+
+def task_name(measurement, rollup):
+    return f"rollup_{measurement}_{rollup['every']}"
+
+
+def task_flux(source_bucket, measurement, rollup):
+    header = f'option task = {{name: "{task_name(measurement, rollup)}", every: {rollup["every"]}, offset: 10s}}\n\n'
+    return header + rollup_flux(source_bucket, measurement, rollup, start=f"-{rollup['lookback']}")
+
+
+# --- Dashboard queries against the rollup buckets ---
+def rollup_source(measurement, fields):
+    field_filter = " or ".join(f'r._field == "{field}"' for field in fields)
+    return f'''span = int(v: v.timeRangeStop) - int(v: v.timeRangeStart)
+bucket = if span > int(v: {HOURLY_ROLLUP_AFTER}) then "{ROLLUPS[1]['bucket']}" else "{ROLLUPS[0]['bucket']}"
+
+from(bucket: bucket)
+  |> range(start: v.timeRangeStart, stop: v.timeRangeStop)
+  |> filter(fn: (r) => r._measurement == "{measurement}")
+  |> filter(fn: (r) => {field_filter})'''
+
+
+def weighted_mean_reduce():
+    return '''
+  |> reduce(
+      identity: {total: 0.0, n: 0.0},
+      fn: (r, accumulator) => ({
+          total: if r._field == "compound_sum" then accumulator.total + r._value else accumulator.total,
+          n: if r._field == "count" then accumulator.n + r._value else accumulator.n}))'''
+
+
+def dashboard_queries(measurement, raw_bucket):
+    sums = [f"{field}_sum" for field in SENTIMENT_FIELDS]
+    means = ", ".join(f"{field}: r.{field}_sum / r.count" for field in SENTIMENT_FIELDS)
+    return {
+        "sentiment_over_time": rollup_source(measurement, sums + ["count"]) + f'''
+  |> group(columns: ["_field"])
+  |> aggregateWindow(every: v.windowPeriod, fn: sum, createEmpty: false)
+  |> group()
+  |> pivot(rowKey: ["_time"], columnKey: ["_field"], valueColumn: "_value")
+  |> map(fn: (r) => ({{_time: r._time, {means}}}))''',
+        "by_scenario": rollup_source(measurement, ["compound_sum", "count"]) + '''
+  |> group(columns: ["scenario"])''' + weighted_mean_reduce() + '''
+  |> map(fn: (r) => ({scenario: r.scenario, compound: r.total / r.n}))
+  |> group()''',
+        "average": rollup_source(measurement, ["compound_sum", "count"]) + '''
+  |> group()''' + weighted_mean_reduce() + '''
+  |> map(fn: (r) => ({_value: r.total / r.n}))''',
+        "negative_count": rollup_source(measurement, ["negative_count"]) + '''
+  |> group()
+  |> sum()''',
+        # Free text cannot be rolled up; bounded to the latest rows instead
+        "recent_transcripts": f'''from(bucket: "{raw_bucket}")
+  |> range(start: v.timeRangeStart, stop: v.timeRangeStop)
+  |> filter(fn: (r) => r._measurement == "{measurement}" and (r._field == "transcript" or r._field == "text"))
+  |> group()
+  |> sort(columns: ["_time"], desc: true)
+  |> limit(n: 50)
+  |> keep(columns: ["_time", "scenario", "channel", "_value"])''',
+    }
+
+
+def build_dashboard(template, source="voice"):
+    raw_bucket, measurement = SOURCES[source]
+    queries = dashboard_queries(measurement, raw_bucket)
+    datasource = {"type": "influxdb", "uid": DATASOURCE_UID}
+    label = source.capitalize()  # "Voice" / "Text"
+    recent = "Recent Transcripts" if source == "voice" else "Recent Complaints"
+    layout = [
+        ("sentiment_over_time", f"Sentiment Scores ({label} Complaints)", "timeseries", {"h": 9, "w": 24, "x": 0, "y": 0}),
+        ("by_scenario", "Average Sentiment by Scenario", "barchart", {"h": 8, "w": 12, "x": 0, "y": 9}),
+        ("average", "Average Sentiment", "gauge", {"h": 8, "w": 6, "x": 12, "y": 9}),
+        ("negative_count", "Negative Complaints", "stat", {"h": 8, "w": 6, "x": 18, "y": 9}),
+        ("recent_transcripts", recent, "table", {"h": 10, "w": 24, "x": 0, "y": 17}),
+    ]
+    panels = []
+    for panel_id, (key, title, panel_type, grid) in enumerate(layout, start=1):
+        panels.append({
+            "datasource": datasource,
+            "fieldConfig": {"defaults": {"unit": "none", "decimals": 3, "color": {"mode": "palette-classic"}},
+                            "overrides": []},
+            "gridPos": grid,
+            "id": panel_id,
+            "options": {"legend": {"displayMode": "list", "placement": "bottom"}, "tooltip": {"mode": "single"}},
+            "targets": [{"query": queries[key], "refId": "A"}],
+            "title": title,
+            "type": panel_type,
+        })
+    dashboard = dict(template)
+    dashboard["title"] = f"{label} Complaints Sentiment Dashboard"
+    dashboard["panels"] = panels
+    dashboard["version"] = template.get("version", 0) + 1
+    return dashboard
+
+
+# --- InfluxDB management ---
+def ensure_rollup_bucket(client, rollup, org):
+    buckets_api = client.buckets_api()
+    retention = BucketRetentionRules(type="expire", every_seconds=int(rollup["retention"].total_seconds()))
+    bucket = buckets_api.find_bucket_by_name(rollup["bucket"])
+    if bucket is None:
+        buckets_api.create_bucket(bucket_name=rollup["bucket"], org=org, retention_rules=retention)
+        logging.info(f"Created rollup bucket '{rollup['bucket']}' (retention {rollup['retention']})")
+    elif [rule.every_seconds for rule in bucket.retention_rules or []] != [retention.every_seconds]:
+        bucket.retention_rules = [retention]
+        buckets_api.update_bucket(bucket=bucket)
+        logging.info(f"Updated retention of '{rollup['bucket']}' to {rollup['retention']}")
+    else:
+        logging.info(f"Rollup bucket '{rollup['bucket']}' already exists.")
+
+
+def ensure_task(client, org_id, source_bucket, measurement, rollup):
+    tasks_api = client.tasks_api()
+    name = task_name(measurement, rollup)
+    flux = task_flux(source_bucket, measurement, rollup)
+    existing = tasks_api.find_tasks(name=name)
+    if existing:
+        tasks_api.update_task_request(task_id=existing[0].id,
+                                      task_update_request=TaskUpdateRequest(flux=flux, status="active"))
+        logging.info(f"Updated task '{name}'")
+    else:
+        tasks_api.create_task(task_create_request=TaskCreateRequest(
+            flux=flux, org_id=org_id, status="active", description=f"{rollup['every']} rollup of {measurement}"))
+        logging.info(f"Created task '{name}'")
+
+
+def apply(client):
+    org_id = client.organizations_api().find_organizations(org=INFLUXDB_ORG)[0].id
+    for rollup in ROLLUPS:
+        ensure_rollup_bucket(client, rollup, INFLUXDB_ORG)
+        for source_bucket, measurement in SOURCES.values():
+            ensure_task(client, org_id, source_bucket, measurement, rollup)
+
+
+def backfill(client, start, chunk=timedelta(days=1)):
+    # Runs the task body over history one chunk at a time; rewriting a window is idempotent.
+    # Chunk bounds fall on the coarsest rollup period, so no window is split across two chunks (the second
+    # write would replace the first with a partial sum), and the still-open window is left to the task
+    query_api = client.query_api()
+    period = max(parse_duration(rollup["every"]) for rollup in ROLLUPS)
+    chunk = max(period, chunk // period * period)
+    now = datetime.now(timezone.utc)
+    begin = now - parse_duration(start[1:]) if start.startswith("-") else datetime.fromisoformat(start)
+    if begin.tzinfo is None:
+        begin = begin.replace(tzinfo=timezone.utc)
+    begin, stop = floor_time(begin, period), floor_time(now, period)
+    while begin < stop:
+        end = min(begin + chunk, stop)
+        for source_bucket, measurement in SOURCES.values():
+            for rollup in ROLLUPS:
+                query_api.query(rollup_flux(source_bucket, measurement, rollup,
+                                            start=begin.isoformat(), stop=end.isoformat()))
+        logging.info(f"Backfilled rollups for {begin:%Y-%m-%d %H:%M} .. {end:%Y-%m-%d %H:%M}")
+        begin = end
+
+
+def floor_time(moment, period):
+    return moment - (moment - datetime(1970, 1, 1, tzinfo=timezone.utc)) % period
+
+
+def parse_duration(value):
+    units = {"m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
+    return timedelta(**{units[value[-1]]: int(value[:-1])})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage sentiment rollup buckets, tasks and dashboard queries")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("apply", help="Create/update rollup buckets and InfluxDB tasks")
+    backfill_parser = subparsers.add_parser("backfill", help="Aggregate existing raw data into the rollups")
+    backfill_parser.add_argument("--start", default="-30d", help="Relative duration (-30d) or ISO 8601 time")
+    dashboard_parser = subparsers.add_parser("dashboard", help="Write a Grafana dashboard that reads the rollups")
+    dashboard_parser.add_argument("--template", default=os.path.join(os.path.dirname(__file__), "..", "dashboard.json"))
+    dashboard_parser.add_argument("--output", default=os.path.join(os.path.dirname(__file__), "..", "dashboard.json"))
+    dashboard_parser.add_argument("--source", choices=sorted(SOURCES), default="voice")
+    args = parser.parse_args()
+
+    if args.command == "dashboard":
+        with open(args.template) as f:
+            template = json.load(f)
+        with open(args.output, "w") as f:
+            json.dump(build_dashboard(template, args.source), f, indent=2)
+            f.write("\n")
+        logging.info(f"Dashboard written to {args.output}")
+        return
+
+    client = InfluxDBClient(url=INFLUXDB_URL, token=INFLUXDB_TOKEN, org=INFLUXDB_ORG)
+    try:
+        if args.command == "apply":
+            apply(client)
+        else:
+            backfill(client, args.start)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
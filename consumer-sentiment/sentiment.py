@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from influxdb_client import InfluxDBClient
 import pandas as pd
 import matplotlib.pyplot as plt
@@ -5,6 +6,7 @@ import matplotlib.dates as mdates
 import seaborn as sns
 from dotenv import load_dotenv
 import os
+import parquet_cache
 
 # --- Load environment variables ---
 load_dotenv()
@@ -25,109 +27,247 @@ INFLUXDB_URL = "http://localhost:8086"
 INFLUXDB_TOKEN = os.getenv("INFLUXDB_TOKEN")
 INFLUXDB_ORG = "org"
 
-bucket_type = "voice"  # 'text' or 'voice'
-if bucket_type == "voice":
-    INFLUXDB_BUCKET = "voice_bucket"
-    measurement = "voice_complaints"
-elif bucket_type == "text":
-    INFLUXDB_BUCKET = "text_bucket"
-    measurement = "text_complaints"
-else:
-    raise ValueError("bucket_type must be either 'text' or 'voice'")
+bucket_types = ["text", "voice"]  # any of 'text' and 'voice', fetched concurrently
+range_start = "-14d"  # Flux duration or RFC3339 time
+range_stop = "now()"
+window = "1h"  # aggregateWindow period for the time series
+use_cache = True  # refresh only new points into the local Parquet cache and aggregate from it
+
+BUCKETS = {
+    "voice": ("voice_bucket", "voice_complaints"),
+    "text": ("text_bucket", "text_complaints"),
+}
+for bucket_type in bucket_types:
+    if bucket_type not in BUCKETS:
+        raise ValueError("bucket_type must be either 'text' or 'voice'")
+
+SENTIMENT_FIELDS = ["neg", "neu", "pos", "compound"]
+QUANTILES = [0.0, 0.25, 0.5, 0.75, 1.0]
 
 client = InfluxDBClient(url=INFLUXDB_URL, token=INFLUXDB_TOKEN, org=INFLUXDB_ORG)
 query_api = client.query_api()
 
-# --- Flux Query ---
-flux_query = f'''
-from(bucket: "{INFLUXDB_BUCKET}")
-  |> range(start: -12h)
+
+# --- Flux Queries ---
+# Every aggregation runs inside InfluxDB so only summarised rows reach pandas,
+# regardless of how many complaints fall inside the range.
+def base_query(bucket, measurement, fields=SENTIMENT_FIELDS):
+    field_set = ", ".join(f'"{field}"' for field in fields)
+    return f'''
+from(bucket: "{bucket}")
+  |> range(start: {range_start}, stop: {range_stop})
   |> filter(fn: (r) => r._measurement == "{measurement}")
-  |> filter(fn: (r) => r._field == "neg" or r._field == "neu" or r._field == "pos" or r._field == "compound")
-  |> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
-  |> sort(columns: ["_time"])
-  |> limit(n: 200)
-'''
-
-# --- Fetch and Format ---
-tables = query_api.query(flux_query)
-results = []
-for table in tables:
-    for record in table.records:
-        results.append({
-            "time": record.get_time(),
-            "neg": record.values.get("neg"),
-            "neu": record.values.get("neu"),
-            "pos": record.values.get("pos"),
-            "compound": record.values.get("compound"),
-            "scenario": record.values.get("scenario", "unknown"),
-        })
-
-df = pd.DataFrame(results)
-if df.empty:
+  |> filter(fn: (r) => contains(value: r._field, set: [{field_set}]))'''
+
+
+def time_series_query(bucket, measurement):
+    # message_id/customer_id tags make every point its own series, so regroup by field before windowing
+    return base_query(bucket, measurement) + f'''
+  |> group(columns: ["_field"])
+  |> aggregateWindow(every: {window}, fn: mean, createEmpty: false)
+  |> group()
+  |> pivot(rowKey: ["_time"], columnKey: ["_field"], valueColumn: "_value")
+  |> keep(columns: ["_time", {", ".join(f'"{field}"' for field in SENTIMENT_FIELDS)}])
+  |> sort(columns: ["_time"])'''
+
+
+def mean_query(bucket, measurement):
+    return base_query(bucket, measurement) + '''
+  |> group(columns: ["_field"])
+  |> mean()
+  |> group()'''
+
+
+def distribution_query(bucket, measurement):
+    quantile_tables = ",\n    ".join(
+        f'data |> quantile(q: {q}, method: "estimate_tdigest") |> set(key: "quantile", value: "{q}")'
+        for q in QUANTILES
+    )
+    return "data = " + base_query(bucket, measurement).lstrip() + f'''
+  |> group(columns: ["_field"])
+
+union(tables: [
+    {quantile_tables}
+])
+  |> group()'''
+
+
+def scenario_query(bucket, measurement):
+    return base_query(bucket, measurement) + '''
+  |> group(columns: ["scenario", "_field"])
+  |> mean()
+  |> group()'''
+
+
+def hourly_query(bucket, measurement):
+    return 'import "date"\n' + base_query(bucket, measurement, ["compound"]) + '''
+  |> map(fn: (r) => ({r with hour: date.hour(t: r._time)}))
+  |> group(columns: ["hour"])
+  |> reduce(
+      identity: {volume: 0, total: 0.0},
+      fn: (r, accumulator) => ({volume: accumulator.volume + 1, total: accumulator.total + r._value}))
+  |> map(fn: (r) => ({hour: r.hour, volume: r.volume, compound: r.total / float(v: r.volume)}))
+  |> group()
+  |> sort(columns: ["hour"])'''
+
+
+# --- Local aggregations over the Parquet cache (same frame shapes as the Flux queries) ---
+def local_time_series(df):
+    # Flux windows are [start, stop) labelled by their stop time
+    resampled = df.set_index("_time")[SENTIMENT_FIELDS].resample(
+        parquet_cache.to_timedelta(window), closed="left", label="right").mean()
+    return resampled.dropna(how="all").reset_index()
+
+
+def local_mean(df):
+    return df[SENTIMENT_FIELDS].mean().rename_axis("_field").reset_index(name="_value")
+
+
+def local_distribution(df):
+    quantiles = df[SENTIMENT_FIELDS].quantile(QUANTILES)
+    quantiles.index = [str(q) for q in QUANTILES]
+    return quantiles.rename_axis("quantile").reset_index().melt(
+        id_vars="quantile", var_name="_field", value_name="_value")
+
+
+def local_scenario(df):
+    return df.groupby("scenario")[SENTIMENT_FIELDS].mean().reset_index().melt(
+        id_vars="scenario", var_name="_field", value_name="_value")
+
+
+def local_hourly(df):
+    hourly = df.groupby(df["_time"].dt.hour)["compound"].agg(volume="count", compound="mean")
+    return hourly.rename_axis("hour").reset_index()
+
+
+ENABLED_QUERIES = {
+    "time_series": (plot_time_series, time_series_query, local_time_series),
+    "mean": (plot_mean_sentiment, mean_query, local_mean),
+    "distribution": (plot_distribution, distribution_query, local_distribution),
+    "scenario": (plot_by_scenario, scenario_query, local_scenario),
+    "hourly": (plot_volume_and_sentiment, hourly_query, local_hourly),
+}
+
+
+# --- Fetch ---
+def query_frame(flux_query):
+    # query_data_frame streams the annotated CSV response straight into pandas
+    frames = query_api.query_data_frame(flux_query)
+    if isinstance(frames, list):
+        frames = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    return frames.drop(columns=["result", "table"], errors="ignore")
+
+
+def fetch_all():
+    jobs = {}
+    with ThreadPoolExecutor(max_workers=max(1, len(bucket_types) * len(ENABLED_QUERIES))) as pool:
+        for bucket_type in bucket_types:
+            bucket, measurement = BUCKETS[bucket_type]
+            for name, (enabled, build_query, _) in ENABLED_QUERIES.items():
+                if enabled:
+                    jobs[(bucket_type, name)] = pool.submit(query_frame, build_query(bucket, measurement))
+    return {key: job.result() for key, job in jobs.items()}
+
+
+def fetch_all_cached():
+    with ThreadPoolExecutor(max_workers=len(bucket_types)) as pool:
+        refreshes = [
+            pool.submit(parquet_cache.refresh, query_api, *BUCKETS[bucket_type], SENTIMENT_FIELDS, range_start)
+            for bucket_type in bucket_types
+        ]
+        for refresh in refreshes:
+            refresh.result()
+
+    start, stop = parquet_cache.resolve_time(range_start), parquet_cache.resolve_time(range_stop)
+    frames = {}
+    for bucket_type in bucket_types:
+        df = parquet_cache.load(*BUCKETS[bucket_type], start, stop, columns=["_time", "scenario", *SENTIMENT_FIELDS])
+        for name, (enabled, _, aggregate) in ENABLED_QUERIES.items():
+            if enabled:
+                frames[(bucket_type, name)] = aggregate(df) if not df.empty else pd.DataFrame()
+    return frames
+
+
+frames = fetch_all_cached() if use_cache else fetch_all()
+if all(df.empty for df in frames.values()):
     print("No data found.")
     exit()
 
-df["time"] = pd.to_datetime(df["time"])
-
 # --- Plotting Section ---
+for bucket_type in bucket_types:
+    label = bucket_type.title()
+
+    df = frames.get((bucket_type, "time_series"))
+    if df is not None and not df.empty:
+        df["_time"] = pd.to_datetime(df["_time"])
+        plt.figure(figsize=(12, 7))
+        plt.plot(df["_time"], df["neg"], label="Negative", color='red', marker='o', markevery=4)
+        plt.plot(df["_time"], df["neu"], label="Neutral", color='gray', linestyle='--', marker='s', markevery=4)
+        plt.plot(df["_time"], df["pos"], label="Positive", color='green', linestyle='-.', marker='^', markevery=4)
+        plt.plot(df["_time"], df["compound"], label="Compound", color='blue', linestyle=':', marker='d', markevery=4)
+        plt.title(f"Sentiment Over Time ({label} Complaints, {window} mean)")
+        plt.xlabel("Timestamp")
+        plt.ylabel("Sentiment Score")
+        plt.ylim(-1, 1)
+        plt.legend()
+        plt.grid(True)
+        plt.gca().xaxis.set_major_locator(mdates.AutoDateLocator())
+        plt.gca().xaxis.set_major_formatter(mdates.DateFormatter('%m-%d %H:%M'))
+        plt.xticks(rotation=45, ha='right')
+        plt.tight_layout()
+        plt.show()
+
+    df = frames.get((bucket_type, "mean"))
+    if df is not None and not df.empty:
+        mean_values = df.set_index("_field")["_value"].reindex(SENTIMENT_FIELDS)
+        mean_values.plot(kind="bar", color=["red", "gray", "green", "blue"], title=f"Mean Sentiment Scores ({label})")
+        plt.ylim(-1, 1)
+        plt.ylabel("Score")
+        plt.tight_layout()
+        plt.show()
+
+    df = frames.get((bucket_type, "distribution"))
+    if df is not None and not df.empty:
+        # Box statistics come from server-side quantiles; whiskers span min..max
+        quantiles = df.pivot(index="_field", columns="quantile", values="_value").reindex(SENTIMENT_FIELDS)
+        stats = [
+            {"label": field, "whislo": row["0.0"], "q1": row["0.25"], "med": row["0.5"],
+             "q3": row["0.75"], "whishi": row["1.0"], "fliers": []}
+            for field, row in quantiles.iterrows()
+        ]
+        fig, ax = plt.subplots(figsize=(10, 6))
+        ax.bxp(stats, showfliers=False)
+        ax.set_title(f"Sentiment Score Distribution ({label})")
+        ax.set_ylim(-1, 1)
+        plt.tight_layout()
+        plt.show()
+
+    df = frames.get((bucket_type, "scenario"))
+    if df is not None and not df.empty and "scenario" in df.columns:
+        grouped = df.pivot(index="scenario", columns="_field", values="_value")[SENTIMENT_FIELDS]
+        grouped.plot(kind="bar", figsize=(12, 6), colormap="coolwarm", title=f"Average Sentiment per Scenario ({label})")
+        plt.ylabel("Sentiment Score")
+        plt.ylim(-1, 1)
+        plt.tight_layout()
+        plt.show()
+
+    df = frames.get((bucket_type, "hourly"))
+    if df is not None and not df.empty:
+        hourly = df.set_index("hour")
+        volume = hourly["volume"]
+        avg_sentiment = hourly["compound"]
+
+        fig, ax1 = plt.subplots(figsize=(12, 6))
+        ax2 = ax1.twinx()
+        volume.plot(ax=ax1, kind="bar", alpha=0.4, color="gray", label="Volume")
+        avg_sentiment.plot(ax=ax2, color="blue", marker="o", label="Compound", use_index=False)
+
+        ax1.set_ylabel("Complaint Volume")
+        ax2.set_ylabel("Mean Compound Sentiment")
+        ax1.set_xlabel("Hour of Day (UTC)")
+        plt.title(f"Complaint Volume & Sentiment Over the Day ({label})")
+        fig.legend(loc="upper left")
+        plt.tight_layout()
+        plt.show()
 
-if plot_time_series:
-    plt.figure(figsize=(12, 7))
-    plt.plot(df["time"], df["neg"], label="Negative", color='red', marker='o', markevery=4)
-    plt.plot(df["time"], df["neu"], label="Neutral", color='gray', linestyle='--', marker='s', markevery=4)
-    plt.plot(df["time"], df["pos"], label="Positive", color='green', linestyle='-.', marker='^', markevery=4)
-    plt.plot(df["time"], df["compound"], label="Compound", color='blue', linestyle=':', marker='d', markevery=4)
-    plt.title(f"Sentiment Over Time ({bucket_type.title()} Complaints)")
-    plt.xlabel("Timestamp")
-    plt.ylabel("Sentiment Score")
-    plt.ylim(-1, 1)
-    plt.legend()
-    plt.grid(True)
-    plt.gca().xaxis.set_major_locator(mdates.AutoDateLocator())
-    plt.gca().xaxis.set_major_formatter(mdates.DateFormatter('%H:%M:%S'))
-    plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
-    plt.show()
-
-if plot_mean_sentiment:
-    mean_values = df[["neg", "neu", "pos", "compound"]].mean()
-    mean_values.plot(kind="bar", color=["red", "gray", "green", "blue"], title="Mean Sentiment Scores")
-    plt.ylim(-1, 1)
-    plt.ylabel("Score")
-    plt.tight_layout()
-    plt.show()
-
-if plot_distribution:
-    plt.figure(figsize=(10, 6))
-    sns.boxplot(data=df[["neg", "neu", "pos", "compound"]])
-    plt.title("Sentiment Score Distribution")
-    plt.ylim(-1, 1)
-    plt.tight_layout()
-    plt.show()
-
-if plot_by_scenario and "scenario" in df.columns:
-    grouped = df.groupby("scenario")[["neg", "neu", "pos", "compound"]].mean()
-    grouped.plot(kind="bar", figsize=(12, 6), colormap="coolwarm", title="Average Sentiment per Scenario")
-    plt.ylabel("Sentiment Score")
-    plt.ylim(-1, 1)
-    plt.tight_layout()
-    plt.show()
-
-if plot_volume_and_sentiment:
-    df["hour"] = df["time"].dt.hour
-    volume = df.groupby("hour").size()
-    avg_sentiment = df.groupby("hour")["compound"].mean()
-
-    fig, ax1 = plt.subplots(figsize=(12, 6))
-    ax2 = ax1.twinx()
-    volume.plot(ax=ax1, kind="bar", alpha=0.4, color="gray", label="Volume")
-    avg_sentiment.plot(ax=ax2, color="blue", marker="o", label="Compound")
-
-    ax1.set_ylabel("Complaint Volume")
-    ax2.set_ylabel("Mean Compound Sentiment")
-    ax1.set_xlabel("Hour of Day")
-    plt.title("Complaint Volume & Sentiment Over the Day")
-    fig.legend(loc="upper left")
-    plt.tight_layout()
-    plt.show()
+client.close()
@@ -1,6 +1,7 @@
 import pika
-import json
+import io
 import os
+import hashlib
 import logging
 import tempfile
 import wave
@@ -10,10 +11,16 @@ import signal
 from datetime import datetime
 
 from minio import Minio
+import numpy as np
+import soundfile as sf
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-import whisper
 from influxdb_client import InfluxDBClient, Point, WritePrecision
 
+import lanes
+import messages
+import quality
+import transcription
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
 
 # --- Utility ---
@@ -40,16 +47,26 @@ INFLUXDB_URL_LOCAL = get_env_var("INFLUXDB_URL")
 INFLUXDB_ORG = get_env_var("INFLUXDB_ORG")
 INFLUXDB_BUCKET_VOICE = get_env_var("INFLUXDB_BUCKET")
 INFLUXDB_TOKEN = get_env_var("INFLUXDB_TOKEN")
+PIPELINE_BACKEND = os.getenv("PIPELINE_BACKEND", "docker")  # 'docker' or 'local' (in-process stand-ins)
 
 MAX_RETRIES = 5
 RETRY_DELAY = 5  # seconds
 HEARTBEAT_INTERVAL = 60  # seconds
+WHISPER_SAMPLE_RATE = 16000  # Whisper takes float32 arrays at this rate
+# Decoding profile (transcription.py) per quality tier (quality.py); the first is this deployment's full quality
+WHISPER_PROFILES = quality.per_tier(os.getenv("WHISPER_PROFILES", "balanced,fast"))
 
 # --- Clients ---
-minio_client = Minio(MINIO_ENDPOINT, access_key=MINIO_ACCESS_KEY, secret_key=MINIO_SECRET_KEY, secure=False)
+if PIPELINE_BACKEND == "local":
+    from local_backends import local_object_store, local_influx_client
+    minio_client = local_object_store()
+    influx_client = local_influx_client()
+else:
+    minio_client = Minio(MINIO_ENDPOINT, access_key=MINIO_ACCESS_KEY, secret_key=MINIO_SECRET_KEY, secure=False)
+    influx_client = InfluxDBClient(url=INFLUXDB_URL_LOCAL, token=INFLUXDB_TOKEN, org=INFLUXDB_ORG)
 analyzer = SentimentIntensityAnalyzer()
-whisper_model = whisper.load_model("base")
-influx_client = InfluxDBClient(url=INFLUXDB_URL_LOCAL, token=INFLUXDB_TOKEN, org=INFLUXDB_ORG)
+transcriber = transcription.Transcriber("whisper", WHISPER_PROFILES)
+quality_policy = quality.QualityPolicy(QUEUE_NAME)
 write_api = influx_client.write_api(write_precision=WritePrecision.NS)
 
 # --- Ensure InfluxDB Bucket Exists ---
@@ -64,8 +81,40 @@ def ensure_bucket_exists(client, bucket_name, org):
         logging.info(f"Bucket '{bucket_name}' created.")
 
 # --- Download and Validate Audio ---
-def download_audio(object_name):
+def decode_audio(data):
+    """Encoded WAV/FLAC/Opus bytes -> 16 kHz mono float32, which Whisper takes instead of a file path."""
+    samples, rate = sf.read(io.BytesIO(data), dtype="float32", always_2d=True)
+    samples = samples.mean(axis=1)
+    if rate == WHISPER_SAMPLE_RATE:
+        return samples
+    # Band-limited FFT resampling; producers set AUDIO_SAMPLE_RATE=16000 to skip this
+    length = int(round(len(samples) * WHISPER_SAMPLE_RATE / rate))
+    spectrum = np.fft.rfft(samples)[:length // 2 + 1]
+    return (np.fft.irfft(spectrum, length) * (length / len(samples))).astype(np.float32)
+
+
+def fetch_audio(object_name, audio_info):
+    # One GET into memory, decoded in-process: no stat, no temp file, no ffmpeg subprocess
+    response = minio_client.get_object(MINIO_BUCKET, object_name)
     try:
+        data = response.read()
+    finally:
+        response.close()
+        response.release_conn()
+
+    if hashlib.sha256(data).hexdigest() != audio_info.sha256:
+        raise Exception(f"Content hash mismatch for {object_name}")
+    logging.info(f"Downloaded audio: {object_name} ({audio_info.format}, {len(data)} bytes, "
+                 f"{audio_info.duration_s}s at {audio_info.sample_rate} Hz)")
+    return decode_audio(data)
+
+
+def download_audio(object_name, audio_info=None):
+    try:
+        # Messages from the current producer describe the audio; older ones are stat'ed and opened instead
+        if audio_info:
+            return fetch_audio(object_name, audio_info)
+
         stat = minio_client.stat_object(MINIO_BUCKET, object_name)
         logging.info(f"Object '{object_name}' found in MinIO bucket '{MINIO_BUCKET}', size: {stat.size} bytes")
 
@@ -86,6 +135,9 @@ def download_audio(object_name):
 
 # --- RabbitMQ Connection ---
 def connect_to_rabbitmq():
+    if PIPELINE_BACKEND == "local":
+        from local_backends import connect_local_broker
+        return connect_local_broker()
     parameters = pika.ConnectionParameters(
         host=RABBITMQ_HOST_LOCAL,
         port=RABBITMQ_PORT,
@@ -124,19 +176,20 @@ def on_message(channel, method, properties, body):
 
     try:
         logging.info(f"Received message: {body}")
-        message = json.loads(body)
-        message_id = message.get("id") or message.get("message_id") or "unknown"
-        object_name = message.get("object_name")
-        scenario = message.get("scenario", "unknown")
-        customer_id = message.get("customer_id", "unknown")
-        channel_source = message.get("channel", "unknown")
+        message = messages.VOICE.decode(body, properties.content_type)
+        message_id = message.message_id
+        object_name = message.object_name
+        scenario = message.scenario
+        customer_id = message.customer_id
+        channel_source = message.channel
 
         if not object_name:
             raise ValueError(f"Message {message_id} missing 'object_name'")
 
-        audio_path = download_audio(object_name)
-        result = whisper_model.transcribe(audio_path)
-        transcript = result.get("text", "").strip()
+        # Samples for messages carrying audio info, a temp WAV path for older ones
+        audio = download_audio(object_name, message.audio)
+        tier = quality_policy.observe(method, properties)
+        transcript, _ = transcriber.transcribe(audio, WHISPER_PROFILES[quality.QUALITY_TIERS.index(tier)])
 
         if not transcript:
             raise ValueError(f"Empty transcript for message {message_id}")
@@ -149,6 +202,7 @@ def on_message(channel, method, properties, body):
             .tag("scenario", scenario)
             .tag("customer_id", customer_id)
             .tag("channel", channel_source)
+            .tag("quality_tier", tier)
             .field("transcript", transcript[:5000])
             .field("neg", sentiment["neg"])
             .field("neu", sentiment["neu"])
@@ -183,18 +237,17 @@ def main():
     channel = connection.channel()
     channel.queue_declare(queue=QUEUE_NAME, durable=True)
 
-    # Set prefetch count to 1 for fair dispatch
-    channel.basic_qos(prefetch_count=1)
 
     # Register signal handlers for graceful shutdown
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
 
-    channel.basic_consume(queue=QUEUE_NAME, on_message_callback=on_message, auto_ack=False)
+    # Fraud lane first, weighted-fair against the rest (lanes.py)
+    consumer = lanes.LaneConsumer(connection, channel, QUEUE_NAME, should_stop=lambda: stop_consuming)
 
     logging.info("Starting consuming...")
     try:
-        channel.start_consuming()
+        consumer.start_consuming(on_message)
     except Exception as e:
         logging.error(f"Consumer stopped with error: {e}")
     finally:
@@ -0,0 +1,223 @@
+import os
+import json
+import math
+import time
+import socket
+import logging
+from collections import deque
+
+# Priority lanes: producers route PRIORITY_SCENARIOS (fraud by default) to <queue>.priority and everything
+# else to <queue>. LaneConsumer consumes both on one channel and hands messages to the callback in
+# weighted-fair order: while both lanes have a backlog, PRIORITY_WEIGHT priority messages go through for every
+# normal one, so fraud is drained first without starving the rest. Every service keeps an identical copy.
+# Each report is also published to the METRICS_EXCHANGE fanout for the producer-side autoscaler.py.
+# PrefetchController sizes prefetch from the measured service time and broker round trip, so a 0.5 ms VADER
+# consumer keeps a pipeline of deliveries while a 60 s Whisper consumer holds one.
+
+PRIORITY_SUFFIX = ".priority"
+PRIORITY_WEIGHT = int(os.getenv("PRIORITY_WEIGHT", 4))
+LANE_REPORT_INTERVAL = float(os.getenv("LANE_REPORT_INTERVAL", 15))  # seconds between per-lane lag reports
+PUBLISHED_AT_HEADER = "x-published-at"  # epoch seconds, stamped by the producers' ConfirmedPublisher
+METRICS_EXCHANGE = "consumer_metrics"  # fanout; the autoscaler binds a private queue to it
+CONSUMER_ID = f"{socket.gethostname()}:{os.getpid()}"  # the container id under compose
+
+ADAPTIVE_PREFETCH = os.getenv("ADAPTIVE_PREFETCH", "1") == "1"
+PREFETCH_MIN = int(os.getenv("PREFETCH_MIN", 1))
+PREFETCH_MAX = int(os.getenv("PREFETCH_MAX", 200))
+PREFETCH_MAX_HOLD_S = float(os.getenv("PREFETCH_MAX_HOLD_S", 2))  # work held back from other replicas, per lane
+PREFETCH_RTT_COVER = float(os.getenv("PREFETCH_RTT_COVER", 2))  # round trips' worth of deliveries kept in flight
+PREFETCH_ADAPT_INTERVAL = float(os.getenv("PREFETCH_ADAPT_INTERVAL", 10))  # seconds between adjustments
+
+
+def priority_queue(queue):
+    return f"{queue}{PRIORITY_SUFFIX}"
+
+
+def percentile(values, q):
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+class Lane:
+    def __init__(self, queue, weight):
+        self.queue = queue
+        self.weight = weight
+        self.current = 0  # smooth weighted round-robin credit
+        self.consumer_tag = None
+        self.buffer = deque()  # deliveries received but not yet handed to the callback
+        self.count = 0
+        self.busy_s = 0.0  # time spent in the callback since the last report
+        self.lags = []  # seconds from publish to processing since the last report
+
+    def observe(self, properties):
+        self.count += 1
+        published_at = (properties.headers or {}).get(PUBLISHED_AT_HEADER)
+        if published_at is not None:
+            self.lags.append(max(0.0, time.time() - float(published_at)))
+
+    def summary(self):
+        lags = sorted(self.lags)
+        mean = sum(lags) / len(lags) if lags else 0.0
+        return (f"{self.queue}: {self.count} msgs, lag mean {mean:.2f}s p50 {percentile(lags, 0.5):.2f}s "
+                f"p99 {percentile(lags, 0.99):.2f}s, {len(self.buffer)} buffered")
+
+    def metrics(self):
+        lags = sorted(self.lags)
+        return {"messages": self.count, "busy_s": round(self.busy_s, 6),
+                "lag_mean_s": round(sum(lags) / len(lags), 3) if lags else 0.0, "lag_p99_s": round(percentile(lags, 0.99), 3)}
+
+
+def pick(lanes, has_work=lambda lane: bool(lane.buffer)):
+    """Smooth weighted round-robin over the lanes that have work; None when all are empty."""
+    ready = [lane for lane in lanes if has_work(lane)]
+    if not ready:
+        return None
+    for lane in ready:
+        lane.current += lane.weight
+    chosen = max(ready, key=lambda lane: lane.current)
+    chosen.current -= sum(lane.weight for lane in ready)
+    return chosen
+
+
+class PrefetchController:
+    """
+    Enough deliveries in flight to cover PREFETCH_RTT_COVER broker round trips of service time, so the worker
+    never waits on the network, but no more than PREFETCH_MAX_HOLD_S of work, which other replicas could be doing.
+    """
+
+    def __init__(self, prefetch=PREFETCH_MIN, minimum=PREFETCH_MIN, maximum=PREFETCH_MAX, hold_s=PREFETCH_MAX_HOLD_S):
+        self.prefetch = prefetch
+        self.minimum = minimum
+        self.maximum = maximum
+        self.hold_s = hold_s
+        self.service_s = None  # moving averages over adjustment windows
+        self.rtt_s = None
+        self.window = [0, 0.0]  # messages and busy seconds since the last update
+
+    @staticmethod
+    def _average(current, sample, alpha=0.5):
+        return sample if current is None else (1 - alpha) * current + alpha * sample
+
+    def record_service(self, seconds):
+        self.window[0] += 1
+        self.window[1] += seconds
+
+    def record_rtt(self, seconds):
+        self.rtt_s = self._average(self.rtt_s, seconds)
+
+    def target(self):
+        if self.service_s is None or self.rtt_s is None:
+            return self.prefetch
+        service_s = max(self.service_s, 1e-6)
+        cover = math.ceil(PREFETCH_RTT_COVER * self.rtt_s / service_s) + 1
+        hold = max(1, int(self.hold_s / service_s))
+        return max(self.minimum, min(self.maximum, cover, hold))
+
+    def update(self):
+        """The new prefetch, or None to keep the current one (changes under 25% are not worth a resubscribe)."""
+        count, busy_s = self.window
+        if count:
+            self.service_s = self._average(self.service_s, busy_s / count)
+            self.window = [0, 0.0]
+        target = self.target()
+        if abs(target - self.prefetch) < max(1, 0.25 * self.prefetch):
+            return None
+        self.prefetch = target
+        return target
+
+    def metrics(self):
+        return {"prefetch": self.prefetch, "service_ms": round(1000 * (self.service_s or 0), 3),
+                "rtt_ms": round(1000 * (self.rtt_s or 0), 3)}
+
+
+class LaneConsumer:
+    def __init__(self, connection, channel, queue, prefetch=1, weight=PRIORITY_WEIGHT, priority_arguments=None,
+                 should_stop=None, adaptive=ADAPTIVE_PREFETCH):
+        self.connection = connection
+        self.channel = channel
+        self.lanes = [Lane(priority_queue(queue), weight), Lane(queue, 1)]
+        self.controller = PrefetchController(prefetch)
+        self.adaptive = adaptive
+        self.priority_arguments = priority_arguments  # must match what the producer declares the lane with
+        self.should_stop = should_stop or (lambda: False)  # checked between messages, e.g. a signal flag
+        self.stopping = False
+        self.last_report = self.last_adapt = time.monotonic()
+
+    def subscribe(self, lane):
+        # Per-consumer prefetch; the priority lane keeps `weight` deliveries in hand so the schedule
+        # is not decided by which delivery happens to arrive first
+        self.channel.basic_qos(prefetch_count=self.controller.prefetch * lane.weight)
+        lane.consumer_tag = self.channel.basic_consume(queue=lane.queue, auto_ack=False,
+                                                       on_message_callback=lambda _ch, method, properties, body:
+                                                       lane.buffer.append((method, properties, body)))
+
+    def adapt(self):
+        started_at = time.perf_counter()
+        self.channel.queue_declare(queue=self.lanes[-1].queue, passive=True)
+        self.controller.record_rtt(time.perf_counter() - started_at)
+        self.last_adapt = time.monotonic()
+        previous = self.controller.prefetch
+        if self.controller.update() is None:
+            return
+        # A consumer's prefetch is fixed when it subscribes. Buffered deliveries stay valid to ack, and pika
+        # requeues the ones not dispatched yet
+        for lane in self.lanes:
+            self.channel.basic_cancel(lane.consumer_tag)
+            self.subscribe(lane)
+        logging.info(f"[Lanes] Prefetch {previous} -> {self.controller.prefetch} "
+                     f"(service {self.controller.service_s * 1000:.2f} ms, broker rtt {self.controller.rtt_s * 1000:.2f} ms)")
+
+    def start_consuming(self, callback):
+        self.channel.queue_declare(queue=self.lanes[0].queue, durable=True, arguments=self.priority_arguments)
+        declare_metrics(self.channel)
+        for lane in self.lanes:
+            self.subscribe(lane)
+        logging.info(f"[Lanes] Consuming {self.lanes[0].queue} and {self.lanes[1].queue} "
+                     f"({self.lanes[0].weight}:1 while both have a backlog, "
+                     f"prefetch {self.controller.prefetch}{' adaptive' if self.adaptive else ''})")
+
+        while not self.stopping and not self.should_stop() and self.connection.is_open:
+            lane = pick(self.lanes)
+            if lane is None:
+                self.connection.process_data_events(time_limit=1)
+            else:
+                method, properties, body = lane.buffer.popleft()
+                lane.observe(properties)
+                started_at = time.perf_counter()
+                callback(self.channel, method, properties, body)
+                elapsed = time.perf_counter() - started_at
+                lane.busy_s += elapsed
+                self.controller.record_service(elapsed)
+                self.connection.process_data_events(time_limit=0)
+            if self.adaptive and time.monotonic() - self.last_adapt >= PREFETCH_ADAPT_INTERVAL:
+                self.adapt()
+            if time.monotonic() - self.last_report >= LANE_REPORT_INTERVAL:
+                self.report()
+
+    def stop_consuming(self):
+        self.stopping = True
+
+    def report(self):
+        report(self.lanes, self.channel, time.monotonic() - self.last_report, self.controller.metrics())
+        self.last_report = time.monotonic()
+
+
+def declare_metrics(channel):
+    channel.exchange_declare(exchange=METRICS_EXCHANGE, exchange_type="fanout", durable=True)
+
+
+def report(lanes, channel=None, interval_s=LANE_REPORT_INTERVAL, extra=None):
+    """Logs, publishes to METRICS_EXCHANGE (with a channel) and resets per-lane counts, busy time and lag."""
+    logging.info("[Lanes] " + " | ".join(lane.summary() for lane in lanes)
+                 + "".join(f" | {key} {value}" for key, value in (extra or {}).items()))
+    if channel is not None:
+        body = json.dumps({"queue": lanes[-1].queue, "consumer": CONSUMER_ID, "timestamp": time.time(),
+                           "interval_s": round(interval_s, 3), "lanes": {lane.queue: lane.metrics() for lane in lanes},
+                           **(extra or {})})
+        try:
+            channel.basic_publish(exchange=METRICS_EXCHANGE, routing_key=lanes[-1].queue, body=body)
+        except Exception as e:
+            logging.warning(f"[Lanes] Could not publish metrics: {e}")
+    for lane in lanes:
+        lane.count = 0
+        lane.busy_s = 0.0
+        lane.lags = []
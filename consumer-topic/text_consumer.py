@@ -1,5 +1,4 @@
 import pika
-import json
 import os
 import logging
 import traceback
@@ -10,6 +9,9 @@ from sklearn.decomposition import LatentDirichletAllocation
 from sklearn.feature_extraction.text import CountVectorizer
 from influxdb_client import InfluxDBClient, Point, WritePrecision
 
+import lanes
+import messages
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 
@@ -26,13 +28,19 @@ RABBITMQ_USER = get_env_var("RABBITMQ_USER")
 RABBITMQ_PASS = get_env_var("RABBITMQ_PASS")
 RABBITMQ_VHOST = get_env_var("RABBITMQ_VHOST")
 QUEUE_NAME = "text_complaints"
+DEAD_LETTER_EXCHANGE = "text_dlx"  # the queue's x-dead-letter-exchange, declared by text_producer.py
+DEAD_LETTER_ROUTING_KEY = "text_dead_letter"  # text_complaints_dlq.dlq is bound with it (producer/dlq)
 
 INFLUXDB_URL = get_env_var("INFLUXDB_URL")
 INFLUXDB_ORG = get_env_var("INFLUXDB_ORG")
 INFLUXDB_BUCKET_TEXT_TOPIC = get_env_var("INFLUXDB_BUCKET")
 INFLUXDB_TOKEN = get_env_var("INFLUXDB_TOKEN")
+PIPELINE_BACKEND = os.getenv("PIPELINE_BACKEND", "docker")  # 'docker' or 'local' (in-process stand-ins)
 
 def connect_to_rabbitmq():
+    if PIPELINE_BACKEND == "local":
+        from local_backends import connect_local_broker
+        return connect_local_broker()
     credentials = pika.PlainCredentials(RABBITMQ_USER, RABBITMQ_PASS)
     params = pika.ConnectionParameters(
         host=RABBITMQ_HOST,
@@ -44,6 +52,12 @@ def connect_to_rabbitmq():
     )
     return pika.BlockingConnection(params)
 
+def create_influx_client():
+    if PIPELINE_BACKEND == "local":
+        from local_backends import local_influx_client
+        return local_influx_client()
+    return InfluxDBClient(url=INFLUXDB_URL, token=INFLUXDB_TOKEN, org=INFLUXDB_ORG)
+
 def ensure_bucket_exists(client, bucket_name, org_name):
     try:
         bucket = client.buckets_api().find_bucket_by_name(bucket_name)
@@ -56,10 +70,99 @@ def ensure_bucket_exists(client, bucket_name, org_name):
     except Exception as e:
         logging.error(f"Failed to verify/create bucket '{bucket_name}': {e}")
 
+# Topic for one complaint; returns its point, or None while the model is still warming up
+def analyze(message):
+    global lda_model
+
+    complaint_text = message.complaint_text
+    message_id = message.message_id
+    scenario = message.scenario
+    customer_id = message.customer_id
+    channel_name = message.channel
+
+    if not complaint_text.strip():
+        logging.warning(f"Empty complaint text for message {message_id}")
+        return None
+
+    fit_buffer.append(complaint_text)
+
+    if lda_model is None and len(fit_buffer) >= 5:
+        X_train = vectorizer.fit_transform(fit_buffer)
+        lda_model = LatentDirichletAllocation(n_components=5, random_state=42)
+        lda_model.fit(X_train)
+        logging.info("LDA model fitted with first 5 messages.")
+        return None
+
+    if not lda_model:
+        return None
+
+    X_new = vectorizer.transform([complaint_text])
+    topic_dist = lda_model.transform(X_new)[0]
+    topic_id = topic_dist.argmax()
+    topic_prob = topic_dist[topic_id]
+
+    topic_words = vectorizer.get_feature_names_out()
+    topic_terms = lda_model.components_[topic_id]
+    top_indices = topic_terms.argsort()[-5:][::-1]
+    topic_keywords = ", ".join(topic_words[i] for i in top_indices)
+
+    point = (
+        Point("text_complaints_topic_model")
+        .tag("message_id", message_id)
+        .tag("scenario", scenario)
+        .tag("customer_id", customer_id)
+        .tag("channel", channel_name)
+        .tag("topic_id", str(topic_id))
+        .field("topic_words", topic_keywords)
+        .field("topic_probability", float(topic_prob))
+        .time(datetime.utcnow(), WritePrecision.NS)
+    )
+    logging.info(f"Processed {message_id} -> topic {topic_id} with words [{topic_keywords}]")
+    return point
+
+# A failed envelope item goes to the DLQ on its own, like a rejected message. The channel is in confirm mode, so
+# an item the broker cannot route or store raises here and the whole envelope is nacked instead of acked
+def park_item(channel, header_frame, item, error, message_id, batch_id):
+    channel.basic_publish(
+        exchange=DEAD_LETTER_EXCHANGE,
+        routing_key=DEAD_LETTER_ROUTING_KEY,
+        body=bytes(item),
+        properties=pika.BasicProperties(
+            delivery_mode=2,
+            content_type=header_frame.content_type,
+            message_id=message_id,
+            headers={"x-error-class": type(error).__name__, "x-failed-queue": QUEUE_NAME, "x-batch-id": batch_id},
+        ),
+        mandatory=True,
+    )
+
+# Envelope of many complaints: one Influx write, failed items parked one by one; returns the item count
+def process_batch(channel, header_frame, body):
+    batch = messages.unpack_batch(body, header_frame.content_type, header_frame.content_encoding)
+    points, failed = [], []
+    for item in batch.items:
+        message = None
+        try:
+            message = messages.TEXT.decode(item, header_frame.content_type)
+            point = analyze(message)
+        except Exception as e:
+            logging.error(f"Failed to process an item of batch {batch.batch_id}: {e!r}")
+            failed.append((item, e, message.message_id if message else None))
+            continue
+        if point is not None:
+            points.append(point)
+
+    if points:
+        write_api.write(bucket=INFLUXDB_BUCKET_TEXT_TOPIC, record=points)
+    for item, error, message_id in failed:
+        park_item(channel, header_frame, item, error, message_id, batch.batch_id)
+    logging.info(f"Processed batch {batch.batch_id}: {len(batch.items)} complaints, {len(failed)} parked")
+    return len(batch.items)
+
 def main():
-    global write_api, vectorizer, lda_model
+    global write_api, vectorizer, lda_model, fit_buffer
 
-    influx_client = InfluxDBClient(url=INFLUXDB_URL, token=INFLUXDB_TOKEN, org=INFLUXDB_ORG)
+    influx_client = create_influx_client()
     ensure_bucket_exists(influx_client, INFLUXDB_BUCKET_TEXT_TOPIC, INFLUXDB_ORG)
     write_api = influx_client.write_api(write_precision=WritePrecision.NS)
 
@@ -70,86 +173,58 @@ def main():
 
     conn = connect_to_rabbitmq()
     channel = conn.channel()
+    channel.confirm_delivery()  # parked envelope items are confirmed before the envelope is acked
     channel.basic_qos(prefetch_count=1)
 
-    logging.info(f"Starting live message processing for queue '{QUEUE_NAME}'...")
+    # Fraud lane first, weighted-fair against the rest (lanes.py)
+    lane_list = [lanes.Lane(lanes.priority_queue(QUEUE_NAME), lanes.PRIORITY_WEIGHT), lanes.Lane(QUEUE_NAME, 1)]
+    channel.queue_declare(queue=lane_list[0].queue, durable=True,
+                          arguments={"x-dead-letter-exchange": DEAD_LETTER_EXCHANGE})
+    lanes.declare_metrics(channel)
+    last_report = time.monotonic()
+
+    logging.info(f"Starting live message processing for queues '{lane_list[0].queue}' and '{QUEUE_NAME}'...")
 
     try:
         while True:
-            queue_state = channel.queue_declare(queue=QUEUE_NAME, passive=True)
-            message_count = queue_state.method.message_count
+            depths = {lane.queue: channel.queue_declare(queue=lane.queue, passive=True).method.message_count
+                      for lane in lane_list}
+            lane = lanes.pick(lane_list, lambda lane: depths[lane.queue] > 0)
 
-            if message_count < 1:
-                logging.info("Queue empty. Sleeping 30 seconds...")
+            if lane is None:
+                logging.info("Queues empty. Sleeping 30 seconds...")
                 time.sleep(30)
                 continue
 
-            method_frame, header_frame, body = channel.basic_get(QUEUE_NAME, auto_ack=False)
+            if time.monotonic() - last_report >= lanes.LANE_REPORT_INTERVAL:
+                lanes.report(lane_list, channel, time.monotonic() - last_report)
+                last_report = time.monotonic()
+
+            method_frame, header_frame, body = channel.basic_get(lane.queue, auto_ack=False)
             if method_frame is None:
                 logging.info("No message received despite message count, sleeping 30 seconds...")
                 time.sleep(30)
                 continue
 
+            lane.observe(header_frame)
+            started_at = time.perf_counter()
             try:
-                message = json.loads(body)
-                complaint_text = message.get("complaint_text", "")
-                message_id = message.get("message_id", "unknown")
-                scenario = message.get("scenario", "unknown")
-                customer_id = message.get("customer_id", "unknown")
-                channel_name = message.get("channel", "unknown")
-
-                if not complaint_text.strip():
-                    logging.warning(f"Empty complaint text for message {message_id}")
-                    channel.basic_ack(delivery_tag=method_frame.delivery_tag)
-                    consumed_message_count += 1
-                    logging.info(f"Total consumed messages: {consumed_message_count}")
-                    continue
-
-                fit_buffer.append(complaint_text)
-
-                if lda_model is None and len(fit_buffer) >= 5:
-                    X_train = vectorizer.fit_transform(fit_buffer)
-                    lda_model = LatentDirichletAllocation(n_components=5, random_state=42)
-                    lda_model.fit(X_train)
-                    logging.info("LDA model fitted with first 5 messages.")
-                    channel.basic_ack(delivery_tag=method_frame.delivery_tag)
-                    consumed_message_count += 1
-                    logging.info(f"Total consumed messages: {consumed_message_count}")
-                    continue
-
-                if lda_model:
-                    X_new = vectorizer.transform([complaint_text])
-                    topic_dist = lda_model.transform(X_new)[0]
-                    topic_id = topic_dist.argmax()
-                    topic_prob = topic_dist[topic_id]
-
-                    topic_words = vectorizer.get_feature_names_out()
-                    topic_terms = lda_model.components_[topic_id]
-                    top_indices = topic_terms.argsort()[-5:][::-1]
-                    topic_keywords = ", ".join(topic_words[i] for i in top_indices)
-
-                    point = (
-                        Point("text_complaints_topic_model")
-                        .tag("message_id", message_id)
-                        .tag("scenario", scenario)
-                        .tag("customer_id", customer_id)
-                        .tag("channel", channel_name)
-                        .tag("topic_id", str(topic_id))
-                        .field("topic_words", topic_keywords)
-                        .field("topic_probability", float(topic_prob))
-                        .time(datetime.utcnow(), WritePrecision.NS)
-                    )
-
-                    write_api.write(bucket=INFLUXDB_BUCKET_TEXT_TOPIC, record=point)
-                    logging.info(f"Processed {message_id} -> topic {topic_id} with words [{topic_keywords}]")
+                if header_frame.type == messages.BATCH_TYPE:
+                    consumed = process_batch(channel, header_frame, body)
+                else:
+                    point = analyze(messages.TEXT.decode(body, header_frame.content_type))
+                    if point is not None:
+                        write_api.write(bucket=INFLUXDB_BUCKET_TEXT_TOPIC, record=point)
+                    consumed = 1
 
                 channel.basic_ack(delivery_tag=method_frame.delivery_tag)
-                consumed_message_count += 1
+                consumed_message_count += consumed
                 logging.info(f"Total consumed messages: {consumed_message_count}")
 
             except Exception:
                 logging.error("Error processing message:\n" + traceback.format_exc())
                 channel.basic_nack(delivery_tag=method_frame.delivery_tag, requeue=False)
+            lane.busy_s += time.perf_counter() - started_at
 
     except KeyboardInterrupt:
         logging.info("Shutdown requested by user.")
@@ -0,0 +1,81 @@
+import os
+import logging
+
+# Named Whisper decoding profiles for the voice consumers, and producer/transcription_bench.py to compare them.
+# A profile fixes everything transcribe() used to take by default:
+#   model           Whisper size; the degraded quality tiers (quality.py) pick smaller profiles
+#   compute_type    faster-whisper's CTranslate2 type; openai-whisper runs fp16 only for "float16", else fp32
+#   beam_size       1 = greedy
+#   language        pinned ("en") skips the detection pass over the first 30 s; None detects
+#   vad             faster-whisper's Silero VAD skips silence between turns; openai-whisper has none
+#   temperature_fallback / condition_on_previous_text
+#                   re-decode hotter when a segment looks wrong / prompt each window with the previous text
+# Every service keeps an identical copy. Both backends are imported only when a model is loaded.
+
+WHISPER_BACKENDS = ("whisper", "faster-whisper")  # openai-whisper, faster-whisper (CTranslate2)
+WHISPER_SAMPLE_RATE = 16000
+FALLBACK_TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)  # both libraries' default
+
+PROFILES = {
+    "fast": {"model": "tiny", "compute_type": "int8", "beam_size": 1, "language": "en", "vad": True,
+             "temperature_fallback": False, "condition_on_previous_text": False},
+    "balanced": {"model": "base", "compute_type": "int8", "beam_size": 1, "language": "en", "vad": True,
+                 "temperature_fallback": True, "condition_on_previous_text": True},
+    "accurate": {"model": "small", "compute_type": "int8", "beam_size": 5, "language": None, "vad": False,
+                 "temperature_fallback": True, "condition_on_previous_text": True},
+}
+
+
+def get_profile(name):
+    if name not in PROFILES:
+        raise ValueError(f"Unknown Whisper profile '{name}', expected one of {', '.join(PROFILES)}")
+    return PROFILES[name]
+
+
+class Transcriber:
+    """Loads each profile's model once, on first use, and transcribes with that profile's settings."""
+
+    def __init__(self, backend, profiles=()):
+        if backend not in WHISPER_BACKENDS:
+            raise ValueError(f"Unknown Whisper backend '{backend}', expected one of {', '.join(WHISPER_BACKENDS)}")
+        self.backend = backend
+        self.models = {}  # (model, compute_type) -> loaded model, shared by profiles that agree on both
+        # Unknown names fail at startup rather than at the first backlog; the first profile is loaded up front
+        for name in profiles:
+            get_profile(name)
+        if profiles:
+            self.load(profiles[0])
+
+    def load(self, name):
+        profile = get_profile(name)
+        key = (profile["model"], profile["compute_type"])
+        if key not in self.models:
+            logging.info(f"Loading Whisper model '{profile['model']}' ({self.backend}, {profile['compute_type']}) "
+                         f"for profile '{name}'")
+            if self.backend == "whisper":
+                import whisper
+                self.models[key] = whisper.load_model(profile["model"])
+            else:
+                from faster_whisper import WhisperModel
+                self.models[key] = WhisperModel(profile["model"], compute_type=profile["compute_type"])
+        return self.models[key]
+
+    def transcribe(self, audio, name):
+        """16 kHz float32 samples or an audio file path -> (text, {"language", "duration"})."""
+        profile = get_profile(name)
+        model = self.load(name)
+        temperature = FALLBACK_TEMPERATURES if profile["temperature_fallback"] else 0.0
+        if self.backend == "whisper":
+            result = model.transcribe(audio, language=profile["language"], temperature=temperature,
+                                      beam_size=profile["beam_size"] if profile["beam_size"] > 1 else None,
+                                      condition_on_previous_text=profile["condition_on_previous_text"],
+                                      fp16=profile["compute_type"] == "float16")
+            duration = len(audio) / WHISPER_SAMPLE_RATE if not isinstance(audio, (str, os.PathLike)) else None
+            return result.get("text", "").strip(), {"language": result.get("language"), "duration": duration}
+
+        segments, info = model.transcribe(audio, language=profile["language"], temperature=temperature,
+                                          beam_size=profile["beam_size"], vad_filter=profile["vad"],
+                                          condition_on_previous_text=profile["condition_on_previous_text"])
+        # Segments are decoded lazily, as they are iterated
+        text = " ".join(segment.text for segment in segments).strip()
+        return text, {"language": info.language, "duration": info.duration}
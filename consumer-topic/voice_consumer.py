@@ -1,5 +1,4 @@
 import pika
-import json
 import os
 import logging
 import tempfile
@@ -10,9 +9,13 @@ from datetime import datetime
 from urllib.parse import urlparse
 
 from minio import Minio
-from faster_whisper import WhisperModel
 from influxdb_client import InfluxDBClient, Point, WritePrecision, BucketRetentionRules
 
+import lanes
+import messages
+import quality
+import transcription
+
 # --- Logging ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
 
@@ -39,14 +42,23 @@ INFLUXDB_URL = get_env_var("INFLUXDB_URL")
 INFLUXDB_ORG = get_env_var("INFLUXDB_ORG")
 INFLUXDB_BUCKET_VOICE_TOPIC = get_env_var("INFLUXDB_BUCKET")
 INFLUXDB_TOKEN = get_env_var("INFLUXDB_TOKEN")
+PIPELINE_BACKEND = os.getenv("PIPELINE_BACKEND", "docker")  # 'docker' or 'local' (in-process stand-ins)
+# Decoding profile (transcription.py) per quality tier (quality.py); the first is this deployment's full quality
+WHISPER_PROFILES = quality.per_tier(os.getenv("WHISPER_PROFILES", "accurate,balanced,fast"))
 
 # --- Clients ---
-minio_client = Minio(
-    MINIO_ENDPOINT,
-    access_key=MINIO_ACCESS_KEY,
-    secret_key=MINIO_SECRET_KEY,
-    secure=False,
-)
+if PIPELINE_BACKEND == "local":
+    from local_backends import local_object_store, local_influx_client
+    minio_client = local_object_store()
+    influx_client = local_influx_client()
+else:
+    minio_client = Minio(
+        MINIO_ENDPOINT,
+        access_key=MINIO_ACCESS_KEY,
+        secret_key=MINIO_SECRET_KEY,
+        secure=False,
+    )
+    influx_client = InfluxDBClient(url=INFLUXDB_URL, token=INFLUXDB_TOKEN, org=INFLUXDB_ORG)
 
 if not minio_client.bucket_exists(MINIO_BUCKET):
     minio_client.make_bucket(MINIO_BUCKET)
@@ -54,10 +66,9 @@ if not minio_client.bucket_exists(MINIO_BUCKET):
 else:
     logging.info(f"MinIO bucket '{MINIO_BUCKET}' already exists")
 
-# Use a bigger Whisper model for better transcription quality
-whisper_model = WhisperModel("small", compute_type="int8")  # Change to "medium" or "large" if needed
-
-influx_client = InfluxDBClient(url=INFLUXDB_URL, token=INFLUXDB_TOKEN, org=INFLUXDB_ORG)
+# faster-whisper (CTranslate2); the degraded tiers' smaller profiles load when first needed
+transcriber = transcription.Transcriber("faster-whisper", WHISPER_PROFILES)
+quality_policy = quality.QualityPolicy(QUEUE_NAME)
 
 # Ensure InfluxDB bucket exists
 buckets_api = influx_client.buckets_api()
@@ -124,7 +135,8 @@ def download_audio(object_name):
         bucket = MINIO_BUCKET
         obj = object_name
 
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp_file:
+    # faster-whisper decodes WAV, FLAC and Opus in-process with PyAV; keep the producer's extension
+    with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(obj)[1] or ".wav") as tmp_file:
         minio_client.fget_object(bucket, obj, tmp_file.name)
         logging.info(f"Downloaded object '{obj}' from bucket '{bucket}' to '{tmp_file.name}'")
         return tmp_file.name
@@ -143,35 +155,31 @@ def on_message(channel, method, properties, body):
     delivery_tag = method.delivery_tag
     audio_path = None
     try:
-        msg = json.loads(body)
-        message_id = msg.get("id", "unknown")
-        object_name = msg.get("object_name")
-        scenario = msg.get("scenario", "unknown")
-        customer_id = msg.get("customer_id", "unknown")
-        channel_source = msg.get("channel", "unknown")
+        msg = messages.VOICE.decode(body, properties.content_type)
+        message_id = msg.message_id
+        object_name = msg.object_name
+        scenario = msg.scenario
+        customer_id = msg.customer_id
+        channel_source = msg.channel
 
         if not object_name:
             raise ValueError("Missing 'object_name' in message")
 
         audio_path = download_audio(object_name)
 
-        segments, info = whisper_model.transcribe(audio_path)
+        tier = quality_policy.observe(method, properties)
+        raw_transcript, info = transcriber.transcribe(audio_path, WHISPER_PROFILES[quality.QUALITY_TIERS.index(tier)])
         # Log audio duration if available
-        duration_seconds = None
-        if info and isinstance(info, dict):
-            duration_seconds = info.get('duration', None)
+        duration_seconds = info.get('duration')
         if duration_seconds:
             minutes = int(duration_seconds // 60)
             seconds = duration_seconds % 60
             logging.info(f"Processing audio with duration {minutes:02d}:{seconds:05.2f}")
         # Log detected language if available
-        language = None
-        if info and isinstance(info, dict):
-            language = info.get('language', None)
+        language = info.get('language')
         if language:
             logging.info(f"Detected language '{language}'")
 
-        raw_transcript = " ".join(segment.text for segment in segments).strip()
         cleaned = clean_transcript(raw_transcript)
         logging.info(f"Transcription complete. Raw: {raw_transcript[:200]}... Cleaned: {cleaned[:200]}...")
 
@@ -181,6 +189,7 @@ def on_message(channel, method, properties, body):
             .tag("scenario", scenario)
             .tag("customer_id", customer_id)
             .tag("channel", channel_source)
+            .tag("quality_tier", tier)
             .field("transcript", cleaned[:5000])
             .time(datetime.utcnow(), WritePrecision.NS)
         )
@@ -205,6 +214,9 @@ def on_message(channel, method, properties, body):
         channel.stop_consuming()
 
 def connect_to_rabbitmq():
+    if PIPELINE_BACKEND == "local":
+        from local_backends import connect_local_broker
+        return connect_local_broker()
     params = pika.ConnectionParameters(
         host=RABBITMQ_HOST,
         port=RABBITMQ_PORT,
@@ -218,16 +230,16 @@ def connect_to_rabbitmq():
 def main():
     conn = connect_to_rabbitmq()
     channel = conn.channel()
-    channel.basic_qos(prefetch_count=1)
 
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
 
-    channel.basic_consume(queue=QUEUE_NAME, on_message_callback=on_message, auto_ack=False)
+    # Fraud lane first, weighted-fair against the rest (lanes.py)
+    consumer = lanes.LaneConsumer(conn, channel, QUEUE_NAME, should_stop=lambda: stop_consuming)
 
     logging.info("Consumer started and waiting for messages...")
     try:
-        channel.start_consuming()
+        consumer.start_consuming(on_message)
     finally:
         if channel.is_open:
             channel.close()
@@ -0,0 +1,147 @@
+import io
+import os
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import subprocess
+
+import numpy as np
+import soundfile as sf
+
+import voice_producer
+from audio_codec import AUDIO_FORMATS, encode, decode
+from tts_cache import to_pcm16
+from utils import generate_customer, generate_dialogue
+
+# Bytes stored, transfer time and decode cost of the voice audio encodings against the current WAV path.
+# Each case is <format>[@<sample rate>]; the first one is the baseline.
+#
+#   python audio_bench.py --input complaint1.wav complaint2.wav
+#   python audio_bench.py --synthesize 5 --cases wav,flac,flac@16000,opus@16000
+#   PIPELINE_BACKEND=local python audio_bench.py --input complaint.wav
+#
+# Objects are written under audio-bench/ in MINIO_BUCKET and overwritten on the next run.
+
+DEFAULT_CASES = "wav,wav@16000,flac,flac@16000,opus@16000"
+# What openai-whisper runs on a file path: the consumers' old decode path
+FFMPEG_COMMAND = ["ffmpeg", "-nostdin", "-threads", "0", "-i", "{path}", "-f", "s16le", "-ac", "1",
+                  "-acodec", "pcm_s16le", "-ar", "16000", "-"]
+
+
+def parse_case(case):
+    audio_format, _, rate = case.partition("@")
+    if audio_format not in AUDIO_FORMATS:
+        raise SystemExit(f"Unknown format in case '{case}', expected one of {', '.join(AUDIO_FORMATS)}")
+    return audio_format, int(rate or 0)
+
+
+def load_clips(paths):
+    clips = []
+    for path in paths:
+        samples, rate = sf.read(path, dtype="int16", always_2d=True)
+        clips.append((os.path.basename(path), samples[:, 0].astype("<i2").tobytes(), rate))
+    return clips
+
+
+def synthesize_clips(count):
+    voice_producer.init_tts_worker(os.cpu_count() or 1)
+    tts = voice_producer.tts
+    customer = generate_customer()
+    clips = []
+    for i in range(count):
+        text = generate_dialogue(customers=customer, total_lines=voice_producer.MESSAGE_LENGHT)
+        chunks = voice_producer.group_into_chunks(voice_producer.split_into_sentences(text.splitlines()))
+        samples = tts.tts(text="\n".join(chunks), speaker=voice_producer.TTS_SPEAKER)
+        clips.append((f"synth-{i}", to_pcm16(samples), tts.synthesizer.output_sample_rate))
+    return clips
+
+
+def ffmpeg_decode(data, extension):
+    with tempfile.NamedTemporaryFile(suffix=f".{extension}") as tmp_file:
+        tmp_file.write(data)
+        tmp_file.flush()
+        command = [part.format(path=tmp_file.name) for part in FFMPEG_COMMAND]
+        return np.frombuffer(subprocess.run(command, capture_output=True, check=True).stdout, np.int16)
+
+
+def run_case(s3, transfer_config, case, clips, opus_bitrate_kbps, use_ffmpeg):
+    audio_format, sample_rate = parse_case(case)
+    _, _, content_type, extension = AUDIO_FORMATS[audio_format]
+    totals = {"bytes": 0, "audio_s": 0.0, "encode": 0.0, "upload": 0.0, "download": 0.0, "decode": 0.0,
+              "ffmpeg": 0.0}
+    for name, pcm, rate in clips:
+        start = time.perf_counter()
+        data, audio_info = encode(pcm, rate, audio_format, sample_rate, opus_bitrate_kbps)
+        totals["encode"] += time.perf_counter() - start
+
+        key = f"audio-bench/{case.replace('@', '-')}/{name}.{extension}"
+        start = time.perf_counter()
+        s3.upload_fileobj(io.BytesIO(data), voice_producer.MINIO_BUCKET, key,
+                          ExtraArgs={"ContentType": content_type}, Config=transfer_config)
+        totals["upload"] += time.perf_counter() - start
+
+        buffer = io.BytesIO()
+        start = time.perf_counter()
+        s3.download_fileobj(voice_producer.MINIO_BUCKET, key, buffer, Config=transfer_config)
+        totals["download"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        decode(buffer.getvalue())
+        totals["decode"] += time.perf_counter() - start
+        if use_ffmpeg:
+            start = time.perf_counter()
+            ffmpeg_decode(buffer.getvalue(), extension)
+            totals["ffmpeg"] += time.perf_counter() - start
+
+        totals["bytes"] += len(data)
+        totals["audio_s"] += audio_info["duration_s"]
+    return totals
+
+
+def report(results, clips, use_ffmpeg):
+    count = len(clips)
+    baseline = next(iter(results.values()))["bytes"]
+    print(f"\n=== Audio encoding benchmark: {count} clips, "
+          f"{sum(len(pcm) / 2 / rate for _, pcm, rate in clips):.1f}s of audio ===")
+    print(f"{'case':<14} {'kB/clip':>9} {'vs first':>9} {'kB/min':>8} {'encode_ms':>10} {'upload_ms':>10} "
+          f"{'download_ms':>12} {'decode_ms':>10}" + (f" {'ffmpeg_ms':>10}" if use_ffmpeg else ""))
+    for case, totals in results.items():
+        line = (f"{case:<14} {totals['bytes'] / count / 1024:>9.1f} {100 * totals['bytes'] / baseline:>8.1f}% "
+                f"{totals['bytes'] / 1024 / (totals['audio_s'] / 60):>8.1f} "
+                f"{1000 * totals['encode'] / count:>10.1f} {1000 * totals['upload'] / count:>10.1f} "
+                f"{1000 * totals['download'] / count:>12.1f} {1000 * totals['decode'] / count:>10.1f}")
+        if use_ffmpeg:
+            line += f" {1000 * totals['ffmpeg'] / count:>10.1f}"
+        print(line)
+    print("\ndecode_ms: in-process decode to 16 kHz float32 as in the voice consumers"
+          + ("; ffmpeg_ms: temp file + ffmpeg subprocess, the old whisper file path" if use_ffmpeg else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare stored size, transfer and decode cost of audio encodings")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", nargs="+", help="WAV files to encode (e.g. complaints downloaded from MinIO)")
+    source.add_argument("--synthesize", type=int, help="Synthesize this many complaints with the VITS model")
+    parser.add_argument("--cases", default=DEFAULT_CASES, help="Comma-separated <format>[@<rate>], baseline first")
+    parser.add_argument("--opus-bitrate", type=int, default=int(os.getenv("OPUS_BITRATE_KBPS", 24)), help="kbps")
+    parser.add_argument("--no-ffmpeg", action="store_true", help="Skip the ffmpeg decode comparison")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(args.log_level)
+
+    clips = load_clips(args.input) if args.input else synthesize_clips(args.synthesize)
+    use_ffmpeg = not args.no_ffmpeg and shutil.which("ffmpeg") is not None
+    s3 = voice_producer.create_s3_client()
+    voice_producer.ensure_bucket(s3)
+    transfer_config = voice_producer.create_transfer_config()
+
+    results = {}
+    for case in args.cases.split(","):
+        results[case] = run_case(s3, transfer_config, case, clips, args.opus_bitrate, use_ffmpeg)
+    report(results, clips, use_ffmpeg)
+
+
+if __name__ == "__main__":
+    main()
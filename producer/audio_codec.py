@@ -0,0 +1,73 @@
+import io
+import hashlib
+
+import numpy as np
+import soundfile as sf
+
+# Audio encodings for voice_producer.py and audio_bench.py. Everything goes through libsndfile,
+# which the voice consumers also use to decode in-process.
+
+AUDIO_FORMATS = {
+    # name: (soundfile format, subtype, content type, object extension)
+    "wav": ("WAV", "PCM_16", "audio/wav", "wav"),
+    "flac": ("FLAC", "PCM_16", "audio/flac", "flac"),
+    "opus": ("OGG", "OPUS", "audio/ogg", "opus"),
+}
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+OPUS_MIN_BITRATE = 6000
+OPUS_MAX_BITRATE = 256000
+WHISPER_SAMPLE_RATE = 16000
+
+
+def opus_compression_level(bitrate_kbps):
+    # libsndfile has no bitrate setting; it maps compression level 0..1 linearly onto 256..6 kbps
+    bitrate = min(max(bitrate_kbps * 1000, OPUS_MIN_BITRATE), OPUS_MAX_BITRATE)
+    return 1 - (bitrate - OPUS_MIN_BITRATE) / (OPUS_MAX_BITRATE - OPUS_MIN_BITRATE)
+
+
+def target_rate(audio_format, source_rate, sample_rate=0):
+    """sample_rate 0 keeps the model's rate; Opus only takes its own rates and falls back to 16 kHz."""
+    rate = sample_rate or source_rate
+    if audio_format == "opus" and rate not in OPUS_SAMPLE_RATES:
+        rate = WHISPER_SAMPLE_RATE
+    return rate
+
+
+def resample(samples, source_rate, rate):
+    import torch
+    import torchaudio.functional
+    resampled = torchaudio.functional.resample(torch.from_numpy(samples), source_rate, rate)
+    return np.clip(resampled.numpy(), -1.0, 1.0)
+
+
+def encode(pcm, source_rate, audio_format="wav", sample_rate=0, opus_bitrate_kbps=24):
+    """16-bit mono PCM -> (encoded bytes, audio info for the object metadata and the message)."""
+    sf_format, subtype, _, _ = AUDIO_FORMATS[audio_format]
+    rate = target_rate(audio_format, source_rate, sample_rate)
+    samples = np.frombuffer(pcm, dtype="<i2")
+    if rate != source_rate:
+        samples = resample(samples.astype(np.float32) / 32768, source_rate, rate)
+    options = {"compression_level": opus_compression_level(opus_bitrate_kbps)} if audio_format == "opus" else {}
+    buffer = io.BytesIO()
+    sf.write(buffer, samples, rate, format=sf_format, subtype=subtype, **options)
+    data = buffer.getvalue()
+    return data, {
+        "format": audio_format,
+        "duration_s": round(len(samples) / rate, 3),
+        "sample_rate": rate,
+        "channels": 1,
+        "size": len(data),
+        "sha256": hashlib.sha256(data).hexdigest(),
+    }
+
+
+def decode(data):
+    """Encoded bytes -> 16 kHz mono float32, the array Whisper takes instead of a file path."""
+    samples, rate = sf.read(io.BytesIO(data), dtype="float32", always_2d=True)
+    samples = samples.mean(axis=1)
+    if rate == WHISPER_SAMPLE_RATE:
+        return samples
+    # Band-limited FFT resampling, the same as the voice consumers do
+    length = int(round(len(samples) * WHISPER_SAMPLE_RATE / rate))
+    spectrum = np.fft.rfft(samples)[:length // 2 + 1]
+    return (np.fft.irfft(spectrum, length) * (length / len(samples))).astype(np.float32)
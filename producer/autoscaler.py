@@ -0,0 +1,298 @@
+import os
+import sys
+import json
+import math
+import time
+import logging
+import argparse
+import subprocess
+from collections import deque
+
+import pika
+
+# Queue-depth autoscaler for the consumer services, instead of `docker compose up --scale voice_consumer=2` by hand.
+#
+#   python autoscaler.py                 # scale through docker compose
+#   python autoscaler.py --dry-run       # log decisions against in-memory replica counts
+#
+# Every AUTOSCALE_INTERVAL seconds, per analysed queue (its priority lane included):
+#   depth        passive declares of <queue> and <queue>.priority
+#   ack rate     messages the consumers reported (lanes.py publishes to consumer_metrics every LANE_REPORT_INTERVAL)
+#   service time the consumers' reported busy time per message
+#   arrival rate ack rate + depth growth
+#   desired = ceil((arrival rate + depth / AUTOSCALE_DRAIN_TARGET_S) x service time x AUTOSCALE_HEADROOM)
+# clamped to AUTOSCALE_MIN/MAX_REPLICAS, and moved by at most AUTOSCALE_MAX_STEP at a time.
+# Hysteresis: scaling up waits AUTOSCALE_UP_COOLDOWN after the last change. Scaling down waits
+# AUTOSCALE_DOWN_COOLDOWN and only goes as low as the highest recommendation over that window, so a
+# short lull does not undo a scale-up.
+#
+# AUTOSCALE_TARGETS lists queue=compose_dir:service entries. Several services on one queue (the analysers
+# compete for the same messages) share its replica count.
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+RABBITMQ_HOST = os.getenv("RABBITMQ_HOST", "localhost")
+PIPELINE_BACKEND = os.getenv("PIPELINE_BACKEND", "docker")  # 'docker' or 'local' (in-process stand-ins)
+
+AUTOSCALE_TARGETS = os.getenv("AUTOSCALE_TARGETS", "text_complaints=../consumer-sentiment:text_consumer,"
+                                                   "voice_complaints=../consumer-sentiment:voice_consumer")
+AUTOSCALE_INTERVAL = float(os.getenv("AUTOSCALE_INTERVAL", 30))  # seconds between decisions
+AUTOSCALE_MIN_REPLICAS = int(os.getenv("AUTOSCALE_MIN_REPLICAS", 1))  # per queue
+AUTOSCALE_MAX_REPLICAS = int(os.getenv("AUTOSCALE_MAX_REPLICAS", 8))
+AUTOSCALE_MAX_STEP = int(os.getenv("AUTOSCALE_MAX_STEP", 2))  # replicas added or removed per decision
+AUTOSCALE_DRAIN_TARGET_S = float(os.getenv("AUTOSCALE_DRAIN_TARGET_S", 300))  # clear a backlog within this
+AUTOSCALE_HEADROOM = float(os.getenv("AUTOSCALE_HEADROOM", 1.25))  # size for 80% busy replicas
+AUTOSCALE_UP_COOLDOWN = float(os.getenv("AUTOSCALE_UP_COOLDOWN", 60))  # seconds
+AUTOSCALE_DOWN_COOLDOWN = float(os.getenv("AUTOSCALE_DOWN_COOLDOWN", 300))  # seconds, also the stabilisation window
+AUTOSCALE_REPORT_TTL = float(os.getenv("AUTOSCALE_REPORT_TTL", 120))  # ignore consumers silent for longer
+
+METRICS_EXCHANGE = "consumer_metrics"  # see lanes.py in the consumer services
+PRIORITY_SUFFIX = ".priority"
+RECONNECT_DELAY = 5  # seconds
+
+
+def connect_rabbitmq():
+    if PIPELINE_BACKEND == "local":
+        from local_backends import connect_local_broker
+        return connect_local_broker()
+    for attempt in range(5):
+        try:
+            return pika.BlockingConnection(pika.ConnectionParameters(host=RABBITMQ_HOST))
+        except pika.exceptions.AMQPConnectionError as e:
+            logging.warning(f"Retrying RabbitMQ connection (attempt {attempt + 1}/5): {e}")
+            time.sleep(2)
+    logging.error("Failed to connect to RabbitMQ after 5 attempts")
+    sys.exit(1)
+
+
+# --- Actuators ---
+class ComposeActuator:
+    """Scales one service of a consumer's docker compose project."""
+
+    def __init__(self, project_dir, service):
+        self.project_dir = project_dir
+        self.service = service
+        self.name = f"{os.path.basename(os.path.normpath(project_dir))}/{service}"
+
+    def _compose(self, *args):
+        compose_file = next(os.path.join(self.project_dir, name) for name in ("docker-compose.yaml", "docker-compose.yml")
+                            if os.path.exists(os.path.join(self.project_dir, name)))
+        return subprocess.run(["docker", "compose", "--project-directory", self.project_dir, "-f", compose_file, *args],
+                              check=True, capture_output=True, text=True).stdout
+
+    def current(self):
+        return len(self._compose("ps", "-q", "--status", "running", self.service).split())
+
+    def scale(self, replicas):
+        # --no-recreate leaves running replicas alone; compose stops the highest-numbered ones on scale-down
+        self._compose("up", "-d", "--no-deps", "--no-recreate", "--scale", f"{self.service}={replicas}", self.service)
+
+
+class DryRunActuator:
+    """Keeps replica counts in memory; for --dry-run and for exercising the policy without docker."""
+
+    def __init__(self, project_dir, service, replicas=1):
+        self.name = f"{os.path.basename(os.path.normpath(project_dir))}/{service}"
+        self.replicas = replicas
+        self.history = []  # (time, replicas)
+
+    def current(self):
+        return self.replicas
+
+    def scale(self, replicas):
+        self.history.append((time.time(), replicas))
+        self.replicas = replicas
+
+
+ACTUATORS = {"compose": ComposeActuator, "dry-run": DryRunActuator}
+
+
+def parse_targets(spec, actuator):
+    """'queue=dir:service,...' -> {queue: [actuator, ...]}"""
+    targets = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        queue, _, location = entry.partition("=")
+        project_dir, _, service = location.rpartition(":")
+        targets.setdefault(queue, []).append(ACTUATORS[actuator](project_dir, service))
+    return targets
+
+
+def split(replicas, count):
+    """Spreads a queue's replicas over its services: 5 over 2 -> [3, 2]."""
+    return [replicas // count + (1 if i < replicas % count else 0) for i in range(count)]
+
+
+# --- Policy ---
+class QueueScaler:
+    def __init__(self, queue, actuators):
+        self.queue = queue
+        self.actuators = actuators
+        self.reports = {}  # consumer id -> (received_at, report)
+        self.recommendations = deque()  # (time, desired) over the last AUTOSCALE_DOWN_COOLDOWN
+        self.last_change = 0.0
+        self.last_depth = None  # (time, depth)
+
+    def observe(self, report):
+        self.reports[report["consumer"]] = (time.monotonic(), report)
+
+    def metrics(self, depth, now):
+        # Latest report per consumer still alive; each covers its own interval
+        live = [report for received_at, report in self.reports.values() if now - received_at <= AUTOSCALE_REPORT_TTL]
+        lanes = [lane for report in live for lane in report["lanes"].values()]
+        messages = sum(lane["messages"] for lane in lanes)
+        busy_s = sum(lane["busy_s"] for lane in lanes)
+        ack_rate = sum(sum(lane["messages"] for lane in report["lanes"].values()) / max(report["interval_s"], 1e-9)
+                       for report in live)
+        growth = 0.0
+        if self.last_depth is not None and now > self.last_depth[0]:
+            growth = (depth - self.last_depth[1]) / (now - self.last_depth[0])
+        self.last_depth = (now, depth)
+        return {
+            "depth": depth,
+            "reporting": len(live),
+            "ack_rate": ack_rate,
+            "arrival_rate": max(0.0, ack_rate + growth),
+            "service_s": busy_s / messages if messages else None,
+            "lag_p99_s": max((lane["lag_p99_s"] for lane in lanes), default=0.0),
+        }
+
+    def desired(self, current, metrics):
+        if metrics["service_s"] is None:
+            # Nothing processed lately: idle queue, or consumers too new or too stuck to report
+            return AUTOSCALE_MIN_REPLICAS if metrics["depth"] == 0 else max(current, AUTOSCALE_MIN_REPLICAS)
+        work = (metrics["arrival_rate"] + metrics["depth"] / AUTOSCALE_DRAIN_TARGET_S) * metrics["service_s"]
+        return min(AUTOSCALE_MAX_REPLICAS, max(AUTOSCALE_MIN_REPLICAS, math.ceil(work * AUTOSCALE_HEADROOM)))
+
+    def evaluate(self, depth, now=None):
+        """Returns (current, target, metrics); target == current means hold."""
+        now = time.monotonic() if now is None else now
+        current = sum(actuator.current() for actuator in self.actuators)
+        metrics = self.metrics(depth, now)
+        desired = self.desired(current, metrics)
+        metrics["desired"] = desired
+
+        self.recommendations.append((now, desired))
+        while self.recommendations[0][0] < now - AUTOSCALE_DOWN_COOLDOWN:
+            self.recommendations.popleft()
+        since_change = now - self.last_change
+
+        target = current
+        if desired > current and since_change >= AUTOSCALE_UP_COOLDOWN:
+            target = min(desired, current + AUTOSCALE_MAX_STEP)
+        elif desired < current and since_change >= AUTOSCALE_DOWN_COOLDOWN:
+            stable = max(recommended for _, recommended in self.recommendations)
+            target = max(stable, current - AUTOSCALE_MAX_STEP)
+        return current, target, metrics
+
+    def apply(self, target, now=None):
+        for actuator, replicas in zip(self.actuators, split(target, len(self.actuators))):
+            if actuator.current() != replicas:
+                actuator.scale(replicas)
+        self.last_change = time.monotonic() if now is None else now
+
+
+def describe(metrics):
+    service = "n/a" if metrics["service_s"] is None else f"{1000 * metrics['service_s']:.0f} ms/msg"
+    return (f"depth {metrics['depth']}, ack {metrics['ack_rate']:.2f}/s, arrival {metrics['arrival_rate']:.2f}/s, "
+            f"service {service}, lag p99 {metrics['lag_p99_s']:.1f}s, {metrics['reporting']} reporting")
+
+
+def queue_depth(connection, probe, queue):
+    """
+    (depth of queue and its priority lane, the probe channel to use next). A lane no producer or consumer has
+    declared yet counts as empty; the broker closes the channel on that 404, so a new one replaces it.
+    """
+    depth = 0
+    for name in (queue, f"{queue}{PRIORITY_SUFFIX}"):
+        if not probe.is_open:
+            probe = connection.channel()
+        try:
+            depth += probe.queue_declare(queue=name, passive=True).method.message_count
+        except pika.exceptions.ChannelClosedByBroker as e:
+            if e.reply_code != 404:
+                raise
+    return depth, probe
+
+
+def subscribe(scalers):
+    """Connects, feeds consumer reports to the scalers, and returns the connection and a channel for depth probes."""
+    connection = connect_rabbitmq()
+    channel = connection.channel()
+    channel.exchange_declare(exchange=METRICS_EXCHANGE, exchange_type="fanout", durable=True)
+    metrics_queue = channel.queue_declare(queue="", exclusive=True, auto_delete=True).method.queue
+    channel.queue_bind(queue=metrics_queue, exchange=METRICS_EXCHANGE, routing_key="")
+
+    def on_report(ch, method, properties, body):
+        report = json.loads(body)
+        scaler = scalers.get(report.get("queue"))
+        if scaler is not None:
+            scaler.observe(report)
+
+    channel.basic_consume(queue=metrics_queue, on_message_callback=on_report, auto_ack=True)
+    # Probes get their own channel, so a 404 on a missing lane cannot stop the report consumer
+    return connection, connection.channel()
+
+
+def decide(scalers, connection, probe):
+    """One decision per queue; returns the probe channel to use next."""
+    for scaler in scalers.values():
+        try:
+            depth, probe = queue_depth(connection, probe, scaler.queue)
+            current, target, metrics = scaler.evaluate(depth)
+        except Exception as e:
+            logging.warning(f"[Autoscaler] {scaler.queue}: no decision this round ({e})")
+            continue
+        if target == current:
+            logging.info(f"[Autoscaler] {scaler.queue}: hold {current} (desired {metrics['desired']}) | "
+                         f"{describe(metrics)}")
+            continue
+        names = ", ".join(actuator.name for actuator in scaler.actuators)
+        logging.warning(f"[Autoscaler] {scaler.queue}: scale {current} -> {target} ({names}) | {describe(metrics)}")
+        try:
+            scaler.apply(target)
+        except (subprocess.CalledProcessError, OSError) as e:
+            logging.error(f"[Autoscaler] {scaler.queue}: scaling failed: {getattr(e, 'stderr', '') or e}")
+    return probe
+
+
+def run(scalers):
+    connection = probe = None
+    try:
+        while True:
+            try:
+                if connection is None or not connection.is_open:
+                    connection, probe = subscribe(scalers)
+                # Collect consumer reports until the next decision is due
+                deadline = time.monotonic() + AUTOSCALE_INTERVAL
+                while time.monotonic() < deadline:
+                    connection.process_data_events(time_limit=max(0.0, deadline - time.monotonic()))
+            except pika.exceptions.AMQPError as e:
+                # Reports and depths come back with the broker; replica counts are left as they are meanwhile
+                logging.warning(f"[Autoscaler] Lost the broker ({e!r}), reconnecting in {RECONNECT_DELAY}s")
+                connection = None
+                time.sleep(RECONNECT_DELAY)
+                continue
+            probe = decide(scalers, connection, probe)
+    finally:
+        if connection is not None and connection.is_open:
+            connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scale consumer replicas from queue depth, ack rate and latency")
+    parser.add_argument("--dry-run", action="store_true", help="Log decisions without touching docker")
+    args = parser.parse_args()
+
+    scalers = {queue: QueueScaler(queue, actuators)
+               for queue, actuators in parse_targets(AUTOSCALE_TARGETS, "dry-run" if args.dry_run else "compose").items()}
+    for queue, scaler in scalers.items():
+        logging.info(f"[Autoscaler] {queue}: {', '.join(actuator.name for actuator in scaler.actuators)} "
+                     f"({AUTOSCALE_MIN_REPLICAS}-{AUTOSCALE_MAX_REPLICAS} replicas{', dry run' if args.dry_run else ''})")
+    try:
+        run(scalers)
+    except KeyboardInterrupt:
+        logging.info("Interrupted by user")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import os
+import time
+import logging
+import threading
+
+import pika
+
+# Adaptive publish rate for text_producer.py and voice_producer.py.
+# A monitor thread passively declares the producer's queues every BACKPRESSURE_INTERVAL seconds. It works
+# out the consumers' drain rate from the depth change and the messages confirmed meanwhile, then adjusts the
+# rate limit AIMD-style:
+#   depth >= high watermark, or the broker blocked the connection -> rate = min(rate, drain) * BACKPRESSURE_DECREASE,
+#     unless the rate is already below that (the backlog is shrinking)
+#   depth <= low watermark -> rate += BACKPRESSURE_INCREASE_STEP x the unthrottled rate, then unthrottled again
+#   in between -> hold
+# Producers call acquire() before each send. No message is dropped: a throttled producer just sends later.
+
+PIPELINE_BACKEND = os.getenv("PIPELINE_BACKEND", "docker")  # 'docker' or 'local' (in-process stand-ins)
+BACKPRESSURE_INTERVAL = float(os.getenv("BACKPRESSURE_INTERVAL", 5))  # seconds between depth polls
+BACKPRESSURE_DECREASE = float(os.getenv("BACKPRESSURE_DECREASE", 0.5))  # multiplicative decrease
+BACKPRESSURE_INCREASE_STEP = float(os.getenv("BACKPRESSURE_INCREASE_STEP", 0.1))  # of the unthrottled rate per poll
+BACKPRESSURE_MIN_RATE = float(os.getenv("BACKPRESSURE_MIN_RATE", 0.05))  # messages/s, never stops entirely
+
+
+class Backpressure:
+    def __init__(self, parameters, queues, publisher, high_watermark, low_watermark, name="backpressure"):
+        self.parameters = parameters
+        self.queues = list(queues)
+        self.publisher = publisher
+        self.high_watermark = high_watermark
+        self.low_watermark = low_watermark
+        self.name = name
+
+        self.lock = threading.Condition()  # notified when the rate changes, so waiting senders reschedule
+        self.rate = None  # messages/s; None = unthrottled
+        self.unthrottled_rate = None  # send rate when throttling began, the target to climb back to
+        self.last_send_at = 0.0
+        self.sent = 0
+        self.stats = {"depth": 0, "drain_rate": 0.0, "send_rate": 0.0, "decreases": 0, "throttled_s": 0.0}
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def acquire(self):
+        """Blocks until the current rate limit allows one more send; returns the seconds waited."""
+        started_at = time.monotonic()
+        with self.lock:
+            while self.rate is not None and not self.stopping.is_set():
+                wait = self.last_send_at + 1 / self.rate - time.monotonic()
+                if wait <= 0:
+                    break
+                self.lock.wait(wait)
+            self.last_send_at = time.monotonic()
+            self.sent += 1
+            waited = self.last_send_at - started_at
+            self.stats["throttled_s"] += waited
+        return waited
+
+    def close(self):
+        self.stopping.set()
+        with self.lock:
+            self.lock.notify_all()
+        self.thread.join(timeout=BACKPRESSURE_INTERVAL + 5)
+
+    # --- Monitor thread ---
+    def _connect(self):
+        if PIPELINE_BACKEND == "local":
+            from local_backends import connect_local_broker
+            return connect_local_broker()
+        return pika.BlockingConnection(self.parameters)
+
+    def _depth(self, channel):
+        states = [channel.queue_declare(queue=queue, passive=True).method for queue in self.queues]
+        return sum(state.message_count for state in states), sum(state.consumer_count for state in states)
+
+    def _run(self):
+        connection = channel = None
+        last = None  # (time, depth, confirmed, sent)
+        while not self.stopping.is_set():
+            try:
+                if connection is None or not connection.is_open:
+                    connection = self._connect()
+                    channel = connection.channel()
+                depth, consumers = self._depth(channel)
+            except Exception as e:
+                logging.warning(f"[Backpressure] {self.name} cannot read queue depth ({e}), keeping the current rate")
+                connection = None
+                self.stopping.wait(BACKPRESSURE_INTERVAL)
+                continue
+
+            now = time.monotonic()
+            confirmed = self.publisher.counters()["confirmed"]
+            if last is not None:
+                elapsed = now - last[0]
+                # Whatever we added that is no longer queued was consumed. Sends are counted per acquire(),
+                # which is per complaint even when the publisher packs several into one envelope
+                drain_rate = max(0.0, (confirmed - last[2]) - (depth - last[1])) / elapsed if consumers else 0.0
+                per_message = max(1.0, self.sent / confirmed) if confirmed else 1.0
+                self._update(depth, drain_rate * per_message, (self.sent - last[3]) / elapsed)
+            last = (now, depth, confirmed, self.sent)
+            self.stopping.wait(BACKPRESSURE_INTERVAL)
+        if connection is not None and connection.is_open:
+            connection.close()
+
+    def _update(self, depth, drain_rate, send_rate):
+        blocked = self.publisher.counters().get("blocked", False)
+        previous = self.rate
+        with self.lock:
+            if blocked or depth >= self.high_watermark:
+                if self.rate is None:
+                    self.unthrottled_rate = max(send_rate, BACKPRESSURE_MIN_RATE)
+                    self.rate = self.unthrottled_rate
+                # Already well below what the consumers take: the backlog is shrinking, hold
+                if blocked or drain_rate <= 0 or self.rate > drain_rate * BACKPRESSURE_DECREASE:
+                    base = min(self.rate, drain_rate) if drain_rate > 0 else self.rate
+                    self.rate = max(BACKPRESSURE_MIN_RATE, base * BACKPRESSURE_DECREASE)
+                    self.stats["decreases"] += 1
+            elif depth <= self.low_watermark and self.rate is not None:
+                self.rate += BACKPRESSURE_INCREASE_STEP * self.unthrottled_rate
+                if self.rate >= self.unthrottled_rate:
+                    self.rate = None
+            self.lock.notify_all()
+        self.stats.update(depth=depth, drain_rate=drain_rate, send_rate=send_rate)
+
+        if self.rate != previous:
+            limit = "unthrottled" if self.rate is None else f"{self.rate:.2f}/s"
+            reason = "connection blocked" if blocked else f"depth {depth}"
+            logging.warning(f"[Backpressure] {self.name}: {reason} (watermarks {self.low_watermark}/"
+                            f"{self.high_watermark}), drain {drain_rate:.2f}/s, send {send_rate:.2f}/s -> {limit}")
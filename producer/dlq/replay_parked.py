@@ -0,0 +1,153 @@
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+from datetime import datetime
+
+import pika
+import redis
+
+# Replays messages parked by the DLQ consumers (capped Redis streams) back to their queues.
+#
+#   python replay_parked.py text --rate 50
+#   python replay_parked.py voice --error-class rejected --since 2025-01-01T09:00 --until 2025-01-01T12:00 --delete
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+RABBITMQ_HOST = os.getenv("RABBITMQ_HOST", "localhost")
+REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
+REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
+
+# Must match PARKING_STREAM in text_dlq_consumer.py / voice_dlq_consumer.py
+PARKING_STREAMS = {
+    "text": "text_dlq:parked",
+    "voice": "voice_dlq:parked",
+}
+RETRY_HEADER = "x-retry-count"
+
+
+def to_stream_id(value, default):
+    # Stream IDs start with the entry's millisecond timestamp, so time filters become an XRANGE bound
+    if value is None:
+        return default
+    if value.replace(".", "", 1).isdigit():
+        return str(int(float(value) * 1000))
+    return str(int(datetime.fromisoformat(value).timestamp() * 1000))
+
+
+def read_parked(redis_client, stream, start, end, batch_size):
+    while True:
+        entries = redis_client.xrange(stream, min=start, max=end, count=batch_size)
+        if not entries:
+            return
+        yield entries
+        if len(entries) < batch_size:
+            return
+        start = "(" + entries[-1][0].decode()
+
+
+def connect_rabbitmq():
+    for attempt in range(5):
+        try:
+            connection = pika.BlockingConnection(pika.ConnectionParameters(host=RABBITMQ_HOST))
+            channel = connection.channel()
+            channel.confirm_delivery()
+            logging.info("[RabbitMQ] Connected with publisher confirms enabled")
+            return connection, channel
+        except pika.exceptions.AMQPConnectionError as e:
+            logging.warning(f"Retrying RabbitMQ connection (attempt {attempt + 1}/5): {e}")
+            time.sleep(2)
+    logging.error("Failed to connect to RabbitMQ after 5 attempts")
+    sys.exit(1)
+
+
+def republish(channel, fields, entry_id, target_queue):
+    headers = json.loads(fields.get(b"headers", b"{}"))
+    headers[RETRY_HEADER] = 0
+    headers["x-replayed-from"] = entry_id
+    content_type = fields.get(b"content_type", b"").decode() or None
+    message_id = fields.get(b"message_id", b"").decode() or None
+    channel.basic_publish(
+        exchange="",
+        routing_key=target_queue,
+        body=fields[b"body"],
+        properties=pika.BasicProperties(delivery_mode=2, content_type=content_type, message_id=message_id,
+                                         headers=headers),
+        mandatory=True,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay parked DLQ messages from Redis")
+    parser.add_argument("source", choices=sorted(PARKING_STREAMS), help="Which parking stream to read")
+    parser.add_argument("--error-class", action="append", help="Only replay these error classes (repeatable)")
+    parser.add_argument("--since", help="Parked at or after (ISO 8601 or epoch seconds)")
+    parser.add_argument("--until", help="Parked at or before (ISO 8601 or epoch seconds)")
+    parser.add_argument("--target-queue", help="Override the queue recorded with each entry")
+    parser.add_argument("--rate", type=float, default=20.0, help="Messages per second, 0 for unlimited")
+    parser.add_argument("--batch-size", type=int, default=500, help="Entries read per XRANGE call")
+    parser.add_argument("--limit", type=int, default=0, help="Stop after this many replayed messages")
+    parser.add_argument("--delete", action="store_true", help="XDEL entries once the broker confirms them")
+    parser.add_argument("--dry-run", action="store_true", help="Only count matching entries")
+    args = parser.parse_args()
+
+    stream = PARKING_STREAMS[args.source]
+    start = to_stream_id(args.since, "-")
+    end = to_stream_id(args.until, "+")
+    error_classes = {error_class.encode() for error_class in args.error_class or []}
+
+    redis_client = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=0)
+    connection, channel = (None, None) if args.dry_run else connect_rabbitmq()
+
+    interval = 1.0 / args.rate if args.rate > 0 else 0.0
+    next_send = time.monotonic()
+    replayed = failed = skipped = 0
+
+    try:
+        for entries in read_parked(redis_client, stream, start, end, args.batch_size):
+            confirmed_ids = []
+            for entry_id, fields in entries:
+                if error_classes and fields.get(b"error_class") not in error_classes:
+                    skipped += 1
+                    continue
+                if args.limit and replayed >= args.limit:
+                    break
+                entry_id = entry_id.decode()
+                target_queue = args.target_queue or fields[b"queue"].decode()
+                if args.dry_run:
+                    replayed += 1
+                    continue
+
+                delay = next_send - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                next_send = max(next_send, time.monotonic() - interval) + interval
+
+                try:
+                    republish(channel, fields, entry_id, target_queue)
+                except (pika.exceptions.UnroutableError, pika.exceptions.NackError) as e:
+                    failed += 1
+                    logging.warning(f"[Replay] Broker did not confirm {entry_id} -> {target_queue}: {e}")
+                    continue
+                replayed += 1
+                confirmed_ids.append(entry_id)
+
+            if args.delete and confirmed_ids:
+                redis_client.xdel(stream, *confirmed_ids)
+            logging.info(f"[Replay] {stream}: replayed={replayed} failed={failed} skipped={skipped}")
+            if args.limit and replayed >= args.limit:
+                break
+    except KeyboardInterrupt:
+        logging.info("Interrupted by user, stopping replay...")
+    finally:
+        if connection is not None and connection.is_open:
+            connection.close()
+
+    action = "Would replay" if args.dry_run else "Replayed"
+    logging.info(f"[Replay] {action} {replayed} messages from {stream} ({failed} unconfirmed, {skipped} filtered out)")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,7 +18,51 @@ MAIN_QUEUE = "voice_complaints_dlq"
 DLX_EXCHANGE = "voice_dlx"
 DLQ_QUEUE = f"{MAIN_QUEUE}.dlq"
 
-REQUEUE_DELAY = 5  # seconds
+WORK_QUEUE = "voice_complaints"  # where retries go when a message does not say which queue failed it
+
+# Broker-side retry delays (seconds), one TTL queue per tier and failed work queue, dead-lettering back to it
+RETRY_TIERS = [int(delay) for delay in os.getenv("RETRY_TIERS", "5,30,300").split(",")]
+RETRY_HEADER = "x-retry-count"
+PREFETCH_COUNT = int(os.getenv("DLQ_PREFETCH_COUNT", 50))
+
+
+# Parking lot for messages that exhausted their retries: a capped Redis stream written in pipelined batches
+PARKING_STREAM = "voice_dlq:parked"
+PARKING_STREAM_MAXLEN = int(os.getenv("PARKING_STREAM_MAXLEN", 100000))
+PARK_BATCH_SIZE = int(os.getenv("PARK_BATCH_SIZE", 25))
+PARK_FLUSH_INTERVAL = float(os.getenv("PARK_FLUSH_INTERVAL", 1.0))  # seconds
+
+parked_batch = []  # (delivery_tag, stream fields) waiting for the next flush
+declared_retry_queues = set()
+
+
+def retry_queue_name(target_queue, delay):
+    return f"{target_queue}.retry.{delay}s"
+
+
+def declare_retry_queue(ch, target_queue, delay):
+    # Expired messages dead-letter through the default exchange straight back into the work queue
+    name = retry_queue_name(target_queue, delay)
+    if name not in declared_retry_queues:
+        ch.queue_declare(
+            queue=name,
+            durable=True,
+            arguments={
+                'x-message-ttl': delay * 1000,
+                'x-dead-letter-exchange': '',
+                'x-dead-letter-routing-key': target_queue
+            }
+        )
+        declared_retry_queues.add(name)
+    return name
+
+
+def failed_queue(headers):
+    deaths = headers.get("x-death") or []
+    # x-death is newest first; the queue whose consumer last rejected the message
+    queue = next((death.get("queue") for death in deaths if death.get("reason") == "rejected"), None)
+    # Items failed inside an envelope are dead-lettered by the consumer itself, with the queue in a header
+    return queue or headers.get("x-failed-queue") or WORK_QUEUE
 
 
 def connect_rabbitmq():
@@ -59,6 +103,7 @@ def connect_rabbitmq():
                 }
             )
 
+            # Retry tiers are declared per failed work queue on first use (declare_retry_queue)
             logging.info(f"[RabbitMQ] Queues and exchanges declared successfully")
             return connection, channel
 
@@ -84,28 +129,93 @@ def connect_redis():
     sys.exit(1)
 
 
-def callback(ch, method, properties, body):
+def get_retry_count(properties, message):
+    headers = properties.headers or {}
+    if RETRY_HEADER in headers:
+        return int(headers[RETRY_HEADER])
+    # Messages requeued before retry headers carried the count in the body
+    return int(message.get("retry_count", 0))
+
+
+def retry_headers(properties, retry_count):
+    # x-death bookkeeping is re-added by the broker on every dead-letter hop
+    headers = {key: value for key, value in (properties.headers or {}).items()
+               if not key.startswith(("x-death", "x-first-death", "x-last-death"))}
+    headers[RETRY_HEADER] = retry_count
+    return headers
+
+
+def parking_fields(message_id, properties, body, retry_count):
+    headers = properties.headers or {}
+    deaths = headers.get("x-death") or []
+    error_class = headers.get("x-error-class") or (deaths[0].get("reason") if deaths else "unknown")
+    kept_headers = {key: value for key, value in headers.items()
+                    if not key.startswith(("x-death", "x-first-death", "x-last-death"))}
+    return {
+        "message_id": message_id,
+        "queue": failed_queue(headers),  # replay target
+        "error_class": error_class,
+        "retry_count": retry_count,
+        "parked_at": time.time(),
+        "content_type": properties.content_type or "",
+        "headers": json.dumps(kept_headers, default=str),
+        "body": body,
+    }
+
+
+def flush_parked(ch):
+    if not parked_batch:
+        return
     try:
-        message = json.loads(body)
-        retry_count = message.get("retry_count", 0)
-        message_id = message.get("message_id", "unknown")
-
-        if retry_count == 0:
-            logging.info(f"[DLQ] First failure for {message_id}. Requeuing after {REQUEUE_DELAY}s...")
-            message["retry_count"] = 1
-            time.sleep(REQUEUE_DELAY)
-            ch.basic_publish(
-                exchange="",
-                routing_key=MAIN_QUEUE,
-                body=json.dumps(message),
-                properties=pika.BasicProperties(delivery_mode=2),
-            )
-        else:
-            logging.warning(f"[DLQ] Second failure for {message_id}. Sending to Redis.")
-            redis_key = f"voice_dlq:{message_id}"
-            redis_client.set(redis_key, json.dumps(message))
-            logging.info(f"[Redis] Saved message to Redis key: {redis_key}")
+        with redis_client.pipeline(transaction=False) as pipe:
+            for _, fields in parked_batch:
+                pipe.xadd(PARKING_STREAM, fields, maxlen=PARKING_STREAM_MAXLEN, approximate=True)
+            pipe.execute()
+    except redis.exceptions.RedisError as e:
+        logging.error(f"[Redis] Failed to park {len(parked_batch)} messages, returning them to {DLQ_QUEUE}: {e}")
+        for delivery_tag, _ in parked_batch:
+            ch.basic_nack(delivery_tag=delivery_tag, requeue=True)
+    else:
+        for delivery_tag, _ in parked_batch:
+            ch.basic_ack(delivery_tag=delivery_tag)
+        logging.info(f"[Redis] Parked {len(parked_batch)} messages in stream: {PARKING_STREAM}")
+    parked_batch.clear()
+
+
+def schedule_flush():
+    flush_parked(channel)
+    conn.call_later(PARK_FLUSH_INTERVAL, schedule_flush)
 
+
+def callback(ch, method, properties, body):
+    try:
+        # msgpack bodies (MESSAGE_FORMAT=msgpack) carry their id in the properties only
+        message = json.loads(body) if properties.content_type in (None, "application/json") else {}
+        retry_count = get_retry_count(properties, message)
+        message_id = properties.message_id or message.get("id") or message.get("message_id", "unknown")
+
+        if retry_count >= len(RETRY_TIERS):
+            logging.warning(f"[DLQ] Failure {retry_count + 1} for {message_id}, retries exhausted. Parking in Redis.")
+            parked_batch.append((method.delivery_tag, parking_fields(message_id, properties, body, retry_count)))
+            # Batch size is capped by prefetch, otherwise the broker stops delivering before a flush
+            if len(parked_batch) >= min(PARK_BATCH_SIZE, PREFETCH_COUNT):
+                flush_parked(ch)
+            return
+
+        delay = RETRY_TIERS[retry_count]
+        retry_queue = declare_retry_queue(ch, failed_queue(properties.headers or {}), delay)
+        logging.info(f"[DLQ] Failure {retry_count + 1} for {message_id}. Retrying in {delay}s via {retry_queue}")
+        ch.basic_publish(
+            exchange="",
+            routing_key=retry_queue,
+            body=body,
+            properties=pika.BasicProperties(
+                delivery_mode=2,
+                content_type=properties.content_type,
+                message_id=properties.message_id,
+                headers=retry_headers(properties, retry_count + 1)
+            ),
+        )
         ch.basic_ack(delivery_tag=method.delivery_tag)
 
     except Exception as e:
@@ -118,8 +228,9 @@ if __name__ == "__main__":
     conn, channel = connect_rabbitmq()
 
     logging.info(f"[DLQ] Waiting for messages in {DLQ_QUEUE}...")
-    channel.basic_qos(prefetch_count=1)
+    channel.basic_qos(prefetch_count=PREFETCH_COUNT)
     channel.basic_consume(queue=DLQ_QUEUE, on_message_callback=callback)
+    conn.call_later(PARK_FLUSH_INTERVAL, schedule_flush)
 
     try:
         channel.start_consuming()
@@ -127,4 +238,6 @@ if __name__ == "__main__":
         logging.info("Interrupted by user, shutting down...")
         channel.stop_consuming()
     finally:
+        if channel.is_open:
+            flush_parked(channel)
         conn.close()
@@ -0,0 +1,185 @@
+import os
+import io
+import sys
+import time
+import logging
+import argparse
+import threading
+import importlib.util
+from contextlib import redirect_stdout
+
+# End-to-end throughput benchmark on the in-process backends (no Docker needed).
+# Drives text_producer.main / voice_producer.main through the selected consumers
+# and reports sustained throughput plus a per-stage breakdown.
+#
+#   python e2e_bench.py --messages 1000
+#   python e2e_bench.py --messages 50 --voice --consumers ../consumer-sentiment/voice_consumer.py
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CONSUMERS = [os.path.join(ROOT_DIR, "consumer-sentiment", "text_consumer.py")]
+
+BENCH_ENV = {
+    "PIPELINE_BACKEND": "local",
+    "DELAY_BETWEEN_MESSAGES": "0",
+    "RABBITMQ_HOST": "local",
+    "RABBITMQ_PORT": "5672",
+    "RABBITMQ_USER": "guest",
+    "RABBITMQ_PASS": "guest",
+    "RABBITMQ_VHOST": "/",
+    "REDIS_HOST": "local",
+    "REDIS_PORT": "6379",
+    "MINIO_ENDPOINT": "local:9000",
+    "MINIO_ACCESS_KEY": "admin",
+    "MINIO_SECRET_KEY": "admin123",
+    "MINIO_BUCKET": "audiofiles",
+    "INFLUXDB_URL": "http://local:8086",
+    "INFLUXDB_ORG": "org",
+    "INFLUXDB_TOKEN": "local",
+}
+
+
+def load_consumer(path):
+    path = os.path.abspath(path)
+    service = os.path.basename(os.path.dirname(path))
+    stem = os.path.splitext(os.path.basename(path))[0]
+    os.environ["INFLUXDB_BUCKET"] = f"{service.replace('consumer-', '')}_{stem.split('_')[0]}_bucket"
+    # Helper modules the services copy (lanes.py, ...); appended so the producer's own copies win
+    if os.path.dirname(path) not in sys.path:
+        sys.path.append(os.path.dirname(path))
+    spec = importlib.util.spec_from_file_location(f"{service.replace('-', '_')}_{stem}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.bench_name = f"{service}/{stem}"
+    return module
+
+
+class ConsumerStage:
+    def __init__(self, module):
+        self.module = module
+        self.name = module.bench_name
+        self.handler = getattr(module, "callback", None) or getattr(module, "on_message", None)
+        if self.handler is None:
+            raise SystemExit(f"{self.name} has no basic_consume callback and cannot be benchmarked")
+        self.lane_consumer = None
+        self.count = 0
+        self.busy_s = 0.0
+        self.first_at = None
+        self.last_at = None
+
+    def on_message(self, channel, method, properties, body):
+        start = time.perf_counter()
+        if self.first_at is None:
+            self.first_at = start
+        self.handler(channel, method, properties, body)
+        self.last_at = time.perf_counter()
+        self.busy_s += self.last_at - start
+        self.count += 1
+
+    def run(self):
+        if not hasattr(self.module, "write_api"):
+            # Text consumers create their write API in main(); voice consumers at import
+            influx_client = self.module.create_influx_client()
+            self.module.ensure_bucket_exists(influx_client, os.environ["INFLUXDB_BUCKET"], "org")
+            self.module.write_api = influx_client.write_api()
+        connection = self.module.connect_to_rabbitmq()
+        channel = connection.channel()
+        lanes = getattr(self.module, "lanes", None)
+        if lanes is not None:
+            # Same weighted-fair priority lane consumption as the consumer's main()
+            dlx = getattr(self.module, "DEAD_LETTER_EXCHANGE", None)
+            self.lane_consumer = lanes.LaneConsumer(connection, channel, self.module.QUEUE_NAME,
+                                                    priority_arguments={"x-dead-letter-exchange": dlx} if dlx else None)
+            self.lane_consumer.start_consuming(self.on_message)
+            return
+        channel.basic_qos(prefetch_count=1)
+        channel.basic_consume(queue=self.module.QUEUE_NAME, on_message_callback=self.on_message)
+        channel.start_consuming()
+
+
+def run_producer(module, timings):
+    start = time.perf_counter()
+    module.main()
+    timings[module.__name__] = time.perf_counter() - start
+
+
+def rate(count, seconds):
+    return count / seconds if seconds > 0 else float("inf")
+
+
+def report(messages, wall_s, producer_timings, stages, broker, sink):
+    print(f"\n=== End-to-end benchmark: {messages} messages per producer ===")
+    print(f"{'stage':<45} {'count':>8} {'busy_s':>9} {'msg/s':>10} {'mean_ms':>9}")
+    for name, seconds in producer_timings.items():
+        print(f"{'produce:' + name:<45} {messages:>8} {seconds:>9.3f} {rate(messages, seconds):>10.1f} "
+              f"{1000 * seconds / max(messages, 1):>9.3f}")
+    for queue in broker.queues.values():
+        delivered = int(queue.stats["delivered"])
+        wait_ms = 1000 * queue.stats["wait_s"] / max(delivered, 1)
+        print(f"{'queue:' + queue.name:<45} {delivered:>8} {'':>9} {'':>10} {wait_ms:>9.3f}"
+              f"  (acked={int(queue.stats['acked'])}, dead-lettered={int(queue.stats['dead_lettered'])})")
+    for stage in stages:
+        print(f"{'consume:' + stage.name:<45} {stage.count:>8} {stage.busy_s:>9.3f} "
+              f"{rate(stage.count, stage.busy_s):>10.1f} {1000 * stage.busy_s / max(stage.count, 1):>9.3f}")
+    for stage in stages:
+        for lane in stage.lane_consumer.lanes if stage.lane_consumer else []:
+            print(f"  lane {lane.summary()}")
+    for bucket, points in sink.points.items():
+        seconds = sink.write_s[bucket]
+        print(f"{'sink:' + bucket:<45} {points:>8} {seconds:>9.3f} {rate(points, seconds):>10.1f} "
+              f"{1000 * seconds / max(points, 1):>9.3f}")
+    total = sum(sink.points.values())
+    print(f"\nWall time: {wall_s:.3f}s | points written: {total} | sustained: {rate(total, wall_s):.1f} points/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark on in-process backends")
+    parser.add_argument("--messages", type=int, default=500, help="Messages per producer")
+    parser.add_argument("--consumers", nargs="+", default=DEFAULT_CONSUMERS, help="Consumer scripts to drive")
+    parser.add_argument("--voice", action="store_true", help="Also run voice_producer (needs TTS installed)")
+    parser.add_argument("--no-text", action="store_true", help="Skip text_producer")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+
+    for name, value in BENCH_ENV.items():
+        os.environ.setdefault(name, value)
+    os.environ["PIPELINE_BACKEND"] = "local"
+    os.environ["TOTAL_MESSAGES"] = str(args.messages)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    import local_backends
+    producers = []
+    if not args.no_text:
+        import text_producer
+        producers.append(text_producer)
+    if args.voice:
+        import voice_producer
+        producers.append(voice_producer)
+    stages = [ConsumerStage(load_consumer(path)) for path in args.consumers]
+    logging.getLogger().setLevel(args.log_level)
+
+    consumer_threads = [threading.Thread(target=stage.run, daemon=True) for stage in stages]
+    producer_timings = {}
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        for thread in consumer_threads:
+            thread.start()
+        producer_threads = [threading.Thread(target=run_producer, args=(module, producer_timings))
+                            for module in producers]
+        for thread in producer_threads:
+            thread.start()
+        for thread in producer_threads:
+            thread.join()
+        while not local_backends.broker.is_idle():
+            time.sleep(0.01)
+        wall_s = time.perf_counter() - start
+        local_backends.broker.close()
+        for thread in consumer_threads:
+            thread.join()
+
+    report(args.messages, wall_s, producer_timings, stages, local_backends.broker,
+           local_backends.local_influx_client().sink)
+    print(f"Backend files: {local_backends.LOCAL_BACKEND_DIR}")
+
+
+if __name__ == "__main__":
+    main()
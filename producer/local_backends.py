@@ -0,0 +1,696 @@
+import os
+import io
+import copy
+import json
+import time
+import shutil
+import fnmatch
+import logging
+import tempfile
+import threading
+from collections import deque, defaultdict
+from types import SimpleNamespace
+
+# In-process stand-ins for RabbitMQ, Redis, MinIO and InfluxDB.
+# Selected with PIPELINE_BACKEND=local so the producers and consumers can run
+# end to end inside a single Python process without Docker (see e2e_bench.py).
+
+PIPELINE_BACKEND = os.getenv("PIPELINE_BACKEND", "docker")  # 'docker' or 'local'
+LOCAL_BACKEND_DIR = os.getenv("LOCAL_BACKEND_DIR") or tempfile.mkdtemp(prefix="fraudinsight-")
+
+
+def local_properties(**kwargs):
+    props = SimpleNamespace(
+        headers=None, delivery_mode=None, priority=None, content_type=None,
+        content_encoding=None, expiration=None, message_id=None, timestamp=None,
+    )
+    props.__dict__.update(kwargs)
+    return props
+
+
+# --- RabbitMQ ---
+class LocalMessage:
+    __slots__ = ("body", "properties", "exchange", "routing_key", "enqueued_at",
+                 "expires_at", "delivered_at", "redelivered", "queue")
+
+    def __init__(self, body, properties, exchange, routing_key):
+        self.body = body if isinstance(body, bytes) else str(body).encode("utf-8")
+        self.properties = properties if properties is not None else local_properties()
+        self.exchange = exchange
+        self.routing_key = routing_key
+        self.enqueued_at = time.perf_counter()
+        self.expires_at = None
+        self.delivered_at = None
+        self.redelivered = False
+        self.queue = None
+
+
+class LocalQueue:
+    def __init__(self, name, arguments=None):
+        self.name = name
+        self.arguments = dict(arguments or {})
+        self.ready = deque()
+        self.stats = defaultdict(float)
+
+    @property
+    def unacked(self):
+        return int(self.stats["delivered"] - self.stats["acked"] - self.stats["nacked"])
+
+
+class InMemoryBroker:
+    """Single-process AMQP stand-in with exchanges, prefetch, ack/nack and dead-lettering."""
+
+    def __init__(self):
+        self.lock = threading.Condition()
+        self.queues = {}
+        self.exchanges = {"": "direct"}
+        self.bindings = defaultdict(list)  # exchange -> [(queue, routing_key)]
+        self.unroutable = 0
+        self.consumer_counts = defaultdict(int)  # queue -> consumers across every channel, for queue_declare
+        self.closed = False
+
+    def declare_exchange(self, exchange, exchange_type="direct"):
+        with self.lock:
+            self.exchanges.setdefault(exchange, exchange_type)
+
+    def declare_queue(self, name, arguments=None, passive=False):
+        with self.lock:
+            if name not in self.queues:
+                if passive:
+                    raise KeyError(f"NOT_FOUND - no queue '{name}'")
+                self.queues[name] = LocalQueue(name, arguments)
+            return self.queues[name]
+
+    def bind(self, queue, exchange, routing_key):
+        with self.lock:
+            if (queue, routing_key) not in self.bindings[exchange]:
+                self.bindings[exchange].append((queue, routing_key))
+
+    def route(self, exchange, routing_key):
+        if exchange == "":
+            return [routing_key] if routing_key in self.queues else []
+        exchange_type = self.exchanges.get(exchange, "direct")
+        if exchange_type == "fanout":
+            return [queue for queue, _ in self.bindings[exchange]]
+        if exchange_type == "topic":
+            pattern = lambda key: key.replace("#", "*")
+            return [queue for queue, key in self.bindings[exchange] if fnmatch.fnmatchcase(routing_key, pattern(key))]
+        return [queue for queue, key in self.bindings[exchange] if key == routing_key]
+
+    def publish(self, exchange, routing_key, body, properties=None):
+        with self.lock:
+            targets = self.route(exchange, routing_key)
+            if not targets:
+                self.unroutable += 1
+                return False
+            for queue_name in targets:
+                message = LocalMessage(body, properties, exchange, routing_key)
+                self._enqueue(self.queues[queue_name], message)
+            self.lock.notify_all()
+            return True
+
+    def _enqueue(self, queue, message):
+        message.queue = queue.name
+        ttls = [queue.arguments.get("x-message-ttl"), getattr(message.properties, "expiration", None)]
+        ttls = [int(ttl) for ttl in ttls if ttl is not None]
+        if ttls:
+            message.expires_at = message.enqueued_at + min(ttls) / 1000
+        queue.ready.append(message)
+        queue.stats["published"] += 1
+
+    def expire_due(self):
+        # Like RabbitMQ, only messages at the head of a queue are expired and dead-lettered
+        now = time.perf_counter()
+        for queue in list(self.queues.values()):
+            while queue.ready and queue.ready[0].expires_at is not None and queue.ready[0].expires_at <= now:
+                queue.stats["expired"] += 1
+                self._dead_letter(queue, queue.ready.popleft(), "expired")
+
+    def take(self, queue_name):
+        self.expire_due()
+        queue = self.queues.get(queue_name)
+        if queue is None or not queue.ready:
+            return None
+        message = queue.ready.popleft()
+        message.delivered_at = time.perf_counter()
+        queue.stats["delivered"] += 1
+        queue.stats["wait_s"] += message.delivered_at - message.enqueued_at
+        return message
+
+    def settle(self, message, acked, requeue=False):
+        with self.lock:
+            queue = self.queues[message.queue]
+            queue.stats["service_s"] += time.perf_counter() - message.delivered_at
+            if acked:
+                queue.stats["acked"] += 1
+            else:
+                queue.stats["nacked"] += 1
+                if requeue:
+                    message.redelivered = True
+                    queue.ready.appendleft(message)
+                    queue.stats["delivered"] -= 1
+                    queue.stats["nacked"] -= 1
+                else:
+                    self._dead_letter(queue, message, "rejected")
+            self.lock.notify_all()
+
+    def _dead_letter(self, queue, message, reason):
+        dlx = queue.arguments.get("x-dead-letter-exchange")
+        if dlx is None:
+            queue.stats["dropped"] += 1
+            return
+        routing_key = queue.arguments.get("x-dead-letter-routing-key", message.routing_key)
+        headers = dict(message.properties.headers or {})
+        deaths = list(headers.get("x-death", []))
+        deaths.insert(0, {"queue": queue.name, "reason": reason, "count": 1,
+                          "exchange": message.exchange, "routing-keys": [message.routing_key]})
+        headers["x-death"] = deaths
+        properties = copy.copy(message.properties)
+        properties.headers = headers
+        queue.stats["dead_lettered"] += 1
+        for target in self.route(dlx, routing_key):
+            self._enqueue(self.queues[target], LocalMessage(message.body, properties, dlx, routing_key))
+
+    def is_idle(self):
+        with self.lock:
+            self.expire_due()
+            return all(not queue.ready and queue.unacked == 0 for queue in self.queues.values())
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            self.lock.notify_all()
+
+
+class LocalChannel:
+    def __init__(self, broker):
+        self.broker = broker
+        self.prefetch_count = 0
+        self.consumers = []
+        self.consumer_prefetch = []  # prefetch_count in force when each consumer was added (per consumer, as in RabbitMQ)
+        self.cancelled = set()  # consumer indexes; their deliveries stay unacked until settled, as in RabbitMQ
+        self.unacked = {}
+        self.delivered_to = {}  # delivery tag -> consumer index, for process_data_events
+        self.next_tag = 1
+        self.is_open = True
+        self.confirming = False
+        self._stop = False
+
+    # Topology
+    def exchange_declare(self, exchange, exchange_type="direct", durable=False, **kwargs):
+        self.broker.declare_exchange(exchange, exchange_type)
+
+    def queue_declare(self, queue, durable=False, arguments=None, passive=False, **kwargs):
+        import pika
+        if not self.is_open:
+            raise pika.exceptions.ChannelWrongStateError("Channel is closed.")
+        try:
+            local_queue = self.broker.declare_queue(queue, arguments, passive)
+        except KeyError as e:
+            # RabbitMQ answers a passive declare of a missing queue by closing the channel
+            self.close()
+            raise pika.exceptions.ChannelClosedByBroker(404, e.args[0]) from None
+        return SimpleNamespace(method=SimpleNamespace(
+            queue=queue, message_count=len(local_queue.ready), consumer_count=self.broker.consumer_counts[queue]))
+
+    def queue_bind(self, queue, exchange, routing_key=None, **kwargs):
+        self.broker.bind(queue, exchange, routing_key if routing_key is not None else queue)
+
+    def basic_qos(self, prefetch_count=0, **kwargs):
+        self.prefetch_count = prefetch_count
+
+    def confirm_delivery(self):
+        self.confirming = True
+
+    # Publishing
+    def basic_publish(self, exchange, routing_key, body, properties=None, mandatory=False):
+        routed = self.broker.publish(exchange, routing_key, body, properties)
+        if not routed and mandatory and self.confirming:
+            # As pika's BlockingChannel in confirm mode, which raises once the broker returns the message
+            import pika
+            raise pika.exceptions.UnroutableError([SimpleNamespace(method=SimpleNamespace(
+                exchange=exchange, routing_key=routing_key, reply_text="NO_ROUTE"), properties=properties, body=body)])
+
+    # Consuming
+    def basic_consume(self, queue, on_message_callback, auto_ack=False, **kwargs):
+        self.consumers.append((queue, on_message_callback, auto_ack))
+        self.consumer_prefetch.append(self.prefetch_count)
+        self.broker.consumer_counts[queue] += 1
+        return f"ctag-{len(self.consumers)}"
+
+    def basic_cancel(self, consumer_tag):
+        index = int(consumer_tag.rsplit("-", 1)[1]) - 1
+        if index not in self.cancelled:
+            self.cancelled.add(index)
+            self.broker.consumer_counts[self.consumers[index][0]] -= 1
+        return []
+
+    def _deliver(self, message, auto_ack, consumer=None):
+        tag = self.next_tag
+        self.next_tag += 1
+        if auto_ack:
+            self.broker.settle(message, acked=True)
+        else:
+            self.unacked[tag] = message
+            if consumer is not None:
+                self.delivered_to[tag] = consumer
+        method = SimpleNamespace(delivery_tag=tag, routing_key=message.routing_key,
+                                 exchange=message.exchange, redelivered=message.redelivered)
+        return method
+
+    def basic_get(self, queue, auto_ack=False):
+        with self.broker.lock:
+            message = self.broker.take(queue)
+        if message is None:
+            return None, None, None
+        return self._deliver(message, auto_ack), message.properties, message.body
+
+    def start_consuming(self):
+        self._stop = False
+        while not self._stop:
+            delivery = None
+            with self.broker.lock:
+                if self.prefetch_count == 0 or len(self.unacked) < self.prefetch_count:
+                    for index, (queue, callback, auto_ack) in enumerate(self.consumers):
+                        if index in self.cancelled:
+                            continue
+                        message = self.broker.take(queue)
+                        if message is not None:
+                            delivery = (message, callback, auto_ack)
+                            break
+                if delivery is None:
+                    if self.broker.closed:
+                        return
+                    self.broker.lock.wait(timeout=0.05)
+                    continue
+            message, callback, auto_ack = delivery
+            method = self._deliver(message, auto_ack)
+            callback(self, method, message.properties, message.body)
+
+    def stop_consuming(self):
+        self._stop = True
+
+    def process_data_events(self, time_limit=0):
+        # Event-loop style consumption (BlockingConnection.process_data_events): fill every consumer up to its
+        # own prefetch, waiting up to time_limit for the first delivery
+        deadline = time.monotonic() + (time_limit or 0)
+        while True:
+            deliveries = []
+            with self.broker.lock:
+                in_hand = [0] * len(self.consumers)
+                for consumer in self.delivered_to.values():
+                    in_hand[consumer] += 1
+                for index, (queue, callback, auto_ack) in enumerate(self.consumers):
+                    if index in self.cancelled:
+                        continue
+                    prefetch = self.consumer_prefetch[index]
+                    while not prefetch or in_hand[index] < prefetch:
+                        message = self.broker.take(queue)
+                        if message is None:
+                            break
+                        in_hand[index] += 1
+                        deliveries.append((index, message, callback, auto_ack))
+                remaining = deadline - time.monotonic()
+                if not deliveries:
+                    if remaining <= 0 or self.broker.closed:
+                        return
+                    self.broker.lock.wait(timeout=min(remaining, 0.05))
+                    continue
+            for index, message, callback, auto_ack in deliveries:
+                method = self._deliver(message, auto_ack, index)
+                callback(self, method, message.properties, message.body)
+            return
+
+    def basic_ack(self, delivery_tag=0, multiple=False):
+        for tag in self._settled_tags(delivery_tag, multiple):
+            self.delivered_to.pop(tag, None)
+            self.broker.settle(self.unacked.pop(tag), acked=True)
+
+    def basic_nack(self, delivery_tag=0, multiple=False, requeue=True):
+        for tag in self._settled_tags(delivery_tag, multiple):
+            self.delivered_to.pop(tag, None)
+            self.broker.settle(self.unacked.pop(tag), acked=False, requeue=requeue)
+
+    def basic_reject(self, delivery_tag, requeue=True):
+        self.basic_nack(delivery_tag, requeue=requeue)
+
+    def _settled_tags(self, delivery_tag, multiple):
+        if multiple:
+            return [tag for tag in sorted(self.unacked) if delivery_tag == 0 or tag <= delivery_tag]
+        return [delivery_tag]
+
+    def close(self):
+        for tag in list(self.unacked):
+            self.broker.settle(self.unacked.pop(tag), acked=False, requeue=True)
+        self.delivered_to.clear()
+        if self.is_open:
+            for index, (queue, _, _) in enumerate(self.consumers):
+                if index not in self.cancelled:
+                    self.broker.consumer_counts[queue] -= 1
+        self.is_open = False
+
+
+class LocalConnection:
+    def __init__(self, broker):
+        self.broker = broker
+        self.channels = []
+        self._open = True
+
+    @property
+    def is_open(self):
+        # Closing the broker (end of an e2e_bench run) closes every connection, like a broker shutdown
+        return self._open and not self.broker.closed
+
+    def channel(self):
+        channel = LocalChannel(self.broker)
+        self.channels.append(channel)
+        return channel
+
+    def process_data_events(self, time_limit=0):
+        for index, channel in enumerate(self.channels):
+            channel.process_data_events(time_limit if index == 0 else 0)
+
+    def sleep(self, duration):
+        time.sleep(duration)
+
+    def add_callback_threadsafe(self, callback):
+        callback()
+
+    def close(self):
+        self._open = False
+
+
+# --- Redis ---
+class LocalRedis:
+    """Dict-backed subset of redis.Redis used by the producers and DLQ consumers."""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.data = {}
+
+    @staticmethod
+    def _encode(value):
+        if isinstance(value, bytes):
+            return value
+        return str(value).encode("utf-8")
+
+    def ping(self):
+        return True
+
+    def set(self, name, value, ex=None):
+        with self.lock:
+            self.data[name] = self._encode(value)
+        return True
+
+    def get(self, name):
+        return self.data.get(name)
+
+    def hset(self, name, key=None, value=None, mapping=None):
+        with self.lock:
+            fields = self.data.setdefault(name, {})
+            items = dict(mapping or {})
+            if key is not None:
+                items[key] = value
+            for field, field_value in items.items():
+                fields[self._encode(field)] = self._encode(field_value)
+        return len(items)
+
+    def hgetall(self, name):
+        return dict(self.data.get(name, {}))
+
+    def expire(self, name, seconds):
+        return name in self.data
+
+    def zadd(self, name, mapping):
+        with self.lock:
+            members = self.data.setdefault(name, {})
+            added = 0
+            for member, score in mapping.items():
+                member = self._encode(member)
+                added += member not in members
+                members[member] = float(score)
+        return added
+
+    @staticmethod
+    def _in_range(score, min, max):
+        # Redis score bounds: numbers, '-inf'/'+inf', or '(' prefixed for exclusive
+        low, high = str(min), str(max)
+        above = score > float(low[1:]) if low.startswith("(") else score >= float(low)
+        below = score < float(high[1:]) if high.startswith("(") else score <= float(high)
+        return above and below
+
+    def zrangebyscore(self, name, min, max, start=None, num=None):
+        with self.lock:
+            members = sorted((score, member) for member, score in self.data.get(name, {}).items()
+                             if self._in_range(score, min, max))
+        members = [member for _, member in members]
+        return members[start:start + num] if start is not None and num is not None else members
+
+    def zremrangebyscore(self, name, min, max):
+        with self.lock:
+            members = self.data.get(name, {})
+            removed = [member for member, score in members.items() if self._in_range(score, min, max)]
+            for member in removed:
+                del members[member]
+        return len(removed)
+
+    def zcard(self, name):
+        return len(self.data.get(name, {}))
+
+    def delete(self, *names):
+        with self.lock:
+            return sum(1 for name in names if self.data.pop(name, None) is not None)
+
+    def keys(self, pattern="*"):
+        return [key.encode("utf-8") for key in list(self.data) if fnmatch.fnmatchcase(key, pattern)]
+
+    def pipeline(self, transaction=True):
+        return LocalPipeline(self)
+
+
+class LocalPipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        command = getattr(self.client, name)
+
+        def queue_command(*args, **kwargs):
+            self.commands.append((command, args, kwargs))
+            return self
+        return queue_command
+
+    def execute(self):
+        with self.client.lock:
+            results = [command(*args, **kwargs) for command, args, kwargs in self.commands]
+        self.commands = []
+        return results
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.commands = []
+
+
+# --- MinIO / S3 ---
+class ClientError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.response = {"Error": {"Code": str(code), "Message": message}}
+
+
+class LocalObjectStore:
+    """MinIO-compatible object store on a local directory, covering the boto3 and minio calls we use."""
+
+    exceptions = SimpleNamespace(ClientError=ClientError)
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, bucket, key):
+        return os.path.join(self.root, bucket, key)
+
+    def _meta_path(self, bucket, key):
+        return os.path.join(self.root, bucket, ".meta", f"{key}.json")
+
+    def _require(self, bucket, key=None):
+        if not os.path.isdir(os.path.join(self.root, bucket)):
+            raise ClientError(404, f"Bucket '{bucket}' not found")
+        if key is not None and not os.path.isfile(self._path(bucket, key)):
+            raise ClientError(404, f"Object '{key}' not found in bucket '{bucket}'")
+
+    def _store(self, bucket, key, fileobj, metadata=None, content_type=None):
+        self._require(bucket)
+        path = self._path(bucket, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as out:
+            shutil.copyfileobj(fileobj, out)
+        meta_path = self._meta_path(bucket, key)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        with open(meta_path, "w") as out:
+            json.dump({"metadata": dict(metadata or {}), "content_type": content_type}, out)
+
+    def _load_meta(self, bucket, key):
+        try:
+            with open(self._meta_path(bucket, key)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"metadata": {}, "content_type": None}
+
+    # boto3 API
+    def head_bucket(self, Bucket):
+        self._require(Bucket)
+        return {}
+
+    def create_bucket(self, Bucket):
+        os.makedirs(os.path.join(self.root, Bucket), exist_ok=True)
+        return {}
+
+    def upload_fileobj(self, Fileobj, Bucket, Key, ExtraArgs=None, Config=None):
+        extra = ExtraArgs or {}
+        self._store(Bucket, Key, Fileobj, extra.get("Metadata"), extra.get("ContentType"))
+
+    def put_object(self, *args, **kwargs):
+        # boto3 passes Bucket/Key/Body keywords, minio passes (bucket_name, object_name, data, length, ...)
+        if args or "bucket_name" in kwargs:
+            names = ("bucket_name", "object_name", "data", "length")
+            params = {**dict(zip(names, args)), **kwargs}
+            bucket, key, body = params["bucket_name"], params["object_name"], params["data"]
+            metadata, content_type = params.get("metadata"), params.get("content_type")
+        else:
+            bucket, key, body = kwargs["Bucket"], kwargs["Key"], kwargs["Body"]
+            metadata, content_type = kwargs.get("Metadata"), kwargs.get("ContentType")
+        if isinstance(body, (bytes, bytearray)):
+            body = io.BytesIO(body)
+        self._store(bucket, key, body, metadata, content_type)
+        return {}
+
+    def head_object(self, Bucket, Key):
+        self._require(Bucket, Key)
+        meta = self._load_meta(Bucket, Key)
+        return {"ContentLength": os.path.getsize(self._path(Bucket, Key)),
+                "Metadata": meta["metadata"], "ContentType": meta["content_type"]}
+
+    def download_fileobj(self, Bucket, Key, Fileobj, Config=None):
+        self._require(Bucket, Key)
+        with open(self._path(Bucket, Key), "rb") as f:
+            shutil.copyfileobj(f, Fileobj)
+
+    # minio API
+    def bucket_exists(self, bucket_name):
+        return os.path.isdir(os.path.join(self.root, bucket_name))
+
+    def make_bucket(self, bucket_name):
+        self.create_bucket(Bucket=bucket_name)
+
+    def stat_object(self, bucket_name, object_name):
+        head = self.head_object(Bucket=bucket_name, Key=object_name)
+        return SimpleNamespace(bucket_name=bucket_name, object_name=object_name, size=head["ContentLength"],
+                               metadata=head["Metadata"], content_type=head["ContentType"])
+
+    def fget_object(self, bucket_name, object_name, file_path):
+        with open(file_path, "wb") as out:
+            self.download_fileobj(Bucket=bucket_name, Key=object_name, Fileobj=out)
+
+    def get_object(self, bucket_name, object_name):
+        self._require(bucket_name, object_name)
+        with open(self._path(bucket_name, object_name), "rb") as f:
+            data = f.read()
+        return LocalObjectResponse(data)
+
+
+class LocalObjectResponse(io.BytesIO):
+    def release_conn(self):
+        pass
+
+
+# --- InfluxDB ---
+class LineProtocolSink:
+    """write_api stand-in that appends line protocol per bucket to files under the backend directory."""
+
+    def __init__(self, root):
+        self.root = root
+        self.lock = threading.Lock()
+        self.points = defaultdict(int)
+        self.write_s = defaultdict(float)
+        os.makedirs(root, exist_ok=True)
+
+    def _lines(self, record):
+        if record is None:
+            return []
+        if isinstance(record, (str, bytes)):
+            return [record.decode("utf-8") if isinstance(record, bytes) else record]
+        if hasattr(record, "to_line_protocol"):
+            return [record.to_line_protocol()]
+        lines = []
+        for item in record:
+            lines.extend(self._lines(item))
+        return lines
+
+    def write(self, bucket, org=None, record=None, write_precision=None, **kwargs):
+        start = time.perf_counter()
+        lines = self._lines(record)
+        with self.lock:
+            with open(os.path.join(self.root, f"{bucket}.lp"), "a", encoding="utf-8") as out:
+                out.write("\n".join(lines) + "\n")
+            self.points[bucket] += len(lines)
+            self.write_s[bucket] += time.perf_counter() - start
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class LocalInfluxClient:
+    def __init__(self, root):
+        self.root = root
+        self.sink = LineProtocolSink(root)
+        self.buckets = set()
+
+    def buckets_api(self):
+        return self
+
+    def find_buckets(self, **kwargs):
+        return SimpleNamespace(buckets=[SimpleNamespace(name=name) for name in sorted(self.buckets)])
+
+    def find_bucket_by_name(self, bucket_name):
+        return SimpleNamespace(name=bucket_name) if bucket_name in self.buckets else None
+
+    def create_bucket(self, bucket_name=None, org=None, retention_rules=None, **kwargs):
+        self.buckets.add(bucket_name)
+        return SimpleNamespace(name=bucket_name)
+
+    def write_api(self, **kwargs):
+        return self.sink
+
+    def close(self):
+        pass
+
+
+# --- Shared singletons so producers and consumers in one process see the same state ---
+broker = InMemoryBroker()
+_redis = LocalRedis()
+_object_store = LocalObjectStore(os.path.join(LOCAL_BACKEND_DIR, "minio"))
+_influx = LocalInfluxClient(os.path.join(LOCAL_BACKEND_DIR, "influxdb"))
+
+
+def connect_local_broker():
+    logging.info("[Local] Using in-memory broker")
+    return LocalConnection(broker)
+
+
+def local_redis():
+    return _redis
+
+
+def local_object_store():
+    return _object_store
+
+
+def local_influx_client():
+    return _influx
@@ -0,0 +1,51 @@
+import os
+import time
+
+# Per-message metadata in Redis, written by the producers through the publisher's pipelined batches.
+# Each message gets a small hash (kept in Redis's compact listpack encoding) that expires after
+# METADATA_TTL, plus an entry in a per-queue sorted set scored by timestamp, so time-range lookups
+# use ZRANGEBYSCORE instead of KEYS/SCAN.
+
+METADATA_TTL = int(os.getenv("METADATA_TTL", 7 * 24 * 3600))  # seconds, 0 keeps metadata forever
+INDEX_TRIM_EVERY = 1000  # writes between trims of index entries whose hash has expired
+
+
+class MetadataSink:
+    def __init__(self, prefix, queue, ttl=METADATA_TTL):
+        self.prefix = prefix
+        self.ttl = ttl
+        self.index_key = f"{prefix}:index:{queue}"
+        self.writes = 0
+
+    def key(self, message_id):
+        return f"{self.prefix}:{message_id}"
+
+    def write(self, pipe, message_id, timestamp, fields):
+        """Queue the writes for one message on a Redis pipeline."""
+        key = self.key(message_id)
+        pipe.hset(key, mapping=fields)
+        pipe.zadd(self.index_key, {message_id: timestamp})
+        if self.ttl:
+            pipe.expire(key, self.ttl)
+            self.writes += 1
+            if self.writes % INDEX_TRIM_EVERY == 1:
+                pipe.zremrangebyscore(self.index_key, "-inf", f"({timestamp - self.ttl}")
+                pipe.expire(self.index_key, self.ttl)
+
+    def writer(self, message_id, timestamp, fields):
+        """Callable for ConfirmedPublisher.publish(metadata=...)."""
+        return lambda pipe: self.write(pipe, message_id, timestamp, fields)
+
+    def between(self, redis_client, start, stop=None, limit=None):
+        """[(message_id, fields)] for messages published in [start, stop] (epoch seconds), oldest first."""
+        stop = time.time() if stop is None else stop
+        if limit is None:
+            message_ids = redis_client.zrangebyscore(self.index_key, start, stop)
+        else:
+            message_ids = redis_client.zrangebyscore(self.index_key, start, stop, start=0, num=limit)
+        with redis_client.pipeline(transaction=False) as pipe:
+            for message_id in message_ids:
+                pipe.hgetall(self.key(message_id.decode()))
+            results = pipe.execute()
+        # Hashes that already expired come back empty
+        return [(message_id.decode(), fields) for message_id, fields in zip(message_ids, results) if fields]
@@ -0,0 +1,412 @@
+import os
+import time
+import logging
+import threading
+from collections import deque
+
+import pika
+
+import messages
+
+# Pipelined publishing with publisher confirms, shared by text_producer.py and voice_producer.py.
+# A pika SelectConnection runs in a background thread and keeps up to PUBLISH_WINDOW messages
+# unconfirmed on the wire. Redis metadata for a message is only written once the broker has
+# confirmed it, pipelined in batches from the same I/O loop. Unconfirmed messages are
+# republished after a reconnect, nacked ones straight away. While the broker has the connection
+# blocked (memory or disk alarm) nothing more is written to the socket; messages wait in pending,
+# publish() blocks once PUBLISH_BUFFER fills up, and no work is dropped.
+
+PIPELINE_BACKEND = os.getenv("PIPELINE_BACKEND", "docker")  # 'docker' or 'local' (in-process stand-ins)
+PUBLISH_WINDOW = int(os.getenv("PUBLISH_WINDOW", 256))  # max unconfirmed messages in flight
+PUBLISH_BUFFER = int(os.getenv("PUBLISH_BUFFER", 10000))  # publish() blocks once this many are queued
+METADATA_BATCH_SIZE = int(os.getenv("METADATA_BATCH_SIZE", 100))
+METADATA_FLUSH_INTERVAL = float(os.getenv("METADATA_FLUSH_INTERVAL", 0.5))  # seconds
+RECONNECT_DELAY = 2  # seconds
+PUBLISHED_AT_HEADER = "x-published-at"
+
+
+class PublishRecord:
+    __slots__ = ("routing_key", "body", "properties", "metadata", "submitted_at", "attempts")
+
+    def __init__(self, routing_key, body, properties, metadata):
+        self.routing_key = routing_key
+        self.body = body
+        self.properties = properties
+        self.metadata = metadata  # callable(redis_pipeline) run after the broker confirms
+        self.submitted_at = time.perf_counter()
+        self.attempts = 0
+
+
+class ConfirmedPublisher:
+    def __init__(self, parameters, queue, queue_arguments=None, redis_client=None, window=PUBLISH_WINDOW,
+                 name="publisher", passive=False, extra_queues=()):
+        self.parameters = parameters
+        self.queue = queue
+        self.extra_queues = list(extra_queues)  # declared like queue, e.g. the <queue>.priority lane
+        self.queue_arguments = queue_arguments
+        self.passive = passive  # only check the queue exists, whatever arguments it was declared with
+        self.redis_client = redis_client
+        self.window = window
+        self.name = name
+
+        self.lock = threading.Condition()
+        self.pending = deque()  # guarded by lock; the I/O thread pops from the left
+        self.in_flight = {}  # delivery tag -> record, written by the I/O thread under lock
+        self.metadata_batch = []  # I/O thread only
+        self.metadata_pending = 0  # confirmed messages whose metadata is not written yet, guarded by lock
+        self.confirm_latencies = deque(maxlen=100000)
+
+        self.stats = {"submitted": 0, "published": 0, "confirmed": 0, "nacked": 0, "republished": 0,
+                      "reconnects": 0, "metadata_written": 0, "metadata_failed": 0, "blocks": 0, "blocked_s": 0.0}
+        self.connection = None
+        self.channel = None
+        self.delivery_tag = 0
+        self.blocked_since = None  # monotonic time of the broker's connection.blocked, I/O thread only
+        self.stopping = False
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    # --- Producer side (any thread) ---
+    def start(self):
+        self.thread.start()
+        return self
+
+    def publish(self, routing_key, body, properties=None, metadata=None):
+        properties = properties or pika.BasicProperties(delivery_mode=2)
+        # Consumers measure per-lane lag from this stamp
+        properties.headers = {**(properties.headers or {}), PUBLISHED_AT_HEADER: time.time()}
+        record = PublishRecord(routing_key, body, properties, metadata)
+        with self.lock:
+            while len(self.pending) >= PUBLISH_BUFFER:
+                self.lock.wait(0.1)
+            self.pending.append(record)
+            self.stats["submitted"] += 1
+            self.lock.notify_all()
+        self._wake()
+
+    def counters(self):
+        with self.lock:
+            return dict(self.stats, pending=len(self.pending), in_flight=len(self.in_flight),
+                        blocked=self.blocked_since is not None)
+
+    def flush(self, timeout=None):
+        """Wait until every submitted message is confirmed and its metadata written."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.lock:
+            while self.pending or self.in_flight or self.metadata_pending:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.lock.wait(0.1 if remaining is None else min(0.1, remaining))
+        return True
+
+    def close(self, timeout=None):
+        self.flush(timeout)
+        self.stopping = True
+        with self.lock:
+            self.lock.notify_all()
+        self._call_in_loop(self._shutdown)
+        self.thread.join(timeout=10)
+        logging.info(f"[Publisher] {self.name} closed: {self.counters()}")
+
+    def _wake(self):
+        self._call_in_loop(self._drain)
+
+    def _call_in_loop(self, callback):
+        connection = self.connection
+        if connection is not None and not connection.is_closed:
+            try:
+                connection.ioloop.add_callback_threadsafe(callback)
+            except pika.exceptions.ConnectionWrongStateError:
+                pass
+
+    # --- I/O thread ---
+    def _run(self):
+        if PIPELINE_BACKEND == "local":
+            return self._run_local()
+        while not self.stopping:
+            self.connection = pika.SelectConnection(
+                self.parameters,
+                on_open_callback=self._on_connection_open,
+                on_open_error_callback=self._on_connection_lost,
+                on_close_callback=self._on_connection_lost,
+            )
+            self.connection.add_on_connection_blocked_callback(self._on_blocked)
+            self.connection.add_on_connection_unblocked_callback(self._on_unblocked)
+            self.connection.ioloop.start()
+            if not self.stopping:
+                self.stats["reconnects"] += 1
+                time.sleep(RECONNECT_DELAY)
+
+    def _on_connection_open(self, connection):
+        logging.info(f"[Publisher] {self.name} connected to {self.parameters.host}")
+        connection.channel(on_open_callback=self._on_channel_open)
+
+    def _on_connection_lost(self, connection, reason):
+        self.channel = None
+        self._on_unblocked(connection, None)  # a blocked_connection_timeout lands here; in-flight is requeued
+        self._requeue_in_flight()
+        if not self.stopping:
+            logging.warning(f"[Publisher] {self.name} connection lost ({reason}), reconnecting in {RECONNECT_DELAY}s")
+        connection.ioloop.stop()
+
+    def _on_blocked(self, connection, frame):
+        reason = getattr(frame.method, "reason", "")
+        logging.warning(f"[Publisher] {self.name} blocked by the broker ({reason}), holding "
+                        f"{len(self.pending)} pending messages")
+        self.blocked_since = time.monotonic()
+        self.stats["blocks"] += 1
+
+    def _on_unblocked(self, connection, frame):
+        if self.blocked_since is None:
+            return
+        blocked_s = time.monotonic() - self.blocked_since
+        self.blocked_since = None
+        self.stats["blocked_s"] += blocked_s
+        logging.info(f"[Publisher] {self.name} unblocked after {blocked_s:.1f}s")
+        self._drain()
+
+    def _on_channel_open(self, channel):
+        channel.add_on_close_callback(self._on_channel_closed)
+        self._declare_queues(channel, [self.queue, *self.extra_queues])
+
+    def _declare_queues(self, channel, queues):
+        if not queues:
+            return self._on_queue_declared(channel)
+        channel.queue_declare(queue=queues[0], durable=True, arguments=self.queue_arguments, passive=self.passive,
+                              callback=lambda _frame: self._declare_queues(channel, queues[1:]))
+
+    def _on_channel_closed(self, channel, reason):
+        logging.warning(f"[Publisher] {self.name} channel closed: {reason}")
+        self.channel = None
+        if not self.connection.is_closing and not self.connection.is_closed:
+            self.connection.close()
+
+    def _on_queue_declared(self, channel):
+        channel.confirm_delivery(self._on_confirm)
+        self.channel = channel
+        self.delivery_tag = 0
+        self._schedule_metadata_flush()
+        self._drain()
+
+    def _drain(self):
+        if self.channel is None or not self.channel.is_open or self.blocked_since is not None:
+            return
+        # basic_publish only appends to the socket buffer here; holding the lock keeps every record
+        # visible to flush() in either pending or in_flight
+        with self.lock:
+            while len(self.in_flight) < self.window and self.pending:
+                record = self.pending.popleft()
+                record.attempts += 1
+                self.channel.basic_publish(exchange="", routing_key=record.routing_key, body=record.body,
+                                           properties=record.properties)
+                self.delivery_tag += 1
+                self.in_flight[self.delivery_tag] = record
+                self.stats["published"] += 1
+            self.lock.notify_all()
+
+    def _on_confirm(self, frame):
+        method = frame.method
+        acked = isinstance(method, pika.spec.Basic.Ack)
+        tags = [tag for tag in self.in_flight if tag <= method.delivery_tag] if method.multiple else [method.delivery_tag]
+        now = time.perf_counter()
+        retry = []
+        # A record leaves in_flight for metadata_pending or pending in one step, so flush() never misses it
+        with self.lock:
+            for tag in tags:
+                record = self.in_flight.pop(tag, None)
+                if record is None:
+                    continue
+                if acked:
+                    self.stats["confirmed"] += 1
+                    self.confirm_latencies.append(now - record.submitted_at)
+                    if record.metadata is not None:
+                        self.metadata_batch.append(record.metadata)
+                        self.metadata_pending += 1
+                else:
+                    self.stats["nacked"] += 1
+                    retry.append(record)
+            if retry:
+                logging.warning(f"[Publisher] {self.name} broker nacked {len(retry)} messages, republishing")
+                self._requeue(retry)
+        if len(self.metadata_batch) >= METADATA_BATCH_SIZE:
+            self._flush_metadata()
+        with self.lock:
+            self.lock.notify_all()
+        self._drain()
+
+    def _requeue(self, records):
+        # Back to the front of the queue, oldest first; lock is reentrant, callers may already hold it
+        with self.lock:
+            self.pending.extendleft(reversed(records))
+            self.stats["republished"] += len(records)
+
+    def _requeue_in_flight(self):
+        if self.in_flight:
+            logging.warning(f"[Publisher] {self.name} {len(self.in_flight)} unconfirmed messages will be republished")
+            with self.lock:
+                records = [self.in_flight[tag] for tag in sorted(self.in_flight)]
+                self.in_flight.clear()
+                self._requeue(records)
+
+    def _schedule_metadata_flush(self):
+        if self.connection is not None and not self.connection.is_closed:
+            self.connection.ioloop.call_later(METADATA_FLUSH_INTERVAL, self._on_flush_timer)
+
+    def _on_flush_timer(self):
+        self._flush_metadata()
+        if self.channel is not None:
+            self._schedule_metadata_flush()
+
+    def _flush_metadata(self):
+        if not self.metadata_batch:
+            return
+        batch, self.metadata_batch = self.metadata_batch, []
+        if self.redis_client is not None:
+            try:
+                with self.redis_client.pipeline(transaction=False) as pipe:
+                    for write in batch:
+                        write(pipe)
+                    pipe.execute()
+                self.stats["metadata_written"] += len(batch)
+            except Exception as e:
+                # The messages are already confirmed; metadata is best effort, as before, and must not
+                # take the I/O thread down with it
+                self.stats["metadata_failed"] += len(batch)
+                logging.error(f"[Redis] Failed to write metadata for {len(batch)} messages: {e}")
+        with self.lock:
+            self.metadata_pending -= len(batch)
+            self.lock.notify_all()
+
+    def _shutdown(self):
+        self._flush_metadata()
+        if self.connection is not None and not self.connection.is_closing and not self.connection.is_closed:
+            self.connection.close()
+
+    def _run_local(self):
+        # The in-memory broker confirms on publish, so each drained message is confirmed straight away
+        from local_backends import connect_local_broker
+        channel = connect_local_broker().channel()
+        for queue in [self.queue, *self.extra_queues]:
+            channel.queue_declare(queue=queue, durable=True, arguments=self.queue_arguments, passive=self.passive)
+        last_flush = time.monotonic()
+        while True:
+            with self.lock:
+                while not self.pending and not self.stopping and not self.metadata_batch:
+                    self.lock.wait(METADATA_FLUSH_INTERVAL)
+                if self.stopping and not self.pending:
+                    break
+                records = [self.pending.popleft() for _ in range(min(len(self.pending), self.window))]
+                now = time.perf_counter()
+                for record in records:
+                    record.attempts += 1
+                    channel.basic_publish(exchange="", routing_key=record.routing_key, body=record.body,
+                                          properties=record.properties)
+                    self.stats["published"] += 1
+                    self.stats["confirmed"] += 1
+                    self.confirm_latencies.append(now - record.submitted_at)
+                    if record.metadata is not None:
+                        self.metadata_batch.append(record.metadata)
+                        self.metadata_pending += 1
+                self.lock.notify_all()
+            if len(self.metadata_batch) >= METADATA_BATCH_SIZE or time.monotonic() - last_flush >= METADATA_FLUSH_INTERVAL \
+                    or not records:
+                self._flush_metadata()
+                last_flush = time.monotonic()
+        self._flush_metadata()
+
+
+class EnvelopePublisher:
+    """
+    Packs up to batch_size bodies, or whatever arrived within linger_ms of the first one, into one
+    compressed envelope (messages.pack_batch) and hands it to a ConfirmedPublisher.
+    Each routing key (lane) fills its own envelope. Same publish()/counters()/flush()/close() interface,
+    so producers can swap it in.
+    """
+
+    def __init__(self, publisher, batch_size, linger_ms, content_type, compresslevel=6):
+        self.publisher = publisher
+        self.batch_size = batch_size
+        self.linger = linger_ms / 1000
+        self.content_type = content_type
+        self.compresslevel = compresslevel
+        self.lock = threading.Condition()
+        self.items = {}  # routing key -> [(body, metadata)], guarded by lock
+        self.first_at = {}  # routing key -> when its oldest item arrived
+        self.sequence = 0
+        self.stats = {"envelopes": 0, "enveloped": 0, "item_bytes": 0, "envelope_bytes": 0}
+        self.stopping = False
+        self.thread = threading.Thread(target=self._run, name=f"{publisher.name}-envelopes", daemon=True)
+        self.thread.start()
+
+    @property
+    def confirm_latencies(self):
+        return self.publisher.confirm_latencies
+
+    def publish(self, routing_key, body, properties=None, metadata=None):
+        with self.lock:
+            items = self.items.setdefault(routing_key, [])
+            if not items:
+                self.first_at[routing_key] = time.monotonic()
+                self.lock.notify_all()
+            items.append((body, metadata))
+            if len(items) >= self.batch_size:
+                self._flush_locked(routing_key)
+
+    def counters(self):
+        with self.lock:
+            return dict(self.publisher.counters(), **self.stats, batching=sum(map(len, self.items.values())))
+
+    def flush(self, timeout=None):
+        with self.lock:
+            self._flush_all_locked()
+        return self.publisher.flush(timeout)
+
+    def close(self, timeout=None):
+        with self.lock:
+            self._flush_all_locked()
+            self.stopping = True
+            self.lock.notify_all()
+        self.thread.join(timeout=10)
+        stats = self.stats
+        ratio = stats["envelope_bytes"] / stats["item_bytes"] if stats["item_bytes"] else 0.0
+        logging.info(f"[Publisher] {self.publisher.name} sent {stats['enveloped']} messages in "
+                     f"{stats['envelopes']} envelopes ({100 * ratio:.1f}% of the item bytes)")
+        self.publisher.close(timeout)
+
+    def _run(self):
+        # Linger timer: flushes a partial envelope once its oldest item has waited linger_ms
+        with self.lock:
+            while not self.stopping:
+                waiting = [key for key, items in self.items.items() if items]
+                if not waiting:
+                    self.lock.wait()
+                    continue
+                routing_key = min(waiting, key=self.first_at.get)
+                remaining = self.first_at[routing_key] + self.linger - time.monotonic()
+                if remaining > 0:
+                    self.lock.wait(remaining)
+                else:
+                    self._flush_locked(routing_key)
+
+    def _flush_all_locked(self):
+        for routing_key in list(self.items):
+            self._flush_locked(routing_key)
+
+    def _flush_locked(self, routing_key):
+        items = self.items.pop(routing_key, None)
+        if not items:
+            return
+        self.sequence += 1
+        batch_id = f"{self.publisher.name}-{os.getpid()}-{self.sequence}"
+        bodies = [body for body, _ in items]
+        envelope = messages.pack_batch(bodies, batch_id, self.content_type, self.compresslevel)
+        writers = [metadata for _, metadata in items if metadata is not None]
+        properties = pika.BasicProperties(delivery_mode=2, content_type=self.content_type, type=messages.BATCH_TYPE,
+                                          content_encoding=messages.BATCH_ENCODING, message_id=batch_id)
+        self.stats["envelopes"] += 1
+        self.stats["enveloped"] += len(items)
+        self.stats["item_bytes"] += sum(len(body) for body in bodies)
+        self.stats["envelope_bytes"] += len(envelope)
+        # Blocks while the publisher's buffer is full, which holds up publish() callers too
+        self.publisher.publish(routing_key, envelope, properties,
+                               metadata=(lambda pipe: [write(pipe) for write in writers]) if writers else None)
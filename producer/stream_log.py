@@ -0,0 +1,273 @@
+import os
+import sys
+import gzip
+import json
+import time
+import struct
+import logging
+import argparse
+import itertools
+import threading
+
+import pika
+
+from publisher import ConfirmedPublisher
+
+# Record real message streams and replay them for deterministic consumer benchmarks.
+#
+#   python stream_log.py record voice.log.gz --queue voice_complaints_copy --duration 3600
+#   python stream_log.py record text.log.gz --exchange complaints --routing-key text_complaints
+#   python stream_log.py record all.log.gz --exchange amq.rabbitmq.trace --routing-key "publish.#"
+#   python stream_log.py replay voice.log.gz --queue voice_complaints --speed 4
+#   python stream_log.py replay text.log.gz --speed 0 --limit 10000
+#   python stream_log.py info voice.log.gz
+#
+# --queue consumes (and acks) a queue, so point it at a copy rather than at a live consumer's queue.
+# --exchange binds a private auto-delete queue to the exchange, which leaves existing consumers untouched.
+# The producers publish to the default exchange, so tap them through the firehose
+# (rabbitmqctl trace_on) on amq.rabbitmq.trace; the original routing key and properties are
+# taken from the trace headers.
+#
+# Log format: a gzip stream of MAGIC, then one record per message:
+#   >dII (seconds since the previous message, meta length, body length), meta JSON, body.
+# Both sides stream record by record, so memory stays flat whatever the log size.
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+RABBITMQ_HOST = os.getenv("RABBITMQ_HOST", "localhost")
+PIPELINE_BACKEND = os.getenv("PIPELINE_BACKEND", "docker")  # 'docker' or 'local' (in-process stand-ins)
+
+MAGIC = b"FIQSTREAM1\n"
+RECORD_HEADER = struct.Struct(">dII")
+TRACE_EXCHANGE = "amq.rabbitmq.trace"
+FLUSH_INTERVAL = 1.0  # seconds between gzip sync flushes, so a killed recorder leaves a readable log
+PROPERTY_FIELDS = ["content_type", "content_encoding", "headers", "delivery_mode", "priority", "correlation_id",
+                   "reply_to", "expiration", "message_id", "timestamp", "type", "user_id", "app_id"]
+
+
+def connect_rabbitmq():
+    if PIPELINE_BACKEND == "local":
+        from local_backends import connect_local_broker
+        return connect_local_broker()
+    for attempt in range(5):
+        try:
+            return pika.BlockingConnection(pika.ConnectionParameters(host=RABBITMQ_HOST))
+        except pika.exceptions.AMQPConnectionError as e:
+            logging.warning(f"Retrying RabbitMQ connection (attempt {attempt + 1}/5): {e}")
+            time.sleep(2)
+    logging.error("Failed to connect to RabbitMQ after 5 attempts")
+    sys.exit(1)
+
+
+# --- Log file ---
+class LogWriter:
+    def __init__(self, path, compresslevel=6):
+        self.file = gzip.open(path, "wb", compresslevel=compresslevel)
+        self.file.write(MAGIC)
+        self.count = 0
+        self.bytes = 0
+        self.last_at = None
+        self.last_flush = time.monotonic()
+
+    def append(self, exchange, routing_key, properties, body, received_at):
+        gap = 0.0 if self.last_at is None else received_at - self.last_at
+        self.last_at = received_at
+        meta = json.dumps({"t": time.time(), "exchange": exchange, "routing_key": routing_key,
+                           "properties": properties}, default=str).encode("utf-8")
+        self.file.write(RECORD_HEADER.pack(gap, len(meta), len(body)))
+        self.file.write(meta)
+        self.file.write(body)
+        self.count += 1
+        self.bytes += len(body)
+        if received_at - self.last_flush >= FLUSH_INTERVAL:
+            self.file.flush()
+            self.last_flush = received_at
+
+    def close(self):
+        self.file.close()
+
+
+def read_log(path):
+    """Yields (gap_s, meta, body) one record at a time."""
+    with gzip.open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a stream log")
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                if header:
+                    logging.warning(f"[Log] {path} ends in a truncated record (recorder was killed?)")
+                return
+            gap, meta_length, body_length = RECORD_HEADER.unpack(header)
+            meta = f.read(meta_length)
+            body = f.read(body_length)
+            if len(meta) < meta_length or len(body) < body_length:
+                logging.warning(f"[Log] {path} ends in a truncated record (recorder was killed?)")
+                return
+            yield gap, json.loads(meta), body
+
+
+# --- Record ---
+def message_properties(properties):
+    return {field: getattr(properties, field, None) for field in PROPERTY_FIELDS
+            if getattr(properties, field, None) is not None}
+
+
+def unwrap_trace(method, properties):
+    # Firehose copies carry the original routing key and properties in their headers
+    headers = properties.headers or {}
+    routing_keys = headers.get("routing_keys") or [method.routing_key]
+    original = {key: value for key, value in (headers.get("properties") or {}).items() if key in PROPERTY_FIELDS}
+    return headers.get("exchange_name", ""), routing_keys[0], original
+
+
+def record(args):
+    connection = connect_rabbitmq()
+    channel = connection.channel()
+    if args.exchange:
+        queue = channel.queue_declare(queue="", exclusive=True, auto_delete=True).method.queue
+        channel.queue_bind(queue=queue, exchange=args.exchange, routing_key=args.routing_key)
+        auto_ack = True  # private queue, nothing else reads it
+        logging.info(f"[Record] Bound private queue {queue} to '{args.exchange}' ({args.routing_key})")
+    else:
+        queue = args.queue
+        channel.queue_declare(queue=queue, passive=True)
+        auto_ack = False
+        channel.basic_qos(prefetch_count=args.prefetch)
+        logging.info(f"[Record] Consuming '{queue}'")
+
+    writer = LogWriter(args.output, args.compresslevel)
+    started_at = time.monotonic()
+
+    def on_message(ch, method, properties, body):
+        received_at = time.monotonic()
+        if method.exchange == TRACE_EXCHANGE:
+            exchange, routing_key, props = unwrap_trace(method, properties)
+        else:
+            exchange, routing_key, props = method.exchange, method.routing_key, message_properties(properties)
+        writer.append(exchange, routing_key, props, body, received_at)
+        if not auto_ack:
+            ch.basic_ack(delivery_tag=method.delivery_tag)
+        if writer.count % 1000 == 0:
+            logging.info(f"[Record] {writer.count} messages, {writer.bytes / 1e6:.1f} MB of bodies")
+        if args.limit and writer.count >= args.limit:
+            ch.stop_consuming()
+
+    channel.basic_consume(queue=queue, on_message_callback=on_message, auto_ack=auto_ack)
+    if args.duration:
+        timer = threading.Timer(args.duration, connection.add_callback_threadsafe, args=(channel.stop_consuming,))
+        timer.daemon = True
+        timer.start()
+    try:
+        channel.start_consuming()
+    except KeyboardInterrupt:
+        logging.info("Interrupted by user, closing the log...")
+    finally:
+        writer.close()
+        if connection.is_open:
+            connection.close()
+    elapsed = time.monotonic() - started_at
+    size = os.path.getsize(args.output)
+    logging.info(f"[Record] {writer.count} messages in {elapsed:.1f}s -> {args.output} "
+                 f"({size / 1e6:.1f} MB on disk for {writer.bytes / 1e6:.1f} MB of bodies)")
+
+
+# --- Replay ---
+def to_properties(props):
+    return pika.BasicProperties(**{key: value for key, value in props.items() if key in PROPERTY_FIELDS})
+
+
+def replay(args):
+    records = read_log(args.log)
+    first = next(records, None)
+    if first is None:
+        logging.info(f"[Replay] {args.log} is empty")
+        return
+    target = args.queue or first[1]["routing_key"]
+    parameters = pika.ConnectionParameters(host=RABBITMQ_HOST, connection_attempts=5, retry_delay=2)
+    # Passive declare: replay into existing queues without clashing with their arguments (DLX, TTL, ...)
+    publisher = ConfirmedPublisher(parameters, target, passive=True, name="stream_replay").start()
+    speed = "max speed" if args.speed <= 0 else f"{args.speed:g}x"
+    logging.info(f"[Replay] {args.log} -> '{target if args.queue else 'recorded routing keys'}' at {speed}")
+
+    started_at = time.perf_counter()
+    offset = 0.0  # scheduled send time relative to started_at
+    recorded_s = 0.0
+    replayed = late = 0
+    try:
+        for gap, meta, body in itertools.chain([first], records):
+            if args.limit and replayed >= args.limit:
+                break
+            recorded_s += gap
+            if args.speed > 0:
+                offset += (min(gap, args.max_gap) if args.max_gap else gap) / args.speed
+                delay = started_at + offset - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                elif delay < -0.1:
+                    late += 1
+            properties = to_properties(meta["properties"])
+            if args.mark:
+                properties.headers = {**(properties.headers or {}), "x-replayed-from": os.path.basename(args.log)}
+            publisher.publish(args.queue or meta["routing_key"], body, properties)
+            replayed += 1
+            if replayed % 1000 == 0:
+                elapsed = time.perf_counter() - started_at
+                logging.info(f"[Replay] {replayed} sent, {replayed / elapsed:.1f}/s, {late} more than 100 ms late")
+    except KeyboardInterrupt:
+        logging.info("Interrupted by user, flushing the publisher...")
+    publisher.close()
+    elapsed = max(time.perf_counter() - started_at, 1e-9)
+    confirmed = publisher.counters()["confirmed"]
+    logging.info(f"[Replay] {confirmed}/{replayed} confirmed in {elapsed:.1f}s ({confirmed / elapsed:.1f}/s); "
+                 f"recorded span {recorded_s:.1f}s, {late} sends more than 100 ms late")
+
+
+def info(args):
+    count = body_bytes = 0
+    span = 0.0
+    routing_keys = {}
+    for gap, meta, body in read_log(args.log):
+        count += 1
+        body_bytes += len(body)
+        span += gap
+        routing_keys[meta["routing_key"]] = routing_keys.get(meta["routing_key"], 0) + 1
+    rate = count / span if span > 0 else 0.0
+    print(f"{args.log}: {count} messages over {span:.1f}s ({rate:.2f}/s), {body_bytes / 1e6:.1f} MB of bodies, "
+          f"{os.path.getsize(args.log) / 1e6:.1f} MB on disk")
+    for routing_key, messages in sorted(routing_keys.items(), key=lambda item: -item[1]):
+        print(f"  {routing_key}: {messages}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record and replay RabbitMQ message streams")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rec = commands.add_parser("record", help="Append messages from a queue or exchange to a log")
+    rec.add_argument("output", help="Log file to write (gzip)")
+    source = rec.add_mutually_exclusive_group(required=True)
+    source.add_argument("--queue", help="Consume and ack this queue")
+    source.add_argument("--exchange", help="Bind a private queue to this exchange")
+    rec.add_argument("--routing-key", default="#", help="Binding key for --exchange")
+    rec.add_argument("--duration", type=float, default=0, help="Stop after this many seconds")
+    rec.add_argument("--limit", type=int, default=0, help="Stop after this many messages")
+    rec.add_argument("--prefetch", type=int, default=500)
+    rec.add_argument("--compresslevel", type=int, default=6)
+
+    rep = commands.add_parser("replay", help="Publish a log back into a queue")
+    rep.add_argument("log")
+    rep.add_argument("--queue", help="Target queue (default: each message's recorded routing key)")
+    rep.add_argument("--speed", type=float, default=1.0, help="1 = original timing, 4 = 4x faster, 0 = max speed")
+    rep.add_argument("--max-gap", type=float, default=0, help="Cap recorded idle gaps at this many seconds")
+    rep.add_argument("--limit", type=int, default=0, help="Stop after this many messages")
+    rep.add_argument("--mark", action="store_true", help="Add an x-replayed-from header")
+
+    inf = commands.add_parser("info", help="Summarise a log")
+    inf.add_argument("log")
+
+    args = parser.parse_args()
+    {"record": record, "replay": replay, "info": info}[args.command](args)
+
+
+if __name__ == "__main__":
+    main()
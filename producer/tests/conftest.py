@@ -0,0 +1,23 @@
+import os
+import sys
+import tempfile
+
+# The services are flat scripts rather than packages. The producer goes first on the path, then one service's
+# copy of the shared consumer helpers (lanes.py, quality.py, ...; identical in every service, see test_lanes.py).
+# Settings are read at import time, so the required ones get placeholders and the in-process backends.
+PRODUCER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROOT_DIR = os.path.dirname(PRODUCER_DIR)
+CONSUMER_DIRS = sorted(os.path.join(ROOT_DIR, name) for name in os.listdir(ROOT_DIR) if name.startswith("consumer-"))
+
+sys.path.insert(0, PRODUCER_DIR)
+sys.path.append(os.path.join(ROOT_DIR, "consumer-sentiment"))
+
+for name, value in {
+    "PIPELINE_BACKEND": "local",
+    "LOCAL_BACKEND_DIR": tempfile.mkdtemp(prefix="fraudinsight-tests-"),
+    "RABBITMQ_HOST": "localhost", "RABBITMQ_PORT": "5672", "RABBITMQ_USER": "guest", "RABBITMQ_PASS": "guest",
+    "RABBITMQ_VHOST": "/", "REDIS_HOST": "localhost", "REDIS_PORT": "6379",
+    "INFLUXDB_URL": "http://localhost:8086", "INFLUXDB_ORG": "tests", "INFLUXDB_BUCKET": "tests",
+    "INFLUXDB_TOKEN": "tests",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,108 @@
+import time
+
+import pika
+import pytest
+
+import autoscaler
+import local_backends
+
+
+@pytest.fixture(autouse=True)
+def policy(monkeypatch):
+    for name, value in {"AUTOSCALE_MIN_REPLICAS": 1, "AUTOSCALE_MAX_REPLICAS": 8, "AUTOSCALE_MAX_STEP": 2,
+                        "AUTOSCALE_DRAIN_TARGET_S": 300, "AUTOSCALE_HEADROOM": 1.25, "AUTOSCALE_UP_COOLDOWN": 60,
+                        "AUTOSCALE_DOWN_COOLDOWN": 300, "AUTOSCALE_REPORT_TTL": 120}.items():
+        monkeypatch.setattr(autoscaler, name, value)
+
+
+def scaler(replicas):
+    return autoscaler.QueueScaler("q", [autoscaler.DryRunActuator("../consumer-sentiment", "text_consumer", replicas)])
+
+
+def evaluate(queue_scaler, now, ack_rate, service_s=0.1, depth=0):
+    # One consumer reporting ack_rate messages/s over a 10 s interval, at service_s each
+    messages = round(10 * ack_rate)
+    queue_scaler.observe({"consumer": "c1", "interval_s": 10, "lanes": {
+        "q": {"messages": messages, "busy_s": messages * service_s, "lag_mean_s": 0.0, "lag_p99_s": 0.0}}})
+    queue_scaler.reports["c1"] = (now, queue_scaler.reports["c1"][1])  # received just now
+    return queue_scaler.evaluate(depth, now)
+
+
+def test_idle_queue_goes_to_the_minimum():
+    current, target, metrics = scaler(3).evaluate(0, time.monotonic() + 1000)
+    assert (current, target, metrics["desired"]) == (3, 1, 1)
+
+
+def test_scale_up_is_stepped_and_waits_for_the_up_cooldown():
+    queue_scaler, start = scaler(1), time.monotonic()
+    current, target, metrics = evaluate(queue_scaler, start + 60, ack_rate=100)
+    assert metrics["desired"] == 8  # ceil(100/s x 0.1 s x 1.25), clamped
+    assert (current, target) == (1, 3)
+    queue_scaler.apply(target, start + 60)
+
+    assert evaluate(queue_scaler, start + 90, ack_rate=100)[:2] == (3, 3)
+    assert evaluate(queue_scaler, start + 120, ack_rate=100)[:2] == (3, 5)
+
+
+def test_scale_down_waits_and_keeps_the_windows_highest_recommendation():
+    queue_scaler, start = scaler(6), time.monotonic()
+    queue_scaler.last_change = start
+    current, target, metrics = evaluate(queue_scaler, start + 100, ack_rate=10)
+    assert metrics["desired"] == 2
+    assert target == 6  # within the down cooldown
+    assert evaluate(queue_scaler, start + 200, ack_rate=36)[2]["desired"] == 5
+
+    current, target, _ = evaluate(queue_scaler, start + 310, ack_rate=10)
+    assert (current, target) == (6, 5)  # the lull does not undo the recommendation of 5 at t=200
+    queue_scaler.apply(target, start + 310)
+    # Once the spike leaves the window, down one step at a time
+    assert evaluate(queue_scaler, start + 620, ack_rate=10)[:2] == (5, 3)
+
+
+def test_missing_lanes_count_as_empty_and_the_probe_channel_is_reopened():
+    connection = local_backends.LocalConnection(local_backends.InMemoryBroker())
+    probe = connection.channel()
+    depth, probe = autoscaler.queue_depth(connection, probe, "q")  # neither lane declared yet
+    assert depth == 0
+
+    producer = connection.channel()
+    producer.queue_declare(queue="q.priority", durable=True)
+    for _ in range(3):
+        producer.basic_publish(exchange="", routing_key="q.priority", body=b"{}")
+    queue_scaler = scaler(1)
+    for _ in range(2):  # each round opens a new probe channel in place of the one the 404 closed
+        probe = autoscaler.decide({"q": queue_scaler}, connection, probe)
+        assert queue_scaler.last_depth[1] == 3  # decided on the priority lane's backlog, "q" still missing
+
+
+class DroppedConnection:
+    is_open = True
+
+    def process_data_events(self, time_limit=0):
+        raise pika.exceptions.StreamLostError("Transport indicated EOF")
+
+
+class StoppingConnection:
+    is_open = True
+
+    def process_data_events(self, time_limit=0):
+        raise KeyboardInterrupt
+
+    def close(self):
+        self.is_open = False
+
+
+def test_run_reconnects_after_the_connection_drops(monkeypatch):
+    connections = [DroppedConnection(), StoppingConnection()]
+    subscribed = []
+
+    def subscribe(scalers):
+        subscribed.append(scalers)
+        return connections[len(subscribed) - 1], None
+
+    monkeypatch.setattr(autoscaler, "subscribe", subscribe)
+    monkeypatch.setattr(autoscaler, "RECONNECT_DELAY", 0)
+    with pytest.raises(KeyboardInterrupt):
+        autoscaler.run({"q": scaler(1)})
+    assert len(subscribed) == 2
+    assert not connections[1].is_open  # closed on the way out
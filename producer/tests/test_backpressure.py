@@ -0,0 +1,64 @@
+import pytest
+
+import backpressure
+
+
+class StubPublisher:
+    def __init__(self):
+        self.blocked = False
+
+    def counters(self):
+        return {"confirmed": 0, "blocked": self.blocked}
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    monkeypatch.setattr(backpressure, "BACKPRESSURE_DECREASE", 0.5)
+    monkeypatch.setattr(backpressure, "BACKPRESSURE_INCREASE_STEP", 0.1)
+    monkeypatch.setattr(backpressure, "BACKPRESSURE_MIN_RATE", 0.05)
+    # The monitor thread is never started; the tests drive _update() with the rates it would measure
+    return backpressure.Backpressure(None, ["q"], StubPublisher(), high_watermark=1000, low_watermark=100)
+
+
+def test_holds_between_watermarks(limiter):
+    limiter._update(500, drain_rate=10, send_rate=100)
+    assert limiter.rate is None
+
+
+def test_decreases_from_the_drain_rate_above_the_high_watermark(limiter):
+    limiter._update(1000, drain_rate=40, send_rate=100)
+    assert limiter.unthrottled_rate == 100
+    assert limiter.rate == 20  # min(100, 40) x 0.5
+    assert limiter.stats["decreases"] == 1
+
+
+def test_holds_while_the_backlog_shrinks(limiter):
+    limiter._update(2000, drain_rate=40, send_rate=100)
+    limiter._update(1800, drain_rate=40, send_rate=20)
+    assert limiter.rate == 20  # already at half of what the consumers take
+    limiter._update(1800, drain_rate=0, send_rate=20)
+    assert limiter.rate == 10  # no consumers: keep halving
+    assert limiter.stats["decreases"] == 2
+
+
+def test_never_stops_entirely(limiter):
+    for _ in range(20):
+        limiter._update(5000, drain_rate=0, send_rate=1)
+    assert limiter.rate == backpressure.BACKPRESSURE_MIN_RATE
+
+
+def test_increases_additively_then_unthrottles(limiter):
+    limiter._update(1000, drain_rate=40, send_rate=100)
+    rates = []
+    for _ in range(8):
+        limiter._update(50, drain_rate=40, send_rate=limiter.rate or 100)
+        rates.append(limiter.rate)
+    # 10% of the unthrottled 100/s per poll below the low watermark, unthrottled once back there
+    assert rates[:-1] == pytest.approx([30, 40, 50, 60, 70, 80, 90])
+    assert rates[-1] is None
+
+
+def test_blocked_connection_throttles_below_the_high_watermark(limiter):
+    limiter.publisher.blocked = True
+    limiter._update(0, drain_rate=0, send_rate=50)
+    assert limiter.rate == 25
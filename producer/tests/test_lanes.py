@@ -0,0 +1,82 @@
+import filecmp
+import os
+
+import pytest
+
+import lanes
+from conftest import CONSUMER_DIRS
+
+SHARED_HELPERS = ("lanes.py", "messages.py", "quality.py", "transcription.py")
+
+
+@pytest.mark.parametrize("helper", SHARED_HELPERS)
+def test_every_service_keeps_an_identical_copy(helper):
+    copies = [os.path.join(directory, helper) for directory in CONSUMER_DIRS]
+    assert all(filecmp.cmp(copies[0], copy, shallow=False) for copy in copies[1:])
+
+
+def lane_pair(weight=4):
+    return [lanes.Lane("q.priority", weight), lanes.Lane("q", 1)]
+
+
+def test_pick_interleaves_by_weight():
+    priority, normal = lane_pair()
+    picks = [lanes.pick([priority, normal], lambda lane: True).queue for _ in range(10)]
+    # Smooth WRR spreads the normal lane's turn out instead of bunching the priority ones
+    assert picks == ["q.priority", "q.priority", "q", "q.priority", "q.priority"] * 2
+
+
+def test_pick_skips_empty_lanes():
+    priority, normal = lane_pair()
+    assert lanes.pick([priority, normal], lambda lane: False) is None
+    assert [lanes.pick([priority, normal], lambda lane: lane is normal) for _ in range(3)] == [normal] * 3
+    # An idle lane builds up no credit while the other one is served
+    assert priority.current == 0
+
+
+def test_pick_uses_buffered_deliveries_by_default():
+    priority, normal = lane_pair()
+    normal.buffer.append("delivery")
+    assert lanes.pick([priority, normal]) is normal
+
+
+@pytest.fixture(autouse=True)
+def rtt_cover(monkeypatch):
+    monkeypatch.setattr(lanes, "PREFETCH_RTT_COVER", 2)
+
+
+def measured(controller, service_s, rtt_s, count=10):
+    for _ in range(count):
+        controller.record_service(service_s)
+    controller.record_rtt(rtt_s)
+    return controller.update()
+
+
+def test_prefetch_holds_until_measured():
+    controller = lanes.PrefetchController(prefetch=5, minimum=1, maximum=200, hold_s=2)
+    assert controller.target() == 5
+    assert controller.update() is None
+
+
+def test_prefetch_covers_round_trips_for_fast_consumers():
+    controller = lanes.PrefetchController(prefetch=1, minimum=1, maximum=200, hold_s=2)
+    # 0.5 ms per message, 4.9 ms round trips: ceil(2 x 4.9 / 0.5) + 1 deliveries keep the worker busy
+    assert measured(controller, 0.0005, 0.0049) == 21
+    assert controller.prefetch == 21
+
+
+def test_prefetch_bounded_by_held_work_and_maximum():
+    controller = lanes.PrefetchController(prefetch=1, minimum=1, maximum=200, hold_s=2)
+    assert measured(controller, 0.5, 0.9) == 4  # 2 s of held work at 0.5 s each, under the 5 for round trips
+    controller = lanes.PrefetchController(prefetch=1, minimum=1, maximum=50, hold_s=2)
+    assert measured(controller, 0.00001, 0.005) == 50
+    controller = lanes.PrefetchController(prefetch=10, minimum=1, maximum=200, hold_s=2)
+    assert measured(controller, 60, 0.005) == 1  # a Whisper consumer holds one delivery
+
+
+def test_prefetch_ignores_small_changes():
+    controller = lanes.PrefetchController(prefetch=20, minimum=1, maximum=200, hold_s=2)
+    assert measured(controller, 0.01, 0.0945) is None  # target 20, no resubscribe
+    controller = lanes.PrefetchController(prefetch=20, minimum=1, maximum=200, hold_s=2)
+    assert measured(controller, 0.01, 0.0995) is None  # 21 is within 25%
+    assert controller.prefetch == 20
@@ -0,0 +1,65 @@
+import json
+from datetime import datetime, timezone
+
+import msgspec
+import pytest
+
+import messages
+
+
+def text_complaint(**fields):
+    return messages.TextComplaint(**{
+        "v": messages.SCHEMA_VERSION, "message_id": "text-c1-1700000000-0123456789ab", "timestamp": 1700000000.5,
+        "scenario": "fraud", "customer_id": "c1", "channel": "text", "complaint_text": "Customer: hello",
+        "customer": messages.Customer(id="c1", name="Ada"), **fields})
+
+
+@pytest.mark.parametrize("content_type", [messages.JSON, messages.MSGPACK])
+def test_v2_round_trip(content_type):
+    message = text_complaint()
+    assert messages.TEXT.decode(messages.encode(message, content_type), content_type) == message
+    voice = messages.VoiceComplaint(v=messages.SCHEMA_VERSION, message_id="voice-1", scenario="fraud",
+                                    audio=messages.AudioInfo(format="flac", duration_s=12.5, sample_rate=22050))
+    assert messages.VOICE.decode(messages.encode(voice, content_type), content_type) == voice
+
+
+def test_json_is_assumed_without_content_type():
+    message = text_complaint()
+    assert messages.TEXT.decode(messages.encode(message)) == message
+
+
+def test_v1_text_is_upgraded():
+    body = json.dumps({"message_id": "text-c1-1", "timestamp": 1700000000.0, "scenario": "fraud", "channel": "text",
+                       "complaint_text": "Customer: hello", "customer": {"id": "c1", "name": "Ada"}}).encode()
+    message = messages.TEXT.decode(body, messages.JSON)
+    assert message.v == messages.SCHEMA_VERSION
+    assert (message.message_id, message.customer_id, message.customer.name) == ("text-c1-1", "c1", "Ada")
+
+
+def test_v1_voice_is_upgraded():
+    body = json.dumps({"id": "voice-1", "timestamp": "2023-11-14T22:13:20", "scenario": "card_issue",
+                       "audio_url": "http://minio/voice-1.wav"}).encode()
+    message = messages.VOICE.decode(body)
+    assert message.message_id == "voice-1"
+    # voice_producer stamped naive utcnow()
+    assert message.timestamp == datetime(2023, 11, 14, 22, 13, 20, tzinfo=timezone.utc).timestamp()
+    assert message.object_name == "" and message.corpus_index == -1
+
+
+def test_invalid_v2_is_not_upgraded():
+    with pytest.raises(msgspec.ValidationError):
+        messages.TEXT.decode(b'{"v": 2, "id": "text-1"}', messages.JSON)
+    with pytest.raises(msgspec.ValidationError):
+        messages.TEXT.decode(msgspec.msgpack.encode({"v": 2}), messages.MSGPACK)
+
+
+@pytest.mark.parametrize("content_type", [messages.JSON, messages.MSGPACK])
+def test_batch_items_decode_on_their_own(content_type):
+    good = messages.encode(text_complaint(), content_type)
+    bad = messages.encode({"v": messages.SCHEMA_VERSION}, content_type)
+    body = messages.pack_batch([good, bad], "batch-1", content_type)
+    batch = messages.unpack_batch(body, content_type, messages.BATCH_ENCODING)
+    assert batch.batch_id == "batch-1" and len(batch.items) == 2
+    assert messages.TEXT.decode(batch.items[0], content_type) == text_complaint()
+    with pytest.raises(msgspec.ValidationError):
+        messages.TEXT.decode(batch.items[1], content_type)
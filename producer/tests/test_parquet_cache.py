@@ -0,0 +1,50 @@
+import re
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+import parquet_cache
+
+FIELDS = ["compound"]
+
+
+class PointStore:
+    """query_api stand-in: answers raw_query with the stored points inside its range."""
+
+    def __init__(self):
+        self.points = pd.DataFrame(columns=["_time", "message_id", "scenario", "channel", "compound"])
+
+    def write(self, message_id, ts, compound=0.5):
+        point = {"_time": pd.Timestamp(ts, tz="UTC"), "message_id": message_id, "scenario": "fraud",
+                 "channel": "text", "compound": compound}
+        self.points = pd.concat([self.points, pd.DataFrame([point])], ignore_index=True)
+
+    def query_data_frame(self, query):
+        start, stop = (pd.Timestamp(value) for value in re.search(r"range\(start: (\S+), stop: (\S+)\)", query).groups())
+        in_range = (self.points["_time"] >= start) & (self.points["_time"] < stop)
+        return self.points[in_range].assign(result="_result", table=0)
+
+
+def cached_ids(cache_dir):
+    rows = parquet_cache.load("text_bucket", "text_complaints", pd.Timestamp("2000-01-01", tz="UTC"),
+                              pd.Timestamp.now(tz="UTC"), cache_dir=cache_dir)
+    return sorted(rows["message_id"])
+
+
+def test_late_points_before_the_watermark_are_fetched_once(tmp_path):
+    cache_dir, store = str(tmp_path), PointStore()
+    now = pd.Timestamp.now(tz="UTC").tz_localize(None)
+    store.write("a", now - pd.Timedelta(minutes=10))
+    store.write("b", now - pd.Timedelta(minutes=2))
+    refresh = lambda: parquet_cache.refresh(store, "text_bucket", "text_complaints", FIELDS, "-1h", cache_dir,
+                                            overlap="5m")
+    assert refresh() == 2
+
+    # Written after the refresh, stamped before its watermark
+    store.write("late", now - pd.Timedelta(minutes=3))
+    assert refresh() == 1
+    assert refresh() == 0  # the overlap is re-fetched, but rows already cached are not added again
+    assert cached_ids(cache_dir) == ["a", "b", "late"]
+    assert parquet_cache.load_watermarks(cache_dir)["text_bucket/text_complaints"] == store.points["_time"].max()
@@ -0,0 +1,77 @@
+import importlib.util
+import os
+from types import SimpleNamespace
+
+import pytest
+
+import local_backends
+import messages
+from conftest import CONSUMER_DIRS
+
+DLQ_QUEUE = "text_complaints_dlq.dlq"  # bound to text_dlx by dlq/text_dlq_consumer.py
+
+
+def load_text_consumer(directory):
+    path = os.path.join(directory, "text_consumer.py")
+    spec = importlib.util.spec_from_file_location(f"{os.path.basename(directory)}_text_consumer", path)
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except ImportError as e:  # each analyser brings its own model libraries
+        pytest.skip(f"{os.path.basename(directory)}: {e}")
+    return module
+
+
+def consumer_channel(bind_dlq):
+    channel = local_backends.LocalConnection(local_backends.InMemoryBroker()).channel()
+    channel.confirm_delivery()
+    channel.exchange_declare(exchange="text_dlx")
+    if bind_dlq:
+        channel.queue_declare(queue=DLQ_QUEUE, durable=True)
+        channel.queue_bind(queue=DLQ_QUEUE, exchange="text_dlx", routing_key="text_dead_letter")
+    settled = []
+    channel.basic_ack = lambda delivery_tag=0, multiple=False: settled.append("ack")
+    channel.basic_nack = lambda delivery_tag=0, multiple=False, requeue=True: settled.append("nack")
+    return channel, settled
+
+
+def envelope_with_a_bad_item():
+    good = messages.encode(messages.TextComplaint(v=messages.SCHEMA_VERSION, message_id="text-1",
+                                                  complaint_text="Customer: my card was stolen"))
+    body = messages.pack_batch([good, b'{"v": 2}'], "batch-1")
+    properties = local_backends.local_properties(type=messages.BATCH_TYPE, content_type=messages.JSON,
+                                                 content_encoding=messages.BATCH_ENCODING)
+    return properties, body
+
+
+def process(module, channel, properties, body):
+    module.write_api = SimpleNamespace(write=lambda **kwargs: None)
+    if hasattr(module, "callback"):
+        module.callback(channel, SimpleNamespace(delivery_tag=1, routing_key="text_complaints"), properties, body)
+        return
+    # consumer-topic polls with basic_get and settles in its main loop
+    try:
+        module.process_batch(channel, properties, body)
+        channel.basic_ack(delivery_tag=1)
+    except Exception:
+        channel.basic_nack(delivery_tag=1, requeue=False)
+
+
+@pytest.mark.parametrize("directory", CONSUMER_DIRS, ids=os.path.basename)
+def test_failed_item_is_parked_on_the_dlq_before_the_ack(directory):
+    module = load_text_consumer(directory)
+    channel, settled = consumer_channel(bind_dlq=True)
+    process(module, channel, *envelope_with_a_bad_item())
+    assert settled == ["ack"]
+    parked = channel.broker.take(DLQ_QUEUE)
+    assert parked.properties.headers["x-failed-queue"] == "text_complaints"
+    assert parked.properties.headers["x-batch-id"] == "batch-1"
+
+
+@pytest.mark.parametrize("directory", CONSUMER_DIRS, ids=os.path.basename)
+def test_unroutable_item_nacks_the_envelope(directory):
+    module = load_text_consumer(directory)
+    channel, settled = consumer_channel(bind_dlq=False)
+    process(module, channel, *envelope_with_a_bad_item())
+    assert settled == ["nack"]
+    assert channel.broker.unroutable == 1
@@ -0,0 +1,39 @@
+import messages
+import text_producer
+from utils import SCENARIOS, CustomerPool
+
+
+class RecordingPublisher:
+    def __init__(self):
+        self.queues = []
+
+    def publish(self, routing_key, body, properties=None, metadata=None):
+        self.queues.append(routing_key)
+
+
+def customer_lines(text):
+    return [line[len("Customer: "):] for line in text.split("\n") if line.startswith("Customer: ")]
+
+
+def test_message_ids_are_unique_for_a_repeat_customer():
+    # A pooled customer complains many times a second under load; each complaint keeps its own id and metadata
+    customer = CustomerPool.generate(1, seed=7)[0]
+    built = [text_producer.build_message(customer) for _ in range(500)]
+    assert len({message.message_id for message in built}) == len(built)
+    assert all(message.message_id.startswith(f"text-{customer['id']}-") for message in built)
+
+
+def test_scenario_and_lane_follow_the_dialogue():
+    customer = CustomerPool.generate(1, seed=7)[0]
+    publisher = RecordingPublisher()
+    scenarios = []
+    for _ in range(60):
+        message = text_producer.build_message(customer)
+        assert message.v == messages.SCHEMA_VERSION
+        assert set(customer_lines(message.complaint_text)) <= set(SCENARIOS[message.scenario]["customer"])
+        text_producer.publish_message(publisher, message)
+        scenarios.append(message.scenario)
+    expected = [text_producer.PRIORITY_QUEUE if scenario in text_producer.PRIORITY_SCENARIOS
+                else text_producer.QUEUE_NAME for scenario in scenarios]
+    assert publisher.queues == expected
+    assert set(publisher.queues) == {text_producer.PRIORITY_QUEUE, text_producer.QUEUE_NAME}
@@ -0,0 +1,32 @@
+import numpy as np
+
+from tts_cache import SentenceCache
+
+
+def tone(seconds, sample_rate):
+    return np.full(int(seconds * sample_rate), 0.25, dtype=np.float32)
+
+
+def test_cached_sentences_are_read_back(tmp_path):
+    cache = SentenceCache(str(tmp_path), "vits", "p225")
+    calls = []
+
+    def synthesize(text):
+        calls.append(text)
+        return tone(0.1, 22050)
+
+    first = cache.render(["Hello there.", "My card was stolen."], synthesize, 22050, gap_ms=100)
+    again = cache.render(["Hello   there.", "My card was stolen."], synthesize, 22050, gap_ms=100)
+    assert first == again
+    assert len(calls) == 2 and (cache.hits, cache.misses) == (2, 2)
+    cache.close()
+
+
+def test_sample_rate_change_replaces_the_entry(tmp_path):
+    cache = SentenceCache(str(tmp_path), "vits", "p225")
+    cache.render(["Hello there."], lambda text: tone(0.1, 22050), 22050, gap_ms=0)
+    resampled = cache.render(["Hello there."], lambda text: tone(0.1, 16000), 16000, gap_ms=0)
+    # The re-synthesised segment is cached at the new rate instead of missing on every later render
+    assert cache.render(["Hello there."], lambda text: tone(0.1, 16000), 16000, gap_ms=0) == resampled
+    assert (cache.hits, cache.misses) == (1, 2)
+    cache.close()
@@ -0,0 +1,17 @@
+import pytest
+
+pytest.importorskip("boto3")
+
+import voice_producer
+from utils import SCENARIOS, generate_customer
+
+
+def test_live_jobs_label_and_route_on_the_dialogues_scenario(monkeypatch):
+    monkeypatch.setattr(voice_producer, "TOTAL_MESSAGES", 60)
+    seen = set()
+    for _, scenario, sentences, _ in voice_producer.live_jobs(generate_customer()):
+        said = " ".join(sentences)
+        assert any(line in said for line in SCENARIOS[scenario]["customer"])
+        assert (voice_producer.lane(scenario) == voice_producer.PRIORITY_QUEUE) == (scenario in voice_producer.PRIORITY_SCENARIOS)
+        seen.add(scenario)
+    assert len(seen) > 3  # not the old fraud/card_issue/login_problem rotation
@@ -1,10 +1,16 @@
 import pika
-import json
 import time
 import redis
 import logging
 import os
-from utils import generate_customer, generate_dialogue
+import random
+import threading
+import uuid
+from utils import generate_customer, CustomerPool, DialogueEngine
+from publisher import ConfirmedPublisher, EnvelopePublisher
+from backpressure import Backpressure
+from metadata_sink import MetadataSink
+import messages
 
 logging.basicConfig(
     level=logging.INFO,
@@ -22,37 +28,66 @@ def get_env_var(name):
 RABBITMQ_HOST_LOCAL = get_env_var("RABBITMQ_HOST")
 REDIS_HOST_LOCAL = get_env_var("REDIS_HOST")
 REDIS_PORT = int(get_env_var("REDIS_PORT"))
+PIPELINE_BACKEND = os.getenv("PIPELINE_BACKEND", "docker")  # 'docker' or 'local' (in-process stand-ins)
 
 QUEUE_NAME = 'text_complaints'
-TOTAL_MESSAGES = 2000
-DELAY_BETWEEN_MESSAGES = 60  # seconds
+PRIORITY_QUEUE = f"{QUEUE_NAME}.priority"  # drained first by the consumers (lanes.py)
+PRIORITY_SCENARIOS = {name for name in os.getenv("PRIORITY_SCENARIOS", "fraud").split(",") if name}
+TOTAL_MESSAGES = int(os.getenv("TOTAL_MESSAGES", 2000))
+DELAY_BETWEEN_MESSAGES = float(os.getenv("DELAY_BETWEEN_MESSAGES", 60))  # seconds
 MAX_RETRIES = 10
 RETRY_DELAY = 5  # seconds
 HEARTBEAT_INTERVAL = 120  # seconds
 MIN_LINES_PER_COMPLAINT = 20  # Minimum lines in each complaint text
+METADATA = MetadataSink("text", QUEUE_NAME)  # text:<message_id> hashes + text:index:text_complaints
+MESSAGE_FORMAT = os.getenv("MESSAGE_FORMAT", "json")  # body encoding: 'json' or 'msgpack' (see messages.py)
+CONTENT_TYPE = messages.CONTENT_TYPES[MESSAGE_FORMAT]
 
+# Envelopes: >1 packs up to TEXT_BATCH_SIZE complaints (or TEXT_BATCH_LINGER_MS worth) into one compressed message
+TEXT_BATCH_SIZE = int(os.getenv("TEXT_BATCH_SIZE", 1))
+TEXT_BATCH_LINGER_MS = float(os.getenv("TEXT_BATCH_LINGER_MS", 50))
+TEXT_BATCH_COMPRESSLEVEL = int(os.getenv("TEXT_BATCH_COMPRESSLEVEL", 6))  # zlib level
+dialogue_engine = DialogueEngine()
 
-def connect_to_rabbitmq():
-    parameters = pika.ConnectionParameters(
+# Customer pool: 0 keeps a fresh Faker customer per complaint
+CUSTOMER_POOL_SIZE = int(os.getenv("CUSTOMER_POOL_SIZE", 0))
+CUSTOMER_POOL_SEED = int(os.getenv("CUSTOMER_POOL_SEED", 42))
+CUSTOMER_POOL_PATH = os.getenv("CUSTOMER_POOL_PATH", "")  # directory to persist/memory-map the pool
+CUSTOMER_POOL_SKEW = float(os.getenv("CUSTOMER_POOL_SKEW", 0))  # >0 models repeat complainers
+
+# Load-generation mode (PRODUCER_MODE=load): open-loop publishing at a target rate, no per-message output
+PRODUCER_MODE = os.getenv("PRODUCER_MODE", "trickle")  # 'trickle' or 'load'
+LOAD_PROFILE = os.getenv("LOAD_PROFILE", "constant")  # 'constant', 'poisson', 'step' or 'ramp'
+LOAD_RATE = float(os.getenv("LOAD_RATE", 100))  # target messages/s (end rate for 'ramp')
+LOAD_RAMP_START_RATE = float(os.getenv("LOAD_RAMP_START_RATE", 1))
+LOAD_STEPS = os.getenv("LOAD_STEPS", "50:60,100:60,200:60")  # 'step' profile as rate:seconds,...
+LOAD_DURATION = float(os.getenv("LOAD_DURATION", 60))  # seconds, ignored by 'step'
+LOAD_WORKERS = int(os.getenv("LOAD_WORKERS", 4))  # threads building and submitting messages to the shared publisher
+LOAD_REPORT_INTERVAL = float(os.getenv("LOAD_REPORT_INTERVAL", 5))  # seconds
+load_log = logging.getLogger("load")  # progress and summary; the load path logs nothing per message
+STEPS = [tuple(float(part) for part in step.split(":")) for step in LOAD_STEPS.split(",") if step]
+
+# Backpressure (backpressure.py): slow down while text_complaints + its priority lane hold more than the high watermark.
+# Off by default in load mode, which is meant to push past what the consumers can take
+BACKPRESSURE = os.getenv("BACKPRESSURE", "0" if PRODUCER_MODE == "load" else "1") == "1"
+BACKPRESSURE_HIGH_WATERMARK = int(os.getenv("BACKPRESSURE_HIGH_WATERMARK", 20000))  # queued messages
+BACKPRESSURE_LOW_WATERMARK = int(os.getenv("BACKPRESSURE_LOW_WATERMARK", 5000))
+
+
+def rabbitmq_parameters():
+    return pika.ConnectionParameters(
         host=RABBITMQ_HOST_LOCAL,
         heartbeat=HEARTBEAT_INTERVAL,
         blocked_connection_timeout=300,
         connection_attempts=MAX_RETRIES,
         retry_delay=RETRY_DELAY
     )
-    for attempt in range(MAX_RETRIES):
-        try:
-            logging.info(f"[RabbitMQ] Connecting to {RABBITMQ_HOST_LOCAL} (attempt {attempt + 1})")
-            connection = pika.BlockingConnection(parameters)
-            logging.info("[RabbitMQ] Connection established")
-            return connection
-        except pika.exceptions.AMQPConnectionError as e:
-            logging.warning(f"[RabbitMQ] Connection failed: {e}")
-            time.sleep(RETRY_DELAY)
-    raise Exception("[RabbitMQ] Failed to connect after retries")
 
 
 def connect_to_redis():
+    if PIPELINE_BACKEND == "local":
+        from local_backends import local_redis
+        return local_redis()
     for attempt in range(MAX_RETRIES):
         try:
             logging.info(f"[Redis] Connecting to {REDIS_HOST_LOCAL}:{REDIS_PORT} (attempt {attempt + 1})")
@@ -66,86 +101,245 @@ def connect_to_redis():
     raise Exception("[Redis] Failed to connect after retries")
 
 
+def build_message(customer):
+    # Customer info lines count towards the total, so one dialogue of MIN_LINES_PER_COMPLAINT turns is enough
+    scenario, dialogue = dialogue_engine.dialogue(customer, total_lines=MIN_LINES_PER_COMPLAINT)
+    complaint_lines = [line.strip() for line in dialogue.split('\n') if line.strip()]
+    timestamp = time.time()
+    return messages.TextComplaint(
+        v=messages.SCHEMA_VERSION,
+        # Pooled customers repeat within a second, so the suffix keeps ids (and their Redis metadata) apart
+        message_id=f"text-{customer['id']}-{int(timestamp)}-{uuid.uuid4().hex[:12]}",
+        timestamp=timestamp,
+        scenario=scenario,
+        customer_id=customer["id"],
+        channel="text",
+        complaint_text="\n".join(complaint_lines[:MIN_LINES_PER_COMPLAINT]),
+        customer=messages.Customer(**customer),
+    )
+
+
+def metadata_writer(message):
+    return METADATA.writer(message.message_id, message.timestamp, {
+        "customer_id": message.customer_id,
+        "customer_name": message.customer.name,
+        "timestamp": round(message.timestamp, 3)
+    })
+
+
+def create_publisher(redis_client):
+    publisher = ConfirmedPublisher(rabbitmq_parameters(), QUEUE_NAME, queue_arguments={'x-dead-letter-exchange': 'text_dlx'},
+                                   redis_client=redis_client, name="text_producer", extra_queues=[PRIORITY_QUEUE]).start()
+    if TEXT_BATCH_SIZE > 1:
+        logging.info(f"[Publisher] Packing up to {TEXT_BATCH_SIZE} complaints / {TEXT_BATCH_LINGER_MS:g} ms per envelope")
+        return EnvelopePublisher(publisher, TEXT_BATCH_SIZE, TEXT_BATCH_LINGER_MS, CONTENT_TYPE, TEXT_BATCH_COMPRESSLEVEL)
+    return publisher
+
+
+def create_backpressure(publisher):
+    if not BACKPRESSURE:
+        return None
+    return Backpressure(rabbitmq_parameters(), [QUEUE_NAME, PRIORITY_QUEUE], publisher, BACKPRESSURE_HIGH_WATERMARK,
+                        BACKPRESSURE_LOW_WATERMARK, name="text_producer").start()
+
+
+def publish_message(publisher, message):
+    # Metadata is written, pipelined, once the broker confirms the message
+    properties = pika.BasicProperties(delivery_mode=2, content_type=CONTENT_TYPE, message_id=message.message_id)
+    queue = PRIORITY_QUEUE if message.scenario in PRIORITY_SCENARIOS else QUEUE_NAME
+    publisher.publish(queue, messages.encode(message, CONTENT_TYPE), properties,
+                      metadata=metadata_writer(message))
+
+
 def main():
     redis_client = connect_to_redis()
-    rabbit_conn = connect_to_rabbitmq()
-    channel = rabbit_conn.channel()
-
-    # Declare queue with DLX argument to match existing queue configuration
-    channel.queue_declare(
-        queue=QUEUE_NAME,
-        durable=True,
-        arguments={'x-dead-letter-exchange': 'text_dlx'}
-    )
+    publisher = create_publisher(redis_client)
+    backpressure = create_backpressure(publisher)
+
+    customers = None
+    if CUSTOMER_POOL_SIZE > 0:
+        pool = CustomerPool.load_or_generate(CUSTOMER_POOL_PATH, CUSTOMER_POOL_SIZE, CUSTOMER_POOL_SEED)
+        customers = pool.sampler(seed=CUSTOMER_POOL_SEED, skew=CUSTOMER_POOL_SKEW)
 
     for i in range(TOTAL_MESSAGES):
-        customer = generate_customer()
+        customer = next(customers) if customers is not None else generate_customer()
         logging.info(f"[{i + 1}/{TOTAL_MESSAGES}] Generating complaint for customer: {customer['name']} (ID: {customer['id']})")
 
-        complaint_lines = []
-        while len(complaint_lines) < MIN_LINES_PER_COMPLAINT:
-            dialogue = generate_dialogue(customer)
-            lines = [line.strip() for line in dialogue.split('\n') if line.strip()]
-            complaint_lines.extend(lines)
-
-        complaint_text = "\n".join(complaint_lines[:MIN_LINES_PER_COMPLAINT])
+        message = build_message(customer)
+        complaint_text = message.complaint_text
+        complaint_lines = complaint_text.split("\n")
 
         print(f"\n--- Complaint Text ({len(complaint_lines)} lines) ---\n{complaint_text}\n")
 
-        timestamp = time.time()
-        message_id = f"text-{customer['id']}-{int(timestamp)}"
+        message_id = message.message_id
 
         logging.info(f"[{i + 1}/{TOTAL_MESSAGES}] Complaint ready (Lines: {len(complaint_lines)}). Preparing to publish message_id: {message_id}")
 
-        message = {
-            "message_id": message_id,
-            "customer": customer,
-            "complaint_text": complaint_text,
-            "timestamp": timestamp
-        }
-
-        try:
-            channel.basic_publish(
-                exchange='',
-                routing_key=QUEUE_NAME,
-                body=json.dumps(message),
-                properties=pika.BasicProperties(delivery_mode=2)
-            )
-        except (pika.exceptions.AMQPConnectionError, pika.exceptions.ChannelWrongStateError) as e:
-            logging.error(f"[RabbitMQ] Publish failed: {e}. Attempting reconnect.")
-            try:
-                rabbit_conn.close()
-            except Exception:
-                pass
-            rabbit_conn = connect_to_rabbitmq()
-            channel = rabbit_conn.channel()
-            channel.queue_declare(
-                queue=QUEUE_NAME,
-                durable=True,
-                arguments={'x-dead-letter-exchange': 'text_dlx'}
-            )
-            channel.basic_publish(
-                exchange='',
-                routing_key=QUEUE_NAME,
-                body=json.dumps(message),
-                properties=pika.BasicProperties(delivery_mode=2)
-            )
-
-        redis_key = f"text:{message_id}"
-        redis_client.hset(redis_key, mapping={
-            "customer_id": customer["id"],
-            "customer_name": customer["name"],
-            "queue": QUEUE_NAME,
-            "timestamp": timestamp
-        })
-
-        logging.info(f"[{i + 1}/{TOTAL_MESSAGES}] ✅ Message published and stored in Redis: {message_id}")
+        if backpressure is not None and (waited := backpressure.acquire()) > 0:
+            logging.info(f"[{i + 1}/{TOTAL_MESSAGES}] Held back {waited:.1f}s by backpressure")
+        publish_message(publisher, message)
+        counters = publisher.counters()
+        logging.info(f"[{i + 1}/{TOTAL_MESSAGES}] ✅ Message queued for publishing: {message_id} "
+                     f"(in flight: {counters['in_flight']}, confirmed: {counters['confirmed']})")
 
         time.sleep(DELAY_BETWEEN_MESSAGES)
 
-    rabbit_conn.close()
+    if backpressure is not None:
+        backpressure.close()
+    publisher.close()
     logging.info("🚀 Finished sending all text complaints.")
 
 
+# --- Load generation ---
+def target_rate(elapsed):
+    """Aggregate target rate (messages/s) at `elapsed` seconds, or None once the profile has finished."""
+    if LOAD_PROFILE == "step":
+        for rate, seconds in STEPS:
+            if elapsed < seconds:
+                return rate
+            elapsed -= seconds
+        return None
+    if elapsed >= LOAD_DURATION:
+        return None
+    if LOAD_PROFILE == "ramp":
+        return LOAD_RAMP_START_RATE + (LOAD_RATE - LOAD_RAMP_START_RATE) * elapsed / LOAD_DURATION
+    return LOAD_RATE
+
+
+def mean_target_rate():
+    if LOAD_PROFILE == "step":
+        return sum(rate * seconds for rate, seconds in STEPS) / sum(seconds for _, seconds in STEPS)
+    if LOAD_PROFILE == "ramp":
+        return (LOAD_RAMP_START_RATE + LOAD_RATE) / 2
+    return LOAD_RATE
+
+
+def arrival_offsets(worker_count, rng):
+    """
+    Scheduled send times (seconds from start) for one worker's share of the target rate.
+    Each arrival needs one unit (an Exp(1) draw for 'poisson') of integrated rate, so ramps and steps stay exact.
+    """
+    elapsed = 0.0
+    while True:
+        need = rng.expovariate(1.0) if LOAD_PROFILE == "poisson" else 1.0
+        while need > 0:
+            rate = target_rate(elapsed)
+            if rate is None:
+                return
+            rate /= worker_count
+            if rate * 0.01 >= need:
+                elapsed += need / rate
+                need = 0.0
+            else:
+                elapsed += 0.01
+                need -= rate * 0.01
+        yield elapsed
+
+
+class LoadStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sent = 0
+        self.late = 0  # sends that started after their scheduled time had already passed
+        self.latencies = []  # scheduled time -> publish returned, so queueing behind a slow broker counts
+        self.last_at = None
+
+    def record(self, latency, late):
+        with self.lock:
+            self.last_at = time.perf_counter()
+            self.sent += 1
+            self.late += late
+            self.latencies.append(latency)
+
+
+def percentile(values, q):
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+def load_worker(worker_id, start, stats, stop_event, customers, publisher, backpressure):
+    rng = random.Random(worker_id)
+    for offset in arrival_offsets(LOAD_WORKERS, rng):
+        if stop_event.is_set():
+            break
+        # Build the next message while idle so latency covers only the publish
+        message = build_message(next(customers) if customers is not None else generate_customer())
+        scheduled = start + offset
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        if backpressure is not None:
+            backpressure.acquire()  # counted in the latency, and as late sends for the ones after it
+        publish_message(publisher, message)
+        stats.record(time.perf_counter() - scheduled, delay < 0)
+
+
+def load_test():
+    if LOAD_PROFILE not in ("constant", "poisson", "step", "ramp"):
+        raise ValueError(f"Unknown LOAD_PROFILE: {LOAD_PROFILE}")
+    pool = None
+    if CUSTOMER_POOL_SIZE > 0:
+        pool = CustomerPool.load_or_generate(CUSTOMER_POOL_PATH, CUSTOMER_POOL_SIZE, CUSTOMER_POOL_SEED)
+    duration = sum(seconds for _, seconds in STEPS) if LOAD_PROFILE == "step" else LOAD_DURATION
+    load_log.info(f"[Load] profile={LOAD_PROFILE} rate={LOAD_RATE}/s duration={duration}s workers={LOAD_WORKERS}")
+
+    publisher = create_publisher(connect_to_redis())
+    backpressure = create_backpressure(publisher)
+    stats = LoadStats()
+    stop_event = threading.Event()
+    start = time.perf_counter() + 0.5  # let the publisher connect before the first scheduled send
+    # Generator objects are not thread-safe, so each worker gets its own pool sampler
+    workers = [
+        threading.Thread(target=load_worker, daemon=True, args=(
+            worker_id, start, stats, stop_event,
+            pool.sampler(seed=CUSTOMER_POOL_SEED + worker_id, skew=CUSTOMER_POOL_SKEW) if pool else None, publisher,
+            backpressure))
+        for worker_id in range(LOAD_WORKERS)
+    ]
+    for worker in workers:
+        worker.start()
+
+    last_sent, last_at = 0, start
+    try:
+        while any(worker.is_alive() for worker in workers):
+            for worker in workers:
+                worker.join(timeout=max(0.0, last_at + LOAD_REPORT_INTERVAL - time.perf_counter()))
+            if not any(worker.is_alive() for worker in workers):
+                break
+            now = time.perf_counter()
+            with stats.lock:
+                sent, recent = stats.sent, sorted(stats.latencies[last_sent:])
+            target = target_rate(max(0.0, now - start))
+            counters = publisher.counters()
+            load_log.info(
+                f"[Load] t={now - start:6.1f}s target={target or 0:8.1f}/s achieved={(sent - last_sent) / (now - last_at):8.1f}/s "
+                f"p50={1000 * percentile(recent, 0.5):7.2f}ms p99={1000 * percentile(recent, 0.99):7.2f}ms "
+                f"late={stats.late} in_flight={counters['in_flight']} pending={counters['pending']} "
+                f"confirmed={counters['confirmed']} nacked={counters['nacked']}"
+                + (f" limit={backpressure.rate:.1f}/s depth={backpressure.stats['depth']}"
+                   if backpressure is not None and backpressure.rate is not None else ""))
+            last_sent, last_at = sent, now
+    except KeyboardInterrupt:
+        stop_event.set()
+        logging.warning("Interrupted by user, stopping workers...")
+    for worker in workers:
+        worker.join()
+    if backpressure is not None:
+        backpressure.close()
+    publisher.close()
+
+    wall_s = max((stats.last_at or time.perf_counter()) - start, 1e-9)
+    latencies = sorted(stats.latencies)
+    confirm_latencies = sorted(publisher.confirm_latencies)
+    counters = publisher.counters()
+    load_log.info(
+        f"[Load] Done: sent={stats.sent} confirmed={counters['confirmed']} republished={counters['republished']} "
+        f"in {wall_s:.1f}s | "
+        f"achieved {stats.sent / wall_s:.1f}/s vs target {mean_target_rate():.1f}/s | "
+        f"publish latency p50={1000 * percentile(latencies, 0.5):.2f}ms p95={1000 * percentile(latencies, 0.95):.2f}ms "
+        f"p99={1000 * percentile(latencies, 0.99):.2f}ms max={1000 * (latencies[-1] if latencies else 0):.2f}ms | "
+        f"confirm latency p50={1000 * percentile(confirm_latencies, 0.5):.2f}ms "
+        f"p99={1000 * percentile(confirm_latencies, 0.99):.2f}ms | late sends={stats.late}")
+
+
 if __name__ == "__main__":
-    main()
+    load_test() if PRODUCER_MODE == "load" else main()
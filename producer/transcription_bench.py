@@ -0,0 +1,161 @@
+import io
+import os
+import re
+import sys
+import time
+import logging
+import argparse
+import resource
+import itertools
+import multiprocessing
+
+# Word error rate, real-time factor and memory of the voice consumers' Whisper decoding profiles
+# (transcription.py) on producer-generated complaints, whose text is known. Clips follow the voice corpus's
+# seeded dialogue sequence: synthesized here, or downloaded from a corpus built with PRODUCER_MODE=corpus
+# (same CORPUS_SEED and CORPUS_CUSTOMERS). Each profile runs in a fresh process, so its RSS is its own.
+#
+#   python transcription_bench.py --synthesize 5
+#   python transcription_bench.py --corpus 20 --profiles fast,balanced --backend faster-whisper
+#
+# WER is the word-level edit distance over the reference words, lowercased and without punctuation.
+# Numbers the model writes out ("five" for "5") count as errors for every profile alike.
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CONSUMER_DIR = os.path.join(ROOT_DIR, "consumer-sentiment")  # any service's copy of transcription.py
+DEFAULT_PROFILES = "fast,balanced,accurate"
+WHISPER_SAMPLE_RATE = 16000
+
+
+def synthesize_clips(count):
+    # Imported here so the per-profile worker processes do not load the producer
+    import voice_producer
+    from audio_codec import decode
+    voice_producer.init_tts_worker(os.cpu_count() or 1)
+    clips = []
+    for object_name, _, sentences, _ in itertools.islice(voice_producer.corpus_jobs({}), count):
+        audio, _, _, _ = voice_producer.synthesize(sentences)
+        clips.append((os.path.basename(object_name), decode(audio), " ".join(sentences)))
+    return clips
+
+
+def corpus_clips(count):
+    import voice_producer
+    from audio_codec import decode
+    s3 = voice_producer.create_s3_client()
+    entries = voice_producer.load_manifest(s3)
+    if not entries:
+        raise SystemExit(f"No manifest for corpus '{voice_producer.CORPUS_NAME}', run with PRODUCER_MODE=corpus first")
+    clips = []
+    for object_name, _, sentences, extra in voice_producer.corpus_jobs({}):
+        entry = entries.get(extra["index"])
+        if entry is None:
+            continue
+        buffer = io.BytesIO()
+        s3.download_fileobj(voice_producer.MINIO_BUCKET, entry["object_name"], buffer)
+        clips.append((os.path.basename(object_name), decode(buffer.getvalue()), " ".join(sentences)))
+        if len(clips) == count:
+            break
+    return clips
+
+
+def normalize(text):
+    return re.sub(r"[^a-z0-9']+", " ", text.lower()).split()
+
+
+def word_errors(reference, hypothesis):
+    """Substitutions + deletions + insertions turning the reference words into the hypothesis."""
+    previous = list(range(len(hypothesis) + 1))
+    for i, reference_word in enumerate(reference, 1):
+        current = [i]
+        for j, hypothesis_word in enumerate(hypothesis, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (reference_word != hypothesis_word)))
+        previous = current
+    return previous[-1]
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # kB on Linux
+
+
+def run_profile(backend, name, clips, consumer_dir, log_level):
+    """Runs in a worker process: loads the profile's model, transcribes every clip, returns the totals."""
+    logging.basicConfig(level=log_level, format="%(asctime)s %(levelname)s %(message)s")
+    sys.path.append(consumer_dir)
+    import transcription
+
+    totals = {"load_s": 0.0, "audio_s": 0.0, "transcribe_s": 0.0, "errors": 0, "words": 0,
+              "base_rss_mb": peak_rss_mb()}
+    start = time.perf_counter()
+    transcriber = transcription.Transcriber(backend)
+    transcriber.load(name)
+    totals["load_s"] = time.perf_counter() - start
+
+    for clip_name, samples, reference in clips:
+        start = time.perf_counter()
+        text, _ = transcriber.transcribe(samples, name)
+        totals["transcribe_s"] += time.perf_counter() - start
+        reference_words = normalize(reference)
+        errors = word_errors(reference_words, normalize(text))
+        logging.info(f"[{name}] {clip_name}: WER {errors / max(len(reference_words), 1):.3f}")
+        totals["audio_s"] += len(samples) / WHISPER_SAMPLE_RATE
+        totals["errors"] += errors
+        totals["words"] += len(reference_words)
+    totals["peak_rss_mb"] = peak_rss_mb()
+    return totals
+
+
+def report(backend, profiles, results, clips):
+    audio_s = sum(len(samples) / WHISPER_SAMPLE_RATE for _, samples, _ in clips)
+    words = sum(len(normalize(reference)) for _, _, reference in clips)
+    print(f"\n=== Transcription benchmark ({backend}): {len(clips)} clips, {audio_s:.1f}s of audio, "
+          f"{words} reference words ===")
+    print(f"{'profile':<10} {'model':<7} {'compute':<8} {'beam':>4} {'lang':>5} {'vad':>4} {'load_s':>7} "
+          f"{'rtf':>7} {'x_rt':>7} {'WER':>7} {'rss_mb':>8} {'model_mb':>9}")
+    for name, totals in results.items():
+        profile = profiles[name]
+        rtf = totals["transcribe_s"] / max(totals["audio_s"], 1e-9)
+        print(f"{name:<10} {profile['model']:<7} {profile['compute_type']:<8} {profile['beam_size']:>4} "
+              f"{profile['language'] or 'auto':>5} {'on' if profile['vad'] else 'off':>4} {totals['load_s']:>7.2f} "
+              f"{rtf:>7.3f} {1 / rtf if rtf else float('inf'):>7.1f} "
+              f"{100 * totals['errors'] / max(totals['words'], 1):>6.1f}% {totals['peak_rss_mb']:>8.0f} "
+              f"{totals['peak_rss_mb'] - totals['base_rss_mb']:>9.0f}")
+    print("\nrtf: transcription seconds per second of audio (x_rt is its inverse); rss_mb: peak RSS of the "
+          "profile's process; model_mb: what loading and running the model added to it")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare WER, speed and memory of the Whisper decoding profiles")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--synthesize", type=int, help="Synthesize this many corpus complaints with the VITS model")
+    source.add_argument("--corpus", type=int, help="Download this many complaints of the stored corpus")
+    parser.add_argument("--profiles", default=DEFAULT_PROFILES, help="Comma-separated profile names")
+    parser.add_argument("--backend", default="whisper", help="'whisper' (openai-whisper) or 'faster-whisper'")
+    parser.add_argument("--consumer-dir", default=DEFAULT_CONSUMER_DIR, help="Service directory with transcription.py")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level, format="%(asctime)s %(levelname)s %(message)s")
+
+    # Appended so the producer's own helper modules win, as in e2e_bench.py
+    sys.path.append(os.path.abspath(args.consumer_dir))
+    import transcription
+    names = args.profiles.split(",")
+    profiles = {name: transcription.get_profile(name) for name in names}
+    if args.backend not in transcription.WHISPER_BACKENDS:
+        raise SystemExit(f"Unknown backend '{args.backend}', expected one of {', '.join(transcription.WHISPER_BACKENDS)}")
+
+    clips = synthesize_clips(args.synthesize) if args.synthesize else corpus_clips(args.corpus)
+    if not clips:
+        raise SystemExit("No clips to transcribe")
+
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    for name in names:
+        with context.Pool(1) as pool:
+            results[name] = pool.apply(run_profile, (args.backend, name, clips, os.path.abspath(args.consumer_dir),
+                                                     args.log_level))
+    report(args.backend, profiles, results, clips)
+
+
+if __name__ == "__main__":
+    main()
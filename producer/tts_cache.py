@@ -0,0 +1,107 @@
+import os
+import time
+import uuid
+import sqlite3
+import hashlib
+import logging
+
+import numpy as np
+
+# Persistent sentence-level TTS cache for voice_producer.py.
+# Segments are 16-bit mono PCM appended to per-process data files (segments-<pid>-<id>.pcm),
+# so TTS worker processes never contend on writes. index.sqlite maps
+# sha1(model, speaker, normalized sentence) -> (data file, offset, length, sample rate).
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (
+    key TEXT PRIMARY KEY,
+    sentence TEXT NOT NULL,
+    data_file TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    sample_rate INTEGER NOT NULL,
+    created_at REAL NOT NULL
+)"""
+
+
+def normalize(sentence):
+    return " ".join(sentence.replace("’", "'").replace("“", '"').replace("”", '"').split())
+
+
+def to_pcm16(samples):
+    return (np.clip(np.asarray(samples, dtype=np.float32), -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+
+class SentenceCache:
+    def __init__(self, root, model, speaker):
+        os.makedirs(root, exist_ok=True)
+        self.root = root
+        self.model = model
+        self.speaker = speaker
+        self.db = sqlite3.connect(os.path.join(root, "index.sqlite"), timeout=30, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(SCHEMA)
+        self.data_file = f"segments-{os.getpid()}-{uuid.uuid4().hex[:8]}.pcm"
+        self.data = None  # opened on the first miss
+        self.readers = {}
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, sentence):
+        return hashlib.sha1(f"{self.model}\0{self.speaker}\0{normalize(sentence)}".encode("utf-8")).hexdigest()
+
+    def lookup(self, keys):
+        """{key: (data_file, offset, length, sample_rate)} for the keys already cached."""
+        unique = list(dict.fromkeys(keys))
+        placeholders = ",".join("?" * len(unique))
+        rows = self.db.execute(
+            f"SELECT key, data_file, offset, length, sample_rate FROM segments WHERE key IN ({placeholders})", unique)
+        return {row[0]: row[1:] for row in rows}
+
+    def read(self, entry):
+        data_file, offset, length, _ = entry
+        reader = self.readers.get(data_file)
+        if reader is None:
+            reader = self.readers[data_file] = open(os.path.join(self.root, data_file), "rb")
+        reader.seek(offset)
+        return reader.read(length)
+
+    def put(self, key, sentence, pcm, sample_rate):
+        if self.data is None:
+            self.data = open(os.path.join(self.root, self.data_file), "ab")
+        offset = self.data.tell()
+        self.data.write(pcm)
+        self.data.flush()  # the segment must be readable before the index points at it
+        # Replaces an entry at another sample rate; a worker racing on the same sentence stores an equal segment
+        self.db.execute("INSERT OR REPLACE INTO segments VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (key, normalize(sentence), self.data_file, offset, len(pcm), sample_rate, time.time()))
+        return self.data_file, offset, len(pcm), sample_rate
+
+    def render(self, sentences, synthesize_sentence, sample_rate, gap_ms):
+        """
+        PCM for the sentences joined by gap_ms of silence. Cached segments are read back;
+        only the misses go through synthesize_sentence(text) -> float samples.
+        """
+        keys = [self.key(sentence) for sentence in sentences]
+        entries = self.lookup(keys) if keys else {}
+        gap = b"\0\0" * int(sample_rate * gap_ms / 1000)
+        segments = []
+        for key, sentence in zip(keys, sentences):
+            entry = entries.get(key)
+            if entry is not None and entry[3] == sample_rate:
+                self.hits += 1
+                segments.append(self.read(entry))
+                continue
+            self.misses += 1
+            pcm = to_pcm16(synthesize_sentence(normalize(sentence)))
+            entries[key] = self.put(key, sentence, pcm, sample_rate)
+            segments.append(pcm)
+        return gap.join(segments)
+
+    def close(self):
+        if self.data is not None:
+            self.data.close()
+        for reader in self.readers.values():
+            reader.close()
+        self.db.close()
+        logging.info(f"[TTS cache] {self.hits} hits, {self.misses} misses")
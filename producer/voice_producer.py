@@ -1,15 +1,24 @@
+import io
 import os
 import uuid
 import json
 import time
+import queue
 import logging
+import threading
+import multiprocessing
 import pika
 import boto3
 import redis
-import tempfile
 from datetime import datetime
-from TTS.api import TTS
-from utils import generate_customer, generate_dialogue
+from concurrent.futures import ProcessPoolExecutor
+from utils import CustomerPool, DialogueEngine, generate_customer
+from publisher import ConfirmedPublisher
+from backpressure import Backpressure
+from metadata_sink import MetadataSink
+from tts_cache import SentenceCache, to_pcm16
+from audio_codec import AUDIO_FORMATS, encode
+import messages
 
 # Setup logging
 logging.basicConfig(
@@ -21,6 +30,8 @@ logging.basicConfig(
 # Environment Variables
 RABBITMQ_HOST = os.getenv("RABBITMQ_HOST")
 VOICE_QUEUE = "voice_complaints"
+PRIORITY_QUEUE = f"{VOICE_QUEUE}.priority"  # drained first by the consumers (lanes.py)
+PRIORITY_SCENARIOS = {name for name in os.getenv("PRIORITY_SCENARIOS", "fraud").split(",") if name}
 
 MINIO_ENDPOINT = os.getenv("MINIO_ENDPOINT")
 MINIO_ACCESS_KEY = os.getenv("MINIO_ACCESS_KEY")
@@ -29,78 +40,184 @@ MINIO_BUCKET = os.getenv("MINIO_BUCKET")
 
 REDIS_HOST_LOCAL = os.getenv("REDIS_HOST")
 REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
+PIPELINE_BACKEND = os.getenv("PIPELINE_BACKEND", "docker")  # 'docker' or 'local' (in-process stand-ins)
 
 MAX_RETRIES = 10
 RETRY_DELAY = 2
 MESSAGE_LENGHT = 20
+TOTAL_MESSAGES = int(os.getenv("TOTAL_MESSAGES", 2000))
+DELAY_BETWEEN_MESSAGES = float(os.getenv("DELAY_BETWEEN_MESSAGES", 0.5))  # seconds
+METADATA = MetadataSink("voice", VOICE_QUEUE)  # voice:<id> hashes + voice:index:voice_complaints
+MESSAGE_FORMAT = os.getenv("MESSAGE_FORMAT", "json")  # body encoding: 'json' or 'msgpack' (see messages.py)
+CONTENT_TYPE = messages.CONTENT_TYPES[MESSAGE_FORMAT]
+
+# Pipeline: generate -> TTS worker processes -> upload threads -> publisher, joined by bounded queues
+TTS_MODEL = "tts_models/en/vctk/vits"
+TTS_SPEAKER = "p225"
+TTS_WORKERS = int(os.getenv("TTS_WORKERS", max(1, (os.cpu_count() or 2) // 2)))  # processes, one model each
+TTS_THREADS_PER_WORKER = int(os.getenv("TTS_THREADS_PER_WORKER", max(1, (os.cpu_count() or 1) // TTS_WORKERS)))
+UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", 4))
+STAGE_QUEUE_SIZE = int(os.getenv("STAGE_QUEUE_SIZE", 8))  # max items waiting between two stages
+REPORT_INTERVAL = float(os.getenv("REPORT_INTERVAL", 30))  # seconds between stage throughput reports
+
+# Backpressure (backpressure.py): fewer complaints are generated, and so synthesised, while voice_complaints and
+# its priority lane hold more than the high watermark. Also paces replay mode; corpus builds never publish
+BACKPRESSURE = os.getenv("BACKPRESSURE", "1") == "1"
+BACKPRESSURE_HIGH_WATERMARK = int(os.getenv("BACKPRESSURE_HIGH_WATERMARK", 500))  # queued messages
+BACKPRESSURE_LOW_WATERMARK = int(os.getenv("BACKPRESSURE_LOW_WATERMARK", 100))
+
+# Sentence-level audio cache; empty TTS_CACHE_DIR synthesizes every complaint from scratch
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "tts_cache"))
+SENTENCE_GAP_MS = int(os.getenv("SENTENCE_GAP_MS", 250))  # silence between cached sentences
+
+# Two-phase corpus mode: PRODUCER_MODE=corpus synthesizes a seeded corpus into MinIO once,
+# PRODUCER_MODE=replay republishes its manifest at REPLAY_RATE with no TTS in the loop
+PRODUCER_MODE = os.getenv("PRODUCER_MODE", "pipeline")  # 'pipeline', 'corpus' or 'replay'
+CORPUS_NAME = os.getenv("CORPUS_NAME", "default")  # objects and manifest live under corpus/<name>/
+CORPUS_SIZE = int(os.getenv("CORPUS_SIZE", 500))
+CORPUS_SEED = int(os.getenv("CORPUS_SEED", 42))
+CORPUS_CUSTOMERS = int(os.getenv("CORPUS_CUSTOMERS", 1000))  # fixed so growing CORPUS_SIZE keeps earlier entries
+REPLAY_RATE = float(os.getenv("REPLAY_RATE", 1.0))  # messages/s, 0 = as fast as the publisher confirms
+REPLAY_MESSAGES = int(os.getenv("REPLAY_MESSAGES", 0))  # 0 = one pass over the manifest; more cycles through it
+
+# Stored audio encoding: wav, flac (lossless) or opus; AUDIO_SAMPLE_RATE=16000 resamples at the source
+# (0 keeps the model's 22.05 kHz, which Opus does not support, so Opus falls back to 16 kHz)
+AUDIO_FORMAT = os.getenv("AUDIO_FORMAT", "wav")
+AUDIO_SAMPLE_RATE = int(os.getenv("AUDIO_SAMPLE_RATE", 0))
+OPUS_BITRATE_KBPS = int(os.getenv("OPUS_BITRATE_KBPS", 24))
+if AUDIO_FORMAT not in AUDIO_FORMATS:
+    raise ValueError(f"AUDIO_FORMAT must be one of {', '.join(AUDIO_FORMATS)}")
+
+# Uploads go straight from memory through one shared, pooled S3 client
+S3_TRANSFER_CONCURRENCY = int(os.getenv("S3_TRANSFER_CONCURRENCY", 4))  # parts in flight per multipart upload
+S3_MULTIPART_THRESHOLD_MB = int(os.getenv("S3_MULTIPART_THRESHOLD_MB", 8))
+S3_MULTIPART_CHUNK_MB = int(os.getenv("S3_MULTIPART_CHUNK_MB", 8))
+S3_MAX_POOL_CONNECTIONS = int(os.getenv("S3_MAX_POOL_CONNECTIONS", UPLOAD_WORKERS * S3_TRANSFER_CONCURRENCY))
+
+
+def create_s3_client():
+    # MinIO (S3-compatible) client setup
+    if PIPELINE_BACKEND == "local":
+        from local_backends import local_object_store
+        return local_object_store()
+    # boto3 clients are thread-safe; size the pool for every upload thread's concurrent parts
+    from botocore.config import Config
+    return boto3.client(
+        "s3",
+        endpoint_url=f"http://{MINIO_ENDPOINT}",
+        aws_access_key_id=MINIO_ACCESS_KEY,
+        aws_secret_access_key=MINIO_SECRET_KEY,
+        config=Config(max_pool_connections=S3_MAX_POOL_CONNECTIONS, retries={"max_attempts": 5, "mode": "standard"}),
+    )
 
-# MinIO (S3-compatible) client setup
-s3 = boto3.client(
-    "s3",
-    endpoint_url=f"http://{MINIO_ENDPOINT}",
-    aws_access_key_id=MINIO_ACCESS_KEY,
-    aws_secret_access_key=MINIO_SECRET_KEY,
-)
 
-# Ensure MinIO bucket exists
-try:
-    s3.head_bucket(Bucket=MINIO_BUCKET)
-    logging.info(f"[MinIO] Bucket '{MINIO_BUCKET}' exists")
-except s3.exceptions.ClientError as e:
-    error_code = int(e.response['Error']['Code'])
-    if error_code == 404:
-        logging.info(f"[MinIO] Bucket '{MINIO_BUCKET}' not found, creating it")
-        s3.create_bucket(Bucket=MINIO_BUCKET)
-    else:
-        logging.error(f"[MinIO] Bucket access error: {e}")
+def create_transfer_config():
+    if PIPELINE_BACKEND == "local":
+        return None
+    from boto3.s3.transfer import TransferConfig
+    return TransferConfig(
+        multipart_threshold=S3_MULTIPART_THRESHOLD_MB * 1024 * 1024,
+        multipart_chunksize=S3_MULTIPART_CHUNK_MB * 1024 * 1024,
+        max_concurrency=S3_TRANSFER_CONCURRENCY,
+        use_threads=True,
+    )
+
 
-# Load multi-speaker TTS model
-logging.info("[TTS] Loading TTS model: 'tts_models/en/vctk/vits'")
-tts = TTS("tts_models/en/vctk/vits")
+def ensure_bucket(s3):
+    try:
+        s3.head_bucket(Bucket=MINIO_BUCKET)
+        logging.info(f"[MinIO] Bucket '{MINIO_BUCKET}' exists")
+    except s3.exceptions.ClientError as e:
+        error_code = int(e.response['Error']['Code'])
+        if error_code == 404:
+            logging.info(f"[MinIO] Bucket '{MINIO_BUCKET}' not found, creating it")
+            s3.create_bucket(Bucket=MINIO_BUCKET)
+        else:
+            logging.error(f"[MinIO] Bucket access error: {e}")
+
+
+# --- TTS worker processes ---
+tts = None  # per-process model, loaded by init_tts_worker
+cache = None  # per-process SentenceCache handle
+
+
+def init_tts_worker(threads):
+    global tts, cache
+    import torch
+    from TTS.api import TTS
+    torch.set_num_threads(threads)
+    logging.info(f"[TTS] Loading TTS model '{TTS_MODEL}' in worker process {os.getpid()}")
+    tts = TTS(TTS_MODEL)
+    if TTS_CACHE_DIR:
+        cache = SentenceCache(TTS_CACHE_DIR, TTS_MODEL, TTS_SPEAKER)
+
+
+def synthesize(sentences):
+    """Returns (audio_bytes, audio_info, cache_hits, cache_misses); nothing touches the disk."""
+    sample_rate = tts.synthesizer.output_sample_rate
+    if cache is None:
+        pcm = to_pcm16(tts.tts(text="\n".join(group_into_chunks(sentences)), speaker=TTS_SPEAKER))
+        hits, misses = 0, len(sentences)
+    else:
+        hits, misses = cache.hits, cache.misses
+        pcm = cache.render(sentences, lambda text: tts.tts(text=text, speaker=TTS_SPEAKER), sample_rate,
+                           SENTENCE_GAP_MS)
+        hits, misses = cache.hits - hits, cache.misses - misses
+    audio, audio_info = encode(pcm, sample_rate, AUDIO_FORMAT, AUDIO_SAMPLE_RATE, OPUS_BITRATE_KBPS)
+    return audio, audio_info, hits, misses
 
 
 def clean_text(text):
     return text.replace("’", "'").replace("“", '"').replace("”", '"')
 
 
-def split_into_chunks(dialogue, max_chars=250):
+def split_into_sentences(dialogue):
     import re
     sentence_pattern = re.compile(r'(?<=[.!?]) +')
-    current_chunk = ""
     for line in dialogue:
         line = clean_text(line.strip())
         if not line or line == ".":
             continue
         for sentence in sentence_pattern.split(line):
             sentence = sentence.strip()
-            if not sentence:
-                continue
-            if len(current_chunk) + len(sentence) + 1 <= max_chars:
-                current_chunk += " " + sentence
-            else:
-                yield current_chunk.strip()
-                current_chunk = sentence
+            if sentence:
+                yield sentence
+
+
+def group_into_chunks(sentences, max_chars=250):
+    current_chunk = ""
+    for sentence in sentences:
+        if len(current_chunk) + len(sentence) + 1 <= max_chars:
+            current_chunk += " " + sentence
+        else:
+            yield current_chunk.strip()
+            current_chunk = sentence
     if current_chunk.strip():
         yield current_chunk.strip()
 
 
-def connect_to_rabbitmq():
-    for attempt in range(10):
-        try:
-            logging.info(f"[RabbitMQ] Connecting to {RABBITMQ_HOST} (attempt {attempt + 1})")
-            connection = pika.BlockingConnection(pika.ConnectionParameters(host=RABBITMQ_HOST))
-            channel = connection.channel()
-            logging.info("[RabbitMQ] Connection established")
-            # Declare voice_complaints queue with no DLQ or exchanges
-            channel.queue_declare(queue=VOICE_QUEUE, durable=True)
-            return channel
-        except pika.exceptions.AMQPConnectionError:
-            logging.warning("[RabbitMQ] Connection failed, retrying in 2s")
-            time.sleep(2)
-    raise RuntimeError("[RabbitMQ] Failed to connect after 10 attempts")
+def rabbitmq_parameters():
+    return pika.ConnectionParameters(host=RABBITMQ_HOST, connection_attempts=MAX_RETRIES, retry_delay=RETRY_DELAY)
+
+
+def create_publisher(redis_client):
+    # Declares voice_complaints and its priority lane with no DLQ or exchanges; confirms and reconnects are
+    # handled by the publisher
+    return ConfirmedPublisher(rabbitmq_parameters(), VOICE_QUEUE, redis_client=redis_client, name="voice_producer",
+                              extra_queues=[PRIORITY_QUEUE]).start()
+
+
+def create_backpressure(publisher):
+    if not BACKPRESSURE:
+        return None
+    return Backpressure(rabbitmq_parameters(), [VOICE_QUEUE, PRIORITY_QUEUE], publisher, BACKPRESSURE_HIGH_WATERMARK,
+                        BACKPRESSURE_LOW_WATERMARK, name="voice_producer").start()
 
 
 def connect_to_redis():
+    if PIPELINE_BACKEND == "local":
+        from local_backends import local_redis
+        return local_redis()
     for attempt in range(MAX_RETRIES):
         try:
             logging.info(f"[Redis] Connecting to {REDIS_HOST_LOCAL}:{REDIS_PORT} (attempt {attempt + 1})")
@@ -114,75 +231,350 @@ def connect_to_redis():
     raise Exception("[Redis] Failed to connect after retries")
 
 
-def generate_and_upload_audio(dialogue_lines, audio_id):
-    logging.info(f"[Audio] Generating TTS chunks for audio_id: {audio_id}")
-    chunks = list(split_into_chunks(dialogue_lines))
-    logging.info(f"[Audio] {len(chunks)} chunks prepared for synthesis")
-
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-        temp_path = temp_file.name
-
-    speaker_id = "p225"
-    logging.info(f"[TTS] Synthesizing audio using speaker: '{speaker_id}'")
-    tts.tts_to_file(
-        text="\n".join(chunks),
-        file_path=temp_path,
-        speaker=speaker_id
-    )
-
-    minio_key = f"{audio_id}.wav"
-    with open(temp_path, "rb") as f:
-        s3.upload_fileobj(f, MINIO_BUCKET, minio_key)
-    os.remove(temp_path)
+def upload_audio(s3, transfer_config, audio, audio_info, audio_id):
+    _, _, content_type, extension = AUDIO_FORMATS[audio_info["format"]]
+    minio_key = f"{audio_id}.{extension}"
+    # Stored as x-amz-meta-* headers for anything reading the bucket directly; consumers get the same
+    # values in the message and can skip stat_object and wave.open
+    metadata = {
+        "format": audio_info["format"],
+        "duration-s": str(audio_info["duration_s"]),
+        "sample-rate": str(audio_info["sample_rate"]),
+        "channels": str(audio_info["channels"]),
+        "sha256": audio_info["sha256"],
+    }
+    s3.upload_fileobj(io.BytesIO(audio), MINIO_BUCKET, minio_key,
+                      ExtraArgs={"Metadata": metadata, "ContentType": content_type}, Config=transfer_config)
 
     audio_url = f"http://{MINIO_ENDPOINT}/{MINIO_BUCKET}/{minio_key}"
     logging.info(f"[MinIO] Uploaded audio to: {audio_url}")
-    return audio_url
-
-
-def main():
-    customer = generate_customer()
-    channel = connect_to_rabbitmq()
-    redis_client = connect_to_redis()
+    return audio_url, minio_key
+
+
+# --- Pipeline stages ---
+class StageStats:
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.lock = threading.Lock()
+        self.count = 0
+        self.failed = 0
+        self.busy_s = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def record(self, seconds, ok=True):
+        with self.lock:
+            self.busy_s += seconds
+            if ok:
+                self.count += 1
+            else:
+                self.failed += 1
+
+
+def report_stages(stages, queues, started_at, final=False):
+    wall_s = max(time.perf_counter() - started_at, 1e-9)
+    lines = []
+    for stage in stages:
+        utilisation = 100 * stage.busy_s / (wall_s * stage.workers)
+        per_item = 1000 * stage.busy_s / max(stage.count + stage.failed, 1)
+        line = (f"{stage.name}: {stage.count} done ({stage.failed} failed), {stage.count / wall_s:.2f}/s, "
+                f"{per_item:.0f} ms/item, {stage.workers} workers {utilisation:.0f}% busy")
+        if stage.cache_hits + stage.cache_misses:
+            line += f", sentence cache {100 * stage.cache_hits / (stage.cache_hits + stage.cache_misses):.0f}% hits"
+        lines.append(line)
+    backlog = ", ".join(f"{name}={q.qsize()}" for name, q in queues.items())
+    label = "Final" if final else f"t={wall_s:.0f}s"
+    logging.info(f"[Pipeline] {label} | " + " | ".join(lines) + f" | queued: {backlog}")
+
+
+def live_jobs(customer):
+    # The scenario is the dialogue's own, so its label and lane match what was said
+    engine = DialogueEngine()
+    for _ in range(TOTAL_MESSAGES):
+        audio_id = f"voice-{uuid.uuid4()}-{int(time.time())}"
+        scenario, dialogue_text = engine.dialogue(customer, MESSAGE_LENGHT)
+        yield audio_id, scenario, list(split_into_sentences(dialogue_text.splitlines())), {}
+
+
+def generate_stage(jobs, total, out_queue, stats, delay=0.0, backpressure=None):
+    jobs = iter(jobs)
+    for i in range(total):
+        # Held back here, before any TTS work is spent on a complaint the queue cannot take yet
+        if backpressure is not None and (waited := backpressure.acquire()) > 0:
+            logging.info(f"[{i + 1}/{total}] Held back {waited:.1f}s by backpressure")
+        start = time.perf_counter()
+        job = next(jobs, None)
+        if job is None:
+            break
+        audio_id, scenario, sentences, _ = job
+        stats.record(time.perf_counter() - start)
+        logging.info(f"[{i + 1}/{total}] Generated {MESSAGE_LENGHT}-line dialogue ({len(sentences)} sentences) "
+                     f"for scenario: '{scenario}', ID: {audio_id}")
+        out_queue.put(job)
+        time.sleep(delay)
+
+
+def tts_stage(tts_pool, in_queue, out_queue, stats):
+    # One feeder thread per worker process keeps every process busy without unbounded submission
+    while (item := in_queue.get()) is not None:
+        audio_id, scenario, sentences, extra = item
+        start = time.perf_counter()
+        try:
+            audio, audio_info, hits, misses = tts_pool.submit(synthesize, sentences).result()
+        except Exception as e:
+            stats.record(time.perf_counter() - start, ok=False)
+            logging.error(f"[TTS] Synthesis failed for {audio_id}: {e}")
+            continue
+        stats.record(time.perf_counter() - start)
+        with stats.lock:
+            stats.cache_hits += hits
+            stats.cache_misses += misses
+        out_queue.put((audio_id, scenario, audio, audio_info, extra))
 
-    scenario_names = ["fraud", "card_issue", "login_problem"]
 
-    for i in range(2000):
-        scenario = scenario_names[i % len(scenario_names)]
-        audio_id = f"voice-{uuid.uuid4()}-{int(time.time())}"
-        logging.info(f"[{i + 1}/2000] Creating voice complaint for scenario: '{scenario}', ID: {audio_id}")
+def upload_stage(s3, transfer_config, in_queue, out_queue, stats):
+    while (item := in_queue.get()) is not None:
+        audio_id, scenario, audio, audio_info, extra = item
+        start = time.perf_counter()
+        try:
+            audio_url, object_name = upload_audio(s3, transfer_config, audio, audio_info, audio_id)
+        except Exception as e:
+            stats.record(time.perf_counter() - start, ok=False)
+            logging.error(f"[MinIO] Upload failed for {audio_id}: {e}")
+            continue
+        stats.record(time.perf_counter() - start)
+        out_queue.put((audio_id, scenario, audio_url, object_name, audio_info, extra))
 
-        dialogue_text = generate_dialogue(customers=customer, total_lines=MESSAGE_LENGHT)
-        logging.info(f"[Dialogue] Generated {MESSAGE_LENGHT}-line dialogue for scenario: {scenario}")
 
-        audio_url = generate_and_upload_audio(dialogue_text.splitlines(), audio_id)
+def lane(scenario):
+    return PRIORITY_QUEUE if scenario in PRIORITY_SCENARIOS else VOICE_QUEUE
 
-        object_name = f"{audio_id}.wav"
 
-        payload = {
-            "id": audio_id,
-            "timestamp": datetime.utcnow().isoformat(),
-            "audio_url": audio_url,
+def publish_complaint(publisher, audio_id, scenario, audio_url, object_name, audio_info, **fields):
+    message = messages.VoiceComplaint(
+        v=messages.SCHEMA_VERSION,
+        message_id=audio_id,
+        timestamp=time.time(),
+        scenario=scenario,
+        channel="voice",
+        object_name=object_name,
+        audio_url=audio_url,
+        audio=messages.AudioInfo(**audio_info),
+        **fields,
+    )
+    # audio_url is rebuilt from object_name, so only the small fields are kept in Redis
+    publisher.publish(
+        lane(scenario),
+        messages.encode(message, CONTENT_TYPE),
+        pika.BasicProperties(delivery_mode=2, content_type=CONTENT_TYPE, message_id=audio_id),
+        metadata=METADATA.writer(audio_id, message.timestamp, {
+            "timestamp": datetime.utcfromtimestamp(message.timestamp).isoformat(),
             "object_name": object_name,
             "scenario": scenario,
-        }
+        }),
+    )
 
-        channel.basic_publish(
-            exchange="",
-            routing_key=VOICE_QUEUE,
-            body=json.dumps(payload),
-            properties=pika.BasicProperties(delivery_mode=2),
-        )
-        logging.info(f"[RabbitMQ] ✅ Pushed complaint to queue '{VOICE_QUEUE}' with ID: {audio_id}")
 
-        redis_key = f"voice:{audio_id}"
-        redis_client.set(redis_key, json.dumps(payload))
-        logging.info(f"[Redis] 📝 Stored metadata with key: {redis_key}")
+def publish_stage(publisher, in_queue, stats):
+    while (item := in_queue.get()) is not None:
+        audio_id, scenario, audio_url, object_name, audio_info, _ = item
+        start = time.perf_counter()
+        publish_complaint(publisher, audio_id, scenario, audio_url, object_name, audio_info)
+        stats.record(time.perf_counter() - start)
+        counters = publisher.counters()
+        logging.info(f"[RabbitMQ] ✅ Queued complaint for '{lane(scenario)}' with ID: {audio_id} "
+                     f"(in flight: {counters['in_flight']}, confirmed: {counters['confirmed']}); "
+                     f"metadata goes to {METADATA.key(audio_id)} once confirmed")
+
+
+def run_stage(threads, target, args, count):
+    for _ in range(count):
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        thread.start()
+        threads.append(thread)
+
+
+def stop_stage(threads, in_queue):
+    for _ in threads:
+        in_queue.put(None)
+    for thread in threads:
+        thread.join()
+
+
+def run_pipeline(jobs, total, s3, sink_name, sink, sink_args, delay=0.0, backpressure=None):
+    """generate -> TTS processes -> upload threads -> sink(*sink_args, in_queue, stats) on one thread."""
+    transfer_config = create_transfer_config()
+    queues = {name: queue.Queue(maxsize=STAGE_QUEUE_SIZE) for name in ("tts", "upload", sink_name)}
+    stats = {
+        "generate": StageStats("generate", 1),
+        "tts": StageStats("tts", TTS_WORKERS),
+        "upload": StageStats("upload", UPLOAD_WORKERS),
+        sink_name: StageStats(sink_name, 1),
+    }
+    # spawn, not fork: each worker loads its own torch model away from the parent's threads
+    tts_pool = ProcessPoolExecutor(max_workers=TTS_WORKERS, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=init_tts_worker, initargs=(TTS_THREADS_PER_WORKER,))
+    logging.info(f"[Pipeline] {TTS_WORKERS} TTS processes x {TTS_THREADS_PER_WORKER} threads, "
+                 f"{UPLOAD_WORKERS} upload threads x {S3_TRANSFER_CONCURRENCY} parts, "
+                 f"stage queues of {STAGE_QUEUE_SIZE}, storing {AUDIO_FORMAT}")
+
+    started_at = time.perf_counter()
+    done = threading.Event()
+
+    def reporter():
+        while not done.wait(REPORT_INTERVAL):
+            report_stages(stats.values(), queues, started_at)
+    threading.Thread(target=reporter, daemon=True).start()
+
+    tts_threads, upload_threads, sink_threads = [], [], []
+    run_stage(tts_threads, tts_stage, (tts_pool, queues["tts"], queues["upload"], stats["tts"]), TTS_WORKERS)
+    run_stage(upload_threads, upload_stage,
+              (s3, transfer_config, queues["upload"], queues[sink_name], stats["upload"]), UPLOAD_WORKERS)
+    run_stage(sink_threads, sink, (*sink_args, queues[sink_name], stats[sink_name]), 1)
+    try:
+        generate_stage(jobs, total, queues["tts"], stats["generate"], delay, backpressure)
+    except KeyboardInterrupt:
+        logging.info("Interrupted by user, draining the pipeline...")
+
+    # Drain stage by stage so nothing already generated is lost
+    stop_stage(tts_threads, queues["tts"])
+    tts_pool.shutdown()
+    stop_stage(upload_threads, queues["upload"])
+    stop_stage(sink_threads, queues[sink_name])
+    done.set()
+    report_stages(stats.values(), queues, started_at, final=True)
 
-        time.sleep(0.5)
 
+def main():
+    s3 = create_s3_client()
+    ensure_bucket(s3)
+    customer = generate_customer()
+    redis_client = connect_to_redis()
+    publisher = create_publisher(redis_client)
+    backpressure = create_backpressure(publisher)
+    run_pipeline(live_jobs(customer), TOTAL_MESSAGES, s3, "publish", publish_stage, (publisher,),
+                 DELAY_BETWEEN_MESSAGES, backpressure)
+    if backpressure is not None:
+        backpressure.close()
+    publisher.close()
     logging.info("🎉 All complaints sent successfully.")
 
 
+# --- Corpus mode ---
+def corpus_key(name):
+    return f"corpus/{CORPUS_NAME}/{name}"
+
+
+def load_manifest(s3):
+    """Manifest entries by index; empty if the corpus has not been built yet."""
+    buffer = io.BytesIO()
+    try:
+        s3.download_fileobj(MINIO_BUCKET, corpus_key("manifest.jsonl"), buffer)
+    except s3.exceptions.ClientError as e:
+        if str(e.response["Error"]["Code"]) in ("404", "NoSuchKey"):
+            return {}
+        raise
+    entries = (json.loads(line) for line in buffer.getvalue().decode("utf-8").splitlines() if line)
+    return {entry["index"]: entry for entry in entries}
+
+
+def save_manifest(s3, entries):
+    body = "".join(json.dumps(entries[index]) + "\n" for index in sorted(entries)).encode("utf-8")
+    s3.upload_fileobj(io.BytesIO(body), MINIO_BUCKET, corpus_key("manifest.jsonl"),
+                      ExtraArgs={"ContentType": "application/x-ndjson"})
+
+
+def corpus_jobs(existing):
+    # The whole seeded sequence is always drawn, so entry i is the same dialogue however often the
+    # build is resumed or CORPUS_SIZE grown; only the missing entries go to TTS
+    customers = CustomerPool.generate(CORPUS_CUSTOMERS, CORPUS_SEED)
+    engine = DialogueEngine(seed=CORPUS_SEED)
+    for index in range(CORPUS_SIZE):
+        customer = customers[index % len(customers)]
+        scenario, text = engine.dialogue(customer, MESSAGE_LENGHT)
+        if index not in existing:
+            sentences = list(split_into_sentences(text.splitlines()))
+            yield corpus_key(f"{index:06d}"), scenario, sentences, {"index": index, "customer_id": customer["id"]}
+
+
+def manifest_stage(entries, in_queue, stats):
+    while (item := in_queue.get()) is not None:
+        _, scenario, _, object_name, audio_info, extra = item
+        entries[extra["index"]] = {**extra, "object_name": object_name, "scenario": scenario, "audio": audio_info}
+        stats.record(0.0)
+
+
+def build_corpus():
+    s3 = create_s3_client()
+    ensure_bucket(s3)
+    entries = load_manifest(s3)
+    missing = sum(1 for index in range(CORPUS_SIZE) if index not in entries)
+    logging.info(f"[Corpus] '{CORPUS_NAME}': {len(entries)} entries stored, synthesizing {missing} of {CORPUS_SIZE} "
+                 f"(seed {CORPUS_SEED})")
+    if missing:
+        try:
+            run_pipeline(corpus_jobs(entries), missing, s3, "manifest", manifest_stage, (entries,))
+        finally:
+            # Written even after an interrupt so the next run resumes where this one stopped
+            save_manifest(s3, entries)
+    logging.info(f"[Corpus] Manifest s3://{MINIO_BUCKET}/{corpus_key('manifest.jsonl')} "
+                 f"lists {len(entries)} complaints")
+
+
+def replay_corpus():
+    s3 = create_s3_client()
+    entries = [entry for _, entry in sorted(load_manifest(s3).items())]
+    if not entries:
+        raise Exception(f"[Corpus] No manifest for '{CORPUS_NAME}', run with PRODUCER_MODE=corpus first")
+    total = REPLAY_MESSAGES or len(entries)
+    redis_client = connect_to_redis()
+    publisher = create_publisher(redis_client)
+    backpressure = create_backpressure(publisher)
+    logging.info(f"[Replay] {total} messages from {len(entries)} corpus entries at "
+                 f"{f'{REPLAY_RATE:g}/s' if REPLAY_RATE > 0 else 'max rate'}")
+
+    started_at = time.perf_counter()
+    last_report = started_at
+    late = 0
+    held_back = 0.0  # seconds of backpressure; the schedule slips by it instead of bursting to catch up
+    try:
+        for i in range(total):
+            if REPLAY_RATE > 0:
+                # Absolute schedule: a slow publish is caught up on rather than stretching the run
+                delay = started_at + held_back + i / REPLAY_RATE - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                elif delay < -0.1:
+                    late += 1
+            if backpressure is not None:
+                held_back += backpressure.acquire()
+            entry = entries[i % len(entries)]
+            # Fresh id per replay so consumers write a separate point each time the object is reused
+            audio_id = f"voice-{uuid.uuid4()}-{int(time.time())}"
+            audio_url = f"http://{MINIO_ENDPOINT}/{MINIO_BUCKET}/{entry['object_name']}"
+            publish_complaint(publisher, audio_id, entry["scenario"], audio_url, entry["object_name"], entry["audio"],
+                              customer_id=entry["customer_id"], corpus=CORPUS_NAME, corpus_index=entry["index"])
+            now = time.perf_counter()
+            if now - last_report >= REPORT_INTERVAL:
+                last_report = now
+                logging.info(f"[Replay] {i + 1}/{total} sent, {(i + 1) / (now - started_at):.1f}/s, "
+                             f"{late} more than 100 ms late, {publisher.counters()['confirmed']} confirmed")
+    except KeyboardInterrupt:
+        logging.info("Interrupted by user, flushing the publisher...")
+    if backpressure is not None:
+        backpressure.close()
+    publisher.close()
+    elapsed = max(time.perf_counter() - started_at, 1e-9)
+    confirmed = publisher.counters()["confirmed"]
+    logging.info(f"[Replay] Done: {confirmed} confirmed in {elapsed:.1f}s ({confirmed / elapsed:.1f}/s, "
+                 f"{3600 * confirmed / elapsed:.0f}/h), {late} sends more than 100 ms late, held back {held_back:.1f}s")
+
+
 if __name__ == "__main__":
-    main()
+    if PRODUCER_MODE == "corpus":
+        build_corpus()
+    elif PRODUCER_MODE == "replay":
+        replay_corpus()
+    else:
+        main()